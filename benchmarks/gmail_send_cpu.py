@@ -0,0 +1,87 @@
+"""
+Per-send CPU cost of GmailClient.send_email, before and after caching the
+Gmail discovery service.
+
+"before" rebuilds the service with build('gmail', 'v1', credentials=...) on
+every send and executes it synchronously, as send_email used to; "after" is
+the current send_email, which reuses the process-wide resource and sends
+through the async httpx client. The network is replaced by in-process fakes
+so only client-side CPU is measured.
+
+    python benchmarks/gmail_send_cpu.py --sends 200
+"""
+import os
+import sys
+import time
+import base64
+import asyncio
+import argparse
+
+import httplib2
+import httpx
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from gmail_client import GmailClient  # noqa: E402
+
+BODY = "<html><body><p>Hi, your interview is confirmed.</p></body></html>"
+
+
+class FakeHttp:
+    """Answers every request like Gmail's messages.send, without a network round-trip."""
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        return httplib2.Response({"status": "200"}), b'{"id": "benchmark"}'
+
+
+def credentials() -> Credentials:
+    return Credentials(token="benchmark-token")
+
+
+def send_before(creds: Credentials) -> None:
+    service = build('gmail', 'v1', credentials=creds)
+    raw = f"To: a@example.com\nSubject: Hi\nMIME-Version: 1.0\nContent-Type: text/html; charset=utf-8\n\n{BODY}"
+    encoded = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('utf-8')
+    service.users().messages().send(userId='me', body={'raw': encoded}).execute(
+        http=AuthorizedHttp(creds, http=FakeHttp())
+    )
+
+
+def make_after_client() -> GmailClient:
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"id": "benchmark"}))
+    return GmailClient(access_token="benchmark-token", http_client=httpx.AsyncClient(transport=transport))
+
+
+def cpu_ms_per_send(fn, sends: int) -> float:
+    start = time.process_time()
+    for _ in range(sends):
+        fn()
+    return (time.process_time() - start) * 1000 / sends
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Gmail send_email CPU cost per send")
+    parser.add_argument("--sends", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    creds = credentials()
+    before = cpu_ms_per_send(lambda: send_before(creds), args.sends)
+
+    client = make_after_client()
+    loop = asyncio.new_event_loop()
+    after = cpu_ms_per_send(
+        lambda: loop.run_until_complete(client.send_email("a@example.com", "Hi", BODY)), args.sends
+    )
+    loop.close()
+
+    print(f"sends:  {args.sends}")
+    print(f"before: {before:.3f} ms CPU per send (build() per send)")
+    print(f"after:  {after:.3f} ms CPU per send (cached service)")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
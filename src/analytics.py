@@ -0,0 +1,262 @@
+"""
+Pipeline analytics over the local mirror.
+
+Aggregates run as SQL over the mirrored JSON (SQLite's json_each/json_extract
+and window functions), so a posting's funnel is computed in one pass inside
+the database instead of by pulling candidates through the API. A small
+candidate -> posting table, kept up to date as the mirror changes, narrows
+each query to one posting and tells the result cache which postings a change
+touches. Only those postings' cached stats are dropped; the stats across
+every posting are recomputed at most once per max_age while candidates keep
+changing, so a stream of webhook updates doesn't rerun the full aggregation
+on every read.
+
+Stats are meant to be computed in a worker thread while the event loop keeps
+writing to the mirror. They can read through their own connection, which only
+sees committed data, and a change invalidates cached stats only once it is
+committed, so a result read from the old data is never cached as current.
+"""
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+from typing import Optional, Dict, Any, List, Set
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidate_postings (
+    candidate_id TEXT NOT NULL,
+    posting_id TEXT NOT NULL,
+    PRIMARY KEY (posting_id, candidate_id)
+);
+CREATE INDEX IF NOT EXISTS idx_candidate_postings_candidate ON candidate_postings (candidate_id);
+"""
+
+# Cache key for stats across every posting
+ALL_POSTINGS = "*"
+
+_MS_PER_DAY = 86400000
+
+
+def record_postings(record: Dict[str, Any]) -> Set[str]:
+    """Posting IDs of a candidate's applications (requires expanded applications)."""
+    postings = set()
+    for application in record.get("applications") or []:
+        if isinstance(application, dict) and application.get("posting"):
+            postings.add(str(application["posting"]))
+    return postings
+
+
+def _median(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
+class PipelineAnalytics:
+    """Funnel, time-in-stage and source stats over mirrored candidates, cached per posting."""
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        all_max_age: Optional[float] = None,
+        read_conn: Optional[sqlite3.Connection] = None
+    ):
+        """
+        Args:
+            conn: Mirror database connection (writes)
+            all_max_age: Seconds the stats across every posting may lag behind changes
+                (LEVER_PIPELINE_STATS_MAX_AGE, 60)
+            read_conn: Connection the stats queries run on (defaults to conn)
+        """
+        self.conn = conn
+        self.conn.executescript(SCHEMA)
+        self.read_conn = read_conn or conn
+        self.all_max_age = all_max_age if all_max_age is not None else float(os.getenv("LEVER_PIPELINE_STATS_MAX_AGE", "60"))
+        # Guards the cache state below, shared by the writer and stats threads
+        self._lock = threading.Lock()
+        # Postings changed since the last commit, and whether anything changed at all
+        self._pending: Set[str] = set()
+        self._pending_change = False
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        # Bumped per posting on every change, so a computation that raced a change isn't cached
+        self._versions: Dict[str, int] = {}
+        self._changes = 0
+        # (changes seen, monotonic time) when the all-postings entry was computed
+        self._all_computed = (0, 0.0)
+        self.hits = 0
+        self.misses = 0
+
+    def _invalidate(self, postings: Set[str]) -> None:
+        with self._lock:
+            self._pending |= postings
+            self._pending_change = True
+
+    def committed(self) -> None:
+        """Drop cached stats for changes just committed to the mirror."""
+        with self._lock:
+            if not self._pending_change:
+                return
+            self._changes += 1
+            for posting_id in self._pending:
+                self._cache.pop(posting_id, None)
+                self._versions[posting_id] = self._versions.get(posting_id, 0) + 1
+            self._pending.clear()
+            self._pending_change = False
+
+    def _all_current(self) -> bool:
+        changes, computed_at = self._all_computed
+        return changes == self._changes or time.monotonic() - computed_at < self.all_max_age
+
+    def _current_postings(self, candidate_id: str) -> Set[str]:
+        rows = self.conn.execute(
+            "SELECT posting_id FROM candidate_postings WHERE candidate_id = ?", (candidate_id,)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def index(self, candidate_id: str, record: Dict[str, Any]) -> None:
+        """Record a candidate's postings and drop cached stats it affects."""
+        old = self._current_postings(candidate_id)
+        new = record_postings(record)
+        if not new and any(isinstance(a, str) for a in record.get("applications") or []):
+            # Unexpanded applications (e.g. a single-record refetch) say nothing about postings
+            new = old
+        if old != new:
+            self.conn.execute("DELETE FROM candidate_postings WHERE candidate_id = ?", (candidate_id,))
+            self.conn.executemany(
+                "INSERT INTO candidate_postings (candidate_id, posting_id) VALUES (?, ?)",
+                [(candidate_id, posting_id) for posting_id in new]
+            )
+        self._invalidate(old | new)
+
+    def remove(self, candidate_id: str) -> None:
+        self._invalidate(self._current_postings(candidate_id))
+        self.conn.execute("DELETE FROM candidate_postings WHERE candidate_id = ?", (candidate_id,))
+
+    def _scope(self, posting_id: Optional[str]):
+        """FROM clause and params selecting the candidates in scope."""
+        if posting_id is None:
+            return "candidates c", ()
+        return "candidates c JOIN candidate_postings p ON p.candidate_id = c.id AND p.posting_id = ?", (posting_id,)
+
+    def _compute(self, posting_id: Optional[str]) -> Dict[str, Any]:
+        if self.read_conn is self.conn:
+            return self._aggregate(self.conn, posting_id)
+        # One read transaction, so every query sees the same committed snapshot
+        self.read_conn.execute("BEGIN")
+        try:
+            return self._aggregate(self.read_conn, posting_id)
+        finally:
+            self.read_conn.rollback()
+
+    def _aggregate(self, conn: sqlite3.Connection, posting_id: Optional[str]) -> Dict[str, Any]:
+        scope, params = self._scope(posting_id)
+
+        total, archived = conn.execute(
+            f"SELECT COUNT(*), COUNT(json_extract(c.data, '$.archived.archivedAt')) FROM {scope}", params
+        ).fetchone()
+
+        # Funnel: candidates currently in each stage and candidates that ever reached it
+        current = dict(conn.execute(
+            f"SELECT COALESCE(json_extract(c.data, '$.stage.id'), json_extract(c.data, '$.stage')) AS stage, COUNT(*) "
+            f"FROM {scope} WHERE json_extract(c.data, '$.archived.archivedAt') IS NULL GROUP BY stage",
+            params
+        ).fetchall())
+        reached = conn.execute(
+            "SELECT json_extract(s.value, '$.toStageId') AS stage, COUNT(DISTINCT c.id), "
+            "MIN(json_extract(s.value, '$.toStageIndex')), MIN(json_extract(s.value, '$.updatedAt')) "
+            f"FROM {scope}, json_each(c.data, '$.stageChanges') s GROUP BY stage",
+            params
+        ).fetchall()
+
+        # Time in stage: gap between consecutive stage changes of each candidate
+        durations: Dict[str, List[float]] = {}
+        rows = conn.execute(
+            "WITH changes AS ("
+            "  SELECT c.id AS id, json_extract(s.value, '$.toStageId') AS stage, json_extract(s.value, '$.updatedAt') AS at "
+            f"  FROM {scope}, json_each(c.data, '$.stageChanges') s"
+            "), spans AS ("
+            "  SELECT stage, LEAD(at) OVER (PARTITION BY id ORDER BY at) - at AS ms FROM changes"
+            ") SELECT stage, ms FROM spans WHERE ms IS NOT NULL ORDER BY stage, ms",
+            params
+        )
+        for stage, ms in rows:
+            durations.setdefault(stage, []).append(ms / _MS_PER_DAY)
+
+        # Source yield: share of each source's candidates that moved past their first stage
+        sources = conn.execute(
+            "SELECT src.value AS source, COUNT(DISTINCT c.id), "
+            "SUM(json_array_length(c.data, '$.stageChanges') > 1), "
+            "COUNT(json_extract(c.data, '$.archived.archivedAt')) "
+            f"FROM {scope}, json_each(c.data, '$.sources') src GROUP BY source ORDER BY 2 DESC",
+            params
+        ).fetchall()
+
+        # Order stages by Lever's stage index when present, else by first use
+        reached.sort(key=lambda r: (r[2] if r[2] is not None else float("inf"), r[3] or 0))
+        stage_order = [r[0] for r in reached] + [s for s in current if s not in {r[0] for r in reached}]
+        funnel = []
+        for stage in stage_order:
+            entry = {"stage": stage, "current": current.get(stage, 0)}
+            entry["reached"] = next((r[1] for r in reached if r[0] == stage), entry["current"])
+            days = durations.get(stage)
+            if days:
+                entry["median_days_in_stage"] = round(_median(days), 2)
+            funnel.append(entry)
+
+        return {
+            "posting_id": posting_id,
+            "candidates": total,
+            "active": total - archived,
+            "archived": archived,
+            "funnel": funnel,
+            "sources": [
+                {
+                    "source": source,
+                    "candidates": count,
+                    "advanced": advanced or 0,
+                    "archived": source_archived,
+                    "advance_rate": round((advanced or 0) / count, 3) if count else 0.0
+                }
+                for source, count, advanced, source_archived in sources
+            ]
+        }
+
+    def stats(self, posting_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Pipeline summary for one posting, or every candidate when posting_id is None.
+
+        Results are cached until a candidate on that posting changes; stats
+        across every posting are refreshed at most once per all_max_age.
+        Runs SQL synchronously, so call it from a worker thread on a server.
+        """
+        key = posting_id or ALL_POSTINGS
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and (key != ALL_POSTINGS or self._all_current()):
+                self.hits += 1
+                return cached
+            self.misses += 1
+            version, changes, started = self._versions.get(key, 0), self._changes, time.monotonic()
+        start = time.perf_counter()
+        result = self._compute(posting_id)
+        result["computed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        with self._lock:
+            if key == ALL_POSTINGS:
+                self._cache[key] = result
+                self._all_computed = (changes, started)
+            elif self._versions.get(key, 0) == version:
+                self._cache[key] = result
+        return result
+
+    def backfill(self, records) -> None:
+        """Index postings for rows mirrored before analytics existed."""
+        for candidate_id, data in records:
+            self.index(candidate_id, json.loads(data))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"cached_postings": len(self._cache), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,200 @@
+"""
+In-process response cache for Lever reads.
+
+Entries are bounded by count (least recently used evicted first) and expire
+after a TTL. Expired entries that carry an ETag or Last-Modified validator are
+kept so the next read can revalidate them with a conditional request instead
+of downloading the record again.
+
+Every invalidation bumps the key's generation. A fetch captures the
+generation before going upstream and passes it to `set`, so a response that
+started before an invalidation can't write the stale record back.
+"""
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Hashable, Tuple
+
+# Import with fallback for cloud deployment
+try:
+    from .rate_limit import api_key_id
+except ImportError:
+    from rate_limit import api_key_id
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """A cached value with its expiry time and HTTP validators."""
+
+    __slots__ = ("value", "expires_at", "etag", "last_modified")
+
+    def __init__(self, value: Any, expires_at: float, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.value = value
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class TTLCache:
+    """Size-bounded LRU cache with a per-entry TTL and hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        # Invalidation counts per key; bumping the epoch stands in for all of them once pruned
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def lookup(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Return the entry for key, fresh or revalidatable, or None.
+
+        Fresh entries count as hits. Expired entries without validators are
+        dropped; expired entries with validators are returned so the caller can
+        revalidate them (recorded later via `revalidated` or `set`).
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.fresh:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        if not entry.revalidatable:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry for key, if any, without touching counters or LRU order."""
+        return self._entries.get(key)
+
+    def generation(self, key: Hashable) -> Tuple[int, int]:
+        """Token that changes whenever key is invalidated; capture it before fetching."""
+        return (self._epoch, self._generations.get(key, 0))
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        generation: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Cache value, unless key was invalidated since `generation` was captured."""
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation(key):
+            logger.debug(f"Not caching {key}: invalidated while it was being fetched")
+            return
+        self._entries[key] = CacheEntry(value, time.monotonic() + self.ttl, etag, last_modified)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def revalidated(self, key: Hashable, generation: Optional[Tuple[int, int]] = None) -> Optional[Any]:
+        """Mark an entry confirmed by a 304 response as fresh again and return its value."""
+        entry = self._entries.get(key)
+        if entry is None or (generation is not None and generation != self.generation(key)):
+            return None
+        entry.expires_at = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+        self.revalidations += 1
+        return entry.value
+
+    def invalidate(self, key: Hashable) -> bool:
+        self._generations[key] = self._generations.get(key, 0) + 1
+        if len(self._generations) > max(self.max_size, 1024):
+            self._generations.clear()
+            self._epoch += 1
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+            return True
+        return False
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+        self._epoch += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.revalidations
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.revalidations) / lookups, 4) if lookups else 0.0
+        }
+
+
+# Candidate caches shared process-wide, keyed by a hash of the API key
+_candidate_caches: Dict[str, TTLCache] = {}
+
+
+def get_candidate_cache(api_key: str) -> TTLCache:
+    """Return the get_candidate cache shared by every client using this API key."""
+    key_id = api_key_id(api_key)
+    cache = _candidate_caches.get(key_id)
+    if cache is None:
+        cache = TTLCache(
+            max_size=int(os.getenv("LEVER_CACHE_MAX_SIZE", "1024")),
+            ttl=float(os.getenv("LEVER_CACHE_TTL", "60"))
+        )
+        _candidate_caches[key_id] = cache
+    return cache
+
+
+def invalidate_candidate(candidate_id: str) -> None:
+    """Drop a candidate from every cache, e.g. after a write touching it."""
+    for cache in _candidate_caches.values():
+        if cache.invalidate(candidate_id):
+            logger.debug(f"Invalidated cached candidate {candidate_id}")
+
+
+def cache_metrics() -> Dict[str, Any]:
+    """Per-key candidate cache metrics, keyed by a non-reversible key id."""
+    return {key_id: cache.snapshot() for key_id, cache in _candidate_caches.items()}
@@ -0,0 +1,216 @@
+"""
+Circuit breakers for upstream services (Lever, Google).
+
+Each upstream gets one breaker shared process-wide. Outcomes are kept in a
+rolling time window; once enough calls have been seen and the error rate
+crosses the threshold the breaker opens and calls fail immediately with
+CircuitOpenError instead of waiting out a timeout. After a cool-down the
+breaker goes half-open and lets probe calls through one at a time: enough
+successful probes close it, a failed probe opens it again.
+
+Only signs of an unhealthy upstream count as failures: transport errors
+(including timeouts) and 5xx responses. 4xx responses and 429s mean the
+upstream is up and answering.
+"""
+import os
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Callable, Awaitable, Deque, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+T = TypeVar("T")
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"Upstream '{name}' is unavailable (circuit open); failing fast, retry in {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """Rolling-window error-rate breaker with half-open probes."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        window: float = 30.0,
+        min_calls: int = 10,
+        open_seconds: float = 15.0,
+        half_open_probes: int = 1
+    ):
+        """
+        Args:
+            name: Upstream name, used in errors and /health
+            failure_rate: Fraction of failed calls in the window that opens the breaker
+            window: Rolling window length in seconds
+            min_calls: Calls needed in the window before the error rate is judged
+            open_seconds: Cool-down before probing a tripped upstream
+            half_open_probes: Consecutive successful probes needed to close again
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.window = window
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_until = 0.0
+        self._probe_successes = 0
+
+        # Metrics
+        self.opened = 0
+        self.rejected = 0
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            _, ok = self._outcomes.popleft()
+            if not ok:
+                self._failures -= 1
+
+    def _open(self, now: float) -> None:
+        if self.state != OPEN:
+            self.opened += 1
+            logger.warning(f"Circuit for {self.name} opened; failing fast for {self.open_seconds:g}s")
+        self.state = OPEN
+        self._opened_at = now
+        self._probe_successes = 0
+
+    def _close(self) -> None:
+        logger.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+
+    def reset(self) -> None:
+        """Forget all outcomes and metrics and close the breaker."""
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_until = 0.0
+        self._probe_successes = 0
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self) -> None:
+        """
+        Admit a call or fail fast.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a probe already in flight
+        """
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == OPEN:
+            retry_in = self._opened_at + self.open_seconds - now
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = HALF_OPEN
+            self._probe_until = 0.0
+        if now < self._probe_until:
+            self.rejected += 1
+            raise CircuitOpenError(self.name, self._probe_until - now)
+        # This call is the probe; if it never reports back, another is allowed after the cool-down
+        self._probe_until = now + self.open_seconds
+
+    def record(self, ok: bool) -> None:
+        """Record the outcome of an admitted call."""
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            if not ok:
+                self._open(now)
+                return
+            self._probe_successes += 1
+            self._probe_until = 0.0
+            if self._probe_successes >= self.half_open_probes:
+                self._close()
+            return
+        if self.state == OPEN:
+            # A call admitted before the breaker tripped
+            return
+
+        self._outcomes.append((now, ok))
+        if not ok:
+            self._failures += 1
+        self._trim(now)
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and self._failures / calls >= self.failure_rate:
+            self._open(now)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() through the breaker.
+
+        Exceptions (other than cancellation) and responses with a 5xx
+        status_code count as failures.
+
+        Raises:
+            CircuitOpenError: If the call was not admitted
+        """
+        self.before_call()
+        try:
+            result = await fn()
+        except Exception:
+            self.record(False)
+            raise
+        self.record(getattr(result, "status_code", 200) < 500)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._trim(now)
+        calls = len(self._outcomes)
+        result = {
+            "state": self.state,
+            "window_calls": calls,
+            "window_error_rate": round(self._failures / calls, 4) if calls else 0.0,
+            "times_opened": self.opened,
+            "rejected": self.rejected
+        }
+        if self.state == OPEN:
+            result["retry_in"] = round(max(0.0, self._opened_at + self.open_seconds - now), 2)
+        return result
+
+
+# Shared process-wide, keyed by upstream name
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the breaker for an upstream, configured from LEVER_BREAKER_* on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            failure_rate=_env_float("LEVER_BREAKER_FAILURE_RATE", 0.5),
+            window=_env_float("LEVER_BREAKER_WINDOW", 30.0),
+            min_calls=int(_env_float("LEVER_BREAKER_MIN_CALLS", 10)),
+            open_seconds=_env_float("LEVER_BREAKER_OPEN_SECONDS", 15.0),
+            half_open_probes=int(_env_float("LEVER_BREAKER_HALF_OPEN_PROBES", 1))
+        )
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
@@ -1,14 +1,135 @@
 import httpx
 import os
 import base64
-from typing import Optional, Dict, Any, List
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+
+# Import with fallback for cloud deployment
+try:
+    from .rate_limit import get_rate_limiter, RetryPolicy, parse_retry_after, RETRYABLE_STATUS_CODES
+    from .cache import get_candidate_cache
+    from .coalesce import get_singleflight
+    from .models import Candidate, Requisition, decode, decode_page, to_dict
+    from .compression import upstream_accept_encoding
+    from .circuit_breaker import get_breaker
+except ImportError:
+    from rate_limit import get_rate_limiter, RetryPolicy, parse_retry_after, RETRYABLE_STATUS_CODES
+    from cache import get_candidate_cache
+    from coalesce import get_singleflight
+    from models import Candidate, Requisition, decode, decode_page, to_dict
+    from compression import upstream_accept_encoding
+    from circuit_breaker import get_breaker
+
+logger = logging.getLogger(__name__)
+
+# Process-wide pooled HTTP client shared by every LeverClient.
+# Created lazily on first use and closed by the server lifespan.
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Lever caps page size for list endpoints at 100
+MAX_PAGE_SIZE = 100
+
+# LeverClient instances keyed by API key so tools don't rebuild auth headers per call
+_lever_clients: Dict[str, "LeverClient"] = {}
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _envelope(record) -> Dict[str, Any]:
+    return {"data": to_dict(record) if record is not None else None}
+
+
+def _page_dict(page: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(page, data=[to_dict(record) for record in page["data"]])
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """
+    Build a pooled AsyncClient configured from the environment.
+
+    Pool limits, timeouts and HTTP/2 are controlled by the LEVER_HTTP_* variables.
+    HTTP/2 is only enabled when the optional 'h2' package is installed.
+    Responses are requested compressed (brotli too when the optional 'brotli'
+    package is installed) and decoded transparently by httpx.
+    """
+    limits = httpx.Limits(
+        max_connections=_env_int("LEVER_HTTP_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=_env_int("LEVER_HTTP_MAX_KEEPALIVE", 20),
+        keepalive_expiry=_env_float("LEVER_HTTP_KEEPALIVE_EXPIRY", 30.0)
+    )
+    timeout = httpx.Timeout(
+        _env_float("LEVER_HTTP_TIMEOUT", 30.0),
+        connect=_env_float("LEVER_HTTP_CONNECT_TIMEOUT", 10.0)
+    )
+
+    http2 = os.environ.get("LEVER_HTTP2", "").lower() in ("1", "true", "yes")
+    if http2 and not _http2_available():
+        logger.warning("LEVER_HTTP2 is set but the 'h2' package is not installed - falling back to HTTP/1.1")
+        http2 = False
+
+    headers = {"Accept-Encoding": upstream_accept_encoding()}
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2, headers=headers)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared pooled HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = build_http_client()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and drop cached LeverClient instances."""
+    global _http_client
+    client, _http_client = _http_client, None
+    _lever_clients.clear()
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Closed shared Lever HTTP client")
+
+
+def get_lever_client(api_key: Optional[str] = None) -> "LeverClient":
+    """
+    Return a cached LeverClient for the given (or configured) API key.
+
+    Raises:
+        ValueError: If no API key is provided or set in LEVER_API_KEY
+    """
+    key = api_key or os.environ.get("LEVER_API_KEY")
+    if not key:
+        raise ValueError("LEVER_API_KEY environment variable is not set")
+
+    client = _lever_clients.get(key)
+    if client is None:
+        client = LeverClient(api_key=key)
+        _lever_clients[key] = client
+    return client
+
 
 class LeverClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or os.environ.get("LEVER_API_KEY")
         if not self.api_key:
             raise ValueError("LEVER_API_KEY environment variable is not set")
-        
+
         self.base_url = os.environ.get("LEVER_API_BASE_URL", "https://api.lever.co/v1")
         # Lever uses Basic Auth with the API key as the username and an empty password
         auth_string = f"{self.api_key}:"
@@ -17,36 +138,355 @@ class LeverClient:
             "Authorization": f"Basic {encoded_auth}",
             "Content-Type": "application/json"
         }
+        # Explicit client (e.g. for tests); otherwise the shared pooled client is used
+        self._http_client = http_client
+        # Shared with every other client using the same API key
+        self.rate_limiter = get_rate_limiter(self.api_key)
+        self.retry_policy = RetryPolicy()
+        # Shared by every Lever call in the process; fails fast while Lever is down
+        self.breaker = get_breaker("lever")
+        self.candidate_cache = get_candidate_cache(self.api_key)
+        self.singleflight = get_singleflight(self.api_key)
+        # Requisitions created through this client, by requisition code
+        self._created_requisitions: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        extra_headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a rate-limited request, retrying throttled and transient failures.
+
+        429 responses are always retried (Lever rejected the request before
+        processing it). 5xx responses and transport errors are only retried
+        for GETs, so a write is never replayed after it may have been applied.
+        Every attempt goes through the Lever circuit breaker.
+
+        Raises:
+            httpx.HTTPStatusError: If the final response is an error
+            CircuitOpenError: If Lever's circuit is open
+        """
+        send = getattr(self.http, method.lower())
+        url = f"{self.base_url}{path}"
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        idempotent = method.upper() == "GET"
+
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            try:
+                response = await self.breaker.call(lambda: send(url, headers=headers, **kwargs))
+            except httpx.TransportError as e:
+                if not idempotent or attempt >= self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                logger.warning(f"Lever {method} {path} failed ({e!r}); retrying in {delay:.2f}s")
+            else:
+                status = response.status_code
+                if status == 304:
+                    # Conditional request confirmed the cached copy
+                    return response
+                retryable = status == 429 or (idempotent and status in RETRYABLE_STATUS_CODES)
+                if not retryable or attempt >= self.retry_policy.max_retries:
+                    response.raise_for_status()
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = self.retry_policy.backoff(attempt, retry_after)
+                if status == 429:
+                    # Hold back every caller on this key, not just this one
+                    self.rate_limiter.pause(delay)
+                logger.warning(f"Lever {method} {path} returned {status}; retrying in {delay:.2f}s")
 
-    async def get_candidates(self, limit: int = 10, offset: Optional[str] = None) -> Dict[str, Any]:
+            self.rate_limiter.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_candidates(
+        self,
+        limit: int = 10,
+        offset: Optional[str] = None,
+        updated_at_start: Optional[int] = None,
+        expand: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page of candidates.
+
+        Concurrent identical requests share one upstream call, so the returned
+        page may be shared with other callers and must not be mutated.
+        """
         params = {"limit": limit}
         if offset:
             params["offset"] = offset
-            
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/candidates",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()
+        if updated_at_start is not None:
+            # Lever timestamps are milliseconds since the epoch
+            params["updated_at_start"] = updated_at_start
+        if expand:
+            params["expand"] = expand
+
+        async def fetch() -> Dict[str, Any]:
+            response = await self._request("GET", "/candidates", params=params)
+            return _page_dict(decode_page(response.content, Candidate))
+
+        key = ("candidates", limit, offset, updated_at_start, tuple(expand or ()))
+        return await self.singleflight.do(key, fetch)
+
+    async def iter_candidate_pages(
+        self,
+        page_size: int = MAX_PAGE_SIZE,
+        offset: Optional[str] = None,
+        updated_at_start: Optional[int] = None,
+        expand: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over raw candidate pages, following Lever's next/hasNext cursor.
+
+        The next page is requested as soon as the current one arrives, so the
+        network round-trip overlaps with the caller consuming the current page.
+
+        Args:
+            page_size: Records per page (capped at 100)
+            offset: Cursor to resume from, as returned in a page's 'next' field
+            updated_at_start: Only include records updated at or after this time (ms)
+            expand: Related objects to inline, e.g. ["applications"]
+
+        Yields:
+            Page dicts with 'data', 'hasNext' and 'next' keys
+        """
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        pending = asyncio.ensure_future(
+            self.get_candidates(limit=page_size, offset=offset, updated_at_start=updated_at_start, expand=expand)
+        )
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                if page.get("hasNext") and page.get("next"):
+                    pending = asyncio.ensure_future(
+                        self.get_candidates(limit=page_size, offset=page["next"], updated_at_start=updated_at_start, expand=expand)
+                    )
+                yield page
+        finally:
+            if pending is not None:
+                if not pending.done():
+                    pending.cancel()
+                elif not pending.cancelled():
+                    # Consume a failed prefetch so it isn't reported as unretrieved
+                    pending.exception()
+
+    async def iter_candidates(
+        self,
+        page_size: int = MAX_PAGE_SIZE,
+        max_items: Optional[int] = None,
+        offset: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over candidate records across all pages.
+
+        Args:
+            page_size: Records per upstream request (capped at 100)
+            max_items: Stop after this many records (None for all)
+            offset: Cursor to resume from
+
+        Yields:
+            Candidate dicts
+        """
+        if max_items is not None and max_items <= 0:
+            return
+        if max_items is not None:
+            page_size = min(page_size, max_items)
+
+        count = 0
+        pages = self.iter_candidate_pages(page_size=page_size, offset=offset)
+        try:
+            async for page in pages:
+                for record in page.get("data", []):
+                    yield record
+                    count += 1
+                    if max_items is not None and count >= max_items:
+                        return
+        finally:
+            await pages.aclose()
 
     async def get_candidate(self, candidate_id: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/candidates/{candidate_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
-
-    async def create_requisition(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/requisitions",
-                headers=self.headers,
-                json=data
-            )
-            response.raise_for_status()
-            return response.json()
+        """
+        Fetch a candidate, served from the shared cache while fresh.
+
+        Expired entries with an ETag/Last-Modified validator are revalidated
+        with a conditional request; a 304 reuses the cached body. Concurrent
+        misses for the same candidate share one upstream call.
+        """
+        return _envelope(await self.get_candidate_model(candidate_id))
+
+    async def get_candidate_model(self, candidate_id: str) -> Optional[Candidate]:
+        """Like get_candidate, but returns the cached Candidate model itself (do not mutate it)."""
+        cache = self.candidate_cache
+        entry = cache.lookup(candidate_id) if cache.enabled else None
+        if entry is not None and entry.fresh:
+            return entry.value
+        return await self.singleflight.do(("candidate", candidate_id), lambda: self._fetch_candidate(candidate_id, entry))
+
+    async def _fetch_candidate(self, candidate_id: str, entry) -> Optional[Candidate]:
+        cache = self.candidate_cache
+        # An invalidation while the GET is in flight means the response may predate the write
+        generation = cache.generation(candidate_id)
+        headers = entry.conditional_headers() if entry is not None else {}
+        response = await self._request("GET", f"/candidates/{candidate_id}", extra_headers=headers)
+        if response.status_code == 304 and entry is not None:
+            revalidated = cache.revalidated(candidate_id, generation)
+            return revalidated if revalidated is not None else entry.value
+
+        # The cache holds slotted models rather than full response dicts
+        record = decode(response.content, Candidate)
+        if entry is not None:
+            # Validator didn't match: the stale copy was replaced
+            cache.misses += 1
+        cache.set(
+            candidate_id,
+            record,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            generation=generation
+        )
+        return record
+
+    async def get_candidates_by_id(
+        self,
+        candidate_ids: List[str],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch many candidates concurrently, collecting per-ID failures.
+
+        Duplicate IDs are fetched once. At most `concurrency` requests are in
+        flight at a time (default LEVER_BATCH_CONCURRENCY, 8); the shared rate
+        limiter still applies to each one.
+
+        Args:
+            candidate_ids: Candidate IDs to fetch
+            concurrency: Maximum concurrent requests
+
+        Returns:
+            Dict with 'results' (id -> candidate response) and 'errors' (id -> message)
+        """
+        if concurrency is None:
+            concurrency = _env_int("LEVER_BATCH_CONCURRENCY", 8)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        unique_ids = list(dict.fromkeys(candidate_ids))
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+
+        async def fetch(candidate_id: str) -> None:
+            async with semaphore:
+                try:
+                    results[candidate_id] = await self.get_candidate(candidate_id)
+                except httpx.HTTPStatusError as e:
+                    errors[candidate_id] = f"HTTP {e.response.status_code}"
+                except Exception as e:
+                    errors[candidate_id] = str(e) or type(e).__name__
+
+        await asyncio.gather(*(fetch(candidate_id) for candidate_id in unique_ids))
+        return {"results": results, "errors": errors}
+
+    async def get_candidate_resumes(self, candidate_id: str) -> Dict[str, Any]:
+        """Fetch a candidate's resumes, including Lever's parsedData."""
+        response = await self._request("GET", f"/candidates/{candidate_id}/resumes")
+        return response.json()
+
+    def invalidate_candidate(self, candidate_id: str) -> None:
+        """Drop a candidate from the cache after a write that touches it."""
+        self.candidate_cache.invalidate(candidate_id)
+        # Reads issued after the write must not join a fetch that started before it
+        self.singleflight.forget(("candidate", candidate_id))
+
+    async def create_requisition(self, data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        response = await self._request("POST", "/requisitions", extra_headers=headers, json=data)
+        return _envelope(decode(response.content, Requisition))
+
+    async def find_requisition(self, code: str) -> Optional[Dict[str, Any]]:
+        """Look up a requisition by its requisition code."""
+        response = await self._request("GET", "/requisitions", params={"requisition_code": code})
+        data = decode_page(response.content, Requisition)["data"]
+        return to_dict(data[0]) if data else None
+
+    async def _create_requisition_once(self, data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Create a requisition keyed by its requisition code, never twice.
+
+        A POST that failed ambiguously (transport error or 5xx, so Lever may
+        have applied it) or was rejected (e.g. the code already exists) is
+        followed by a lookup of the code before anything is resent.
+
+        Returns:
+            ("created" | "exists", requisition)
+        """
+        code = data["requisitionCode"]
+        if code in self._created_requisitions:
+            return "exists", self._created_requisitions[code]
+
+        attempt = 0
+        while True:
+            try:
+                result = (await self.create_requisition(data, idempotency_key=code))["data"] or {}
+                status = "created"
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                rejected = isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500
+                existing = await self.find_requisition(code)
+                if existing is not None:
+                    result, status = existing, "exists"
+                elif rejected or attempt >= self.retry_policy.max_retries:
+                    raise
+                else:
+                    delay = self.retry_policy.backoff(attempt)
+                    logger.warning(f"Creating requisition {code} failed ({e!r}); retrying in {delay:.2f}s")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+            self._created_requisitions[code] = result
+            return status, result
+
+    async def create_requisitions(
+        self,
+        payloads: List[Dict[str, Any]],
+        concurrency: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Create many requisitions concurrently, reporting a result per row.
+
+        Each payload's requisitionCode is its idempotency key (see
+        _create_requisition_once). At most `concurrency` writes are in flight
+        at a time (default LEVER_BATCH_CONCURRENCY, 8).
+
+        Args:
+            payloads: Lever requisition payloads, each with a requisitionCode
+            concurrency: Maximum concurrent requests
+
+        Returns:
+            One dict per payload, in order, with 'requisition_code', 'status'
+            ("created", "exists" or "error") and 'id' or 'error'
+        """
+        if concurrency is None:
+            concurrency = _env_int("LEVER_BATCH_CONCURRENCY", 8)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def create(data: Dict[str, Any]) -> Dict[str, Any]:
+            row = {"requisition_code": data["requisitionCode"]}
+            async with semaphore:
+                try:
+                    status, result = await self._create_requisition_once(data)
+                    row.update(status=status, id=result.get("id"))
+                except httpx.HTTPStatusError as e:
+                    row.update(status="error", error=f"HTTP {e.response.status_code}: {e.response.text[:200]}")
+                except Exception as e:
+                    row.update(status="error", error=str(e) or type(e).__name__)
+            return row
+
+        return await asyncio.gather(*(create(data) for data in payloads))
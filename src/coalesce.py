@@ -0,0 +1,90 @@
+"""
+Request coalescing ("singleflight") for Lever reads.
+
+Concurrent identical reads share one upstream call: the first caller starts
+it and everyone who asks for the same key while it is in flight awaits the
+same task. The key is forgotten as soon as the call finishes, so this never
+serves stale data on its own; caching is cache.py's job.
+"""
+import asyncio
+import logging
+from typing import Dict, Any, Hashable, Callable, Awaitable
+
+# Import with fallback for cloud deployment
+try:
+    from .rate_limit import api_key_id
+except ImportError:
+    from rate_limit import api_key_id
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every waiter was cancelled
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() unless an identical call is already in flight, then await its result.
+
+        The shared call runs as its own task, so a cancelled caller doesn't
+        cancel it for the others. Results (and exceptions) are shared as-is,
+        so callers must not mutate them.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable) -> None:
+        """Let the next call for key start fresh (e.g. after a write), without cancelling waiters."""
+        self._inflight.pop(key, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        calls = self.leaders + self.coalesced
+        return {
+            "upstream_calls": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+            "in_flight": len(self._inflight)
+        }
+
+
+# Shared process-wide, keyed by a hash of the API key
+_flights: Dict[str, SingleFlight] = {}
+
+
+def get_singleflight(api_key: str) -> SingleFlight:
+    """Return the SingleFlight shared by every client using this API key."""
+    key_id = api_key_id(api_key)
+    flight = _flights.get(key_id)
+    if flight is None:
+        flight = _flights[key_id] = SingleFlight()
+    return flight
+
+
+def forget(key: Hashable) -> None:
+    """Forget an in-flight call for key under every API key."""
+    for flight in _flights.values():
+        flight.forget(key)
+
+
+def coalesce_metrics() -> Dict[str, Any]:
+    """Per-key coalescing metrics, keyed by a non-reversible key id."""
+    return {key_id: flight.snapshot() for key_id, flight in _flights.items()}
@@ -0,0 +1,335 @@
+"""
+Response compression for the HTTP transports and custom routes.
+
+An ASGI middleware negotiates brotli (when the optional 'brotli' package is
+installed) or gzip from Accept-Encoding. Compression is skipped when it
+doesn't pay off:
+
+- bodies below a size threshold, or that don't shrink by at least 10%
+- content that is already encoded or not text-like (images, archives)
+- once a CPU budget is spent: compression time is metered against a token
+  bucket refilling at a fraction of one core, and responses go out
+  uncompressed while it is empty
+
+Streamed responses (SSE from the streamable-http and SSE transports) are
+buffered until they reach the size threshold or end, so the same checks
+apply to them; past the threshold they are compressed chunk by chunk with a
+sync flush after each one, so events still reach the client as soon as they
+are sent. GET event streams can stay open and idle, so they are never held
+back: they are compressed chunk by chunk from the first event.
+"""
+import os
+import time
+import zlib
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Content types worth compressing (prefix match on the media type)
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml",
+    "application/x-ndjson", "image/svg+xml"
+)
+
+# A body must shrink by at least this fraction to be sent compressed
+MIN_SAVING = 0.1
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class CpuBudget:
+    """Token bucket of CPU seconds, refilled at `fraction` of one core."""
+
+    def __init__(self, fraction: float, burst: float = 1.0):
+        self.fraction = fraction
+        self.capacity = fraction * burst
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    def has_budget(self) -> bool:
+        if self.fraction <= 0:
+            return False
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.fraction)
+        self._updated = now
+        return self.available > 0
+
+    def spend(self, seconds: float) -> None:
+        self.available -= seconds
+
+
+class _Encoder:
+    """Streaming gzip or brotli encoder with an explicit flush per chunk."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            # wbits 16+MAX_WBITS produces a gzip container
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + (self._compressor.flush() if flush else b"")
+        out = self._compressor.compress(data)
+        return out + (self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else b"")
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _accepted(accept_encoding: str) -> List[str]:
+    """Encodings the client accepts (q > 0)."""
+    accepted = []
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        q = 1.0
+        for param in parts[1:]:
+            if param.strip().startswith("q="):
+                try:
+                    q = float(param.strip()[2:])
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.append(name)
+    return accepted
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing HTTP responses when it pays off."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: Optional[int] = None,
+        cpu_budget: Optional[float] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None
+    ):
+        """
+        Args:
+            app: Wrapped ASGI app
+            minimum_size: Smallest body compressed, in bytes (LEVER_COMPRESSION_MIN_SIZE, 1024)
+            cpu_budget: Fraction of one core compression may use (LEVER_COMPRESSION_CPU_BUDGET, 0.25)
+            gzip_level: zlib level (LEVER_COMPRESSION_GZIP_LEVEL, 5)
+            brotli_quality: brotli quality (LEVER_COMPRESSION_BROTLI_QUALITY, 4)
+        """
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else int(_env_float("LEVER_COMPRESSION_MIN_SIZE", 1024))
+        fraction = cpu_budget if cpu_budget is not None else _env_float("LEVER_COMPRESSION_CPU_BUDGET", 0.25)
+        self.budget = CpuBudget(fraction)
+        self.gzip_level = gzip_level if gzip_level is not None else int(_env_float("LEVER_COMPRESSION_GZIP_LEVEL", 5))
+        self.brotli_quality = brotli_quality if brotli_quality is not None else int(_env_float("LEVER_COMPRESSION_BROTLI_QUALITY", 4))
+        _instances.append(self)
+
+        # Metrics
+        self.compressed = 0
+        self.skipped_small = 0
+        self.skipped_budget = 0
+        self.skipped_no_gain = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def _choose(self, scope) -> Optional[str]:
+        accept = _header(scope.get("headers") or [], b"accept-encoding")
+        if not accept:
+            return None
+        accepted = _accepted(accept.decode("latin-1"))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _level(self, encoding: str) -> int:
+        return self.brotli_quality if encoding == "br" else self.gzip_level
+
+    def _timed(self, fn, *args) -> bytes:
+        start = time.perf_counter()
+        out = fn(*args)
+        elapsed = time.perf_counter() - start
+        self.budget.spend(elapsed)
+        self.cpu_seconds += elapsed
+        return out
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Dict[str, Any]] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+        long_lived = False
+        held: List[bytes] = []
+        held_size = 0
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough, long_lived, held_size
+            if message["type"] == "http.response.start":
+                headers = message.get("headers") or []
+                content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+                passthrough = (
+                    _header(headers, b"content-encoding") is not None
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                # A GET event stream (legacy SSE, streamable-http notifications) may idle
+                # indefinitely, so its events can't be held back to measure its size
+                long_lived = scope.get("method") == "GET" and content_type.startswith("text/event-stream")
+                if passthrough:
+                    await send(message)
+                else:
+                    # Hold the headers until enough of the body decides
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                held.append(body)
+                held_size += len(body)
+                if more_body and not long_lived and held_size < self.minimum_size:
+                    # Buffer until the stream ends or is big enough to be worth compressing
+                    return
+                start, start_message = start_message, None
+                body = b"".join(held)
+                held.clear()
+                if not more_body:
+                    await self._send_whole(send, start, body, encoding)
+                    return
+                if not self.budget.has_budget():
+                    self.skipped_budget += 1
+                    passthrough = True
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body, "more_body": True})
+                    return
+                # Streamed response: compress chunk by chunk, flushing each one
+                encoder = _Encoder(encoding, self._level(encoding))
+                out = self._timed(encoder.compress, body, True)
+                if not long_lived and len(out) > len(body) * (1 - MIN_SAVING):
+                    # The buffered prefix didn't shrink enough; send the stream as is
+                    self.skipped_no_gain += 1
+                    passthrough = True
+                    await send(self._start_headers(start, None, None))
+                    await send({"type": "http.response.body", "body": body, "more_body": True})
+                    return
+                self.compressed += 1
+                self.bytes_in += len(body)
+                self.bytes_out += len(out)
+                await send(self._start_headers(start, encoding, None))
+                await send({"type": "http.response.body", "body": out, "more_body": True})
+                return
+
+            self.bytes_in += len(body)
+            out = self._timed(encoder.compress, body, True)
+            if not more_body:
+                out += self._timed(encoder.finish)
+            self.bytes_out += len(out)
+            await send({"type": "http.response.body", "body": out, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _send_whole(self, send, start, body: bytes, encoding: str) -> None:
+        if len(body) < self.minimum_size:
+            self.skipped_small += 1
+        elif not self.budget.has_budget():
+            self.skipped_budget += 1
+        else:
+            encoder = _Encoder(encoding, self._level(encoding))
+            compressed = self._timed(lambda: encoder.compress(body) + encoder.finish())
+            if len(compressed) <= len(body) * (1 - MIN_SAVING):
+                self.compressed += 1
+                self.bytes_in += len(body)
+                self.bytes_out += len(compressed)
+                await send(self._start_headers(start, encoding, len(compressed)))
+                await send({"type": "http.response.body", "body": compressed})
+                return
+            self.skipped_no_gain += 1
+        await send(self._start_headers(start, None, None))
+        await send({"type": "http.response.body", "body": body})
+
+    def _start_headers(self, start, encoding: Optional[str], length: Optional[int]) -> Dict[str, Any]:
+        """Response start message with Vary (and, when compressing, new encoding/length) headers."""
+        headers = [(k, v) for k, v in start.get("headers") or [] if not (encoding and k.lower() == b"content-length")]
+        vary = _header(headers, b"vary")
+        if vary is None:
+            headers.append((b"vary", b"Accept-Encoding"))
+        elif b"accept-encoding" not in vary.lower():
+            headers = [(k, v + b", Accept-Encoding" if k.lower() == b"vary" else v) for k, v in headers]
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            if length is not None:
+                headers.append((b"content-length", str(length).encode("latin-1")))
+        return dict(start, headers=headers)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "brotli_available": brotli is not None,
+            "compressed_responses": self.compressed,
+            "skipped_small": self.skipped_small,
+            "skipped_cpu_budget": self.skipped_budget,
+            "skipped_no_gain": self.skipped_no_gain,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            "cpu_seconds": round(self.cpu_seconds, 4)
+        }
+
+
+# Middleware instances created for the running HTTP app(s)
+_instances: List[CompressionMiddleware] = []
+
+
+def compression_metrics() -> List[Dict[str, Any]]:
+    return [instance.snapshot() for instance in _instances]
+
+
+def compression_enabled() -> bool:
+    """Response compression is on unless LEVER_COMPRESSION is set to false."""
+    return os.getenv("LEVER_COMPRESSION", "true").lower() not in ("0", "false", "no")
+
+
+def upstream_accept_encoding() -> str:
+    """Accept-Encoding for Lever requests: every encoding httpx can decode here."""
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli as _  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        try:
+            import brotlicffi as _  # noqa: F401
+            encodings.append("br")
+        except ImportError:
+            pass
+    return ", ".join(encodings)
@@ -0,0 +1,436 @@
+"""
+Streaming export of Lever candidates to NDJSON, CSV or Parquet.
+
+Pages are pulled through LeverClient and written to disk as they arrive, so
+memory stays bounded by one page (plus one Parquet row group) no matter how
+many records are exported. After every durable write a small checkpoint file
+records the upstream cursor and the output's committed size; a broken export
+restarts from that cursor and discards anything written after it.
+
+Exports are run from the `lever-mcp export` CLI subcommand or, in the
+background, from the `export_candidates` MCP tool.
+"""
+import os
+import io
+import re
+import csv
+import json
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+
+# Import with fallback for cloud deployment
+try:
+    from .projection import get_projection
+    from .output import to_json
+except ImportError:
+    from projection import get_projection
+    from output import to_json
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv", "parquet")
+
+# Tabular formats need a fixed column set; full records only make sense as NDJSON
+TABULAR_DEFAULT_FIELDS = "pipeline"
+
+# Records buffered per Parquet part file
+PARQUET_ROW_GROUP_SIZE = 10000
+
+_EXPORT_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+_PART_RE = re.compile(r"^part-\d+\.parquet$")
+
+
+def checkpoint_path(path: str) -> str:
+    return f"{path}.checkpoint.json"
+
+
+def _columns(fields: str) -> List[str]:
+    """Top-level output columns for a field spec, in spec order."""
+    projection = get_projection(fields)
+    columns: List[str] = []
+    for field in projection.fields if projection else []:
+        column = field.split(".")[0].split("[")[0]
+        if column and column not in columns:
+            columns.append(column)
+    return columns
+
+
+def _cell(value: Any) -> Optional[str]:
+    """Flatten a projected value into a CSV/Parquet cell; nested values become compact JSON."""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return to_json(value)
+    return str(value)
+
+
+class _NdjsonWriter:
+    """One compact JSON record per line."""
+
+    def __init__(self, path: str, committed: Optional[Dict[str, Any]]):
+        self.path = path
+        self.file = open(path, "r+b" if committed else "wb")
+        if committed:
+            # Drop anything written after the last checkpoint
+            self.file.truncate(committed["bytes"])
+            self.file.seek(committed["bytes"])
+
+    def _encode(self, records: List[Dict[str, Any]]) -> bytes:
+        return "".join(to_json(record) + "\n" for record in records).encode("utf-8")
+
+    def _write(self, data: bytes) -> None:
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    async def write(self, records: List[Dict[str, Any]]) -> bool:
+        """Write a page; returns True when everything written so far is on disk."""
+        # Disk writes and fsync run in a thread so the event loop keeps serving other clients
+        await asyncio.to_thread(self._write, self._encode(records))
+        return True
+
+    def state(self) -> Dict[str, Any]:
+        return {"bytes": self.file.tell()}
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.file.close)
+
+
+class _CsvWriter(_NdjsonWriter):
+    """CSV with one column per top-level field of the projection."""
+
+    def __init__(self, path: str, committed: Optional[Dict[str, Any]], columns: List[str]):
+        super().__init__(path, committed)
+        self.columns = columns
+        if not committed:
+            self.file.write(self._rows([dict(zip(columns, columns))]))
+
+    def _rows(self, records: List[Dict[str, Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow(["" if (v := _cell(record.get(c))) is None else v for c in self.columns])
+        return buffer.getvalue().encode("utf-8")
+
+    _encode = _rows
+
+
+class _ParquetWriter:
+    """
+    Directory of Parquet part files.
+
+    A Parquet file can't be appended to once closed, so each row group is
+    written as its own part; resuming just continues with the next part.
+    """
+
+    def __init__(self, path: str, committed: Optional[Dict[str, Any]], columns: List[str]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+        self.pa, self.pq = pa, pq
+        self.path = Path(path)
+        self.columns = columns
+        self.schema = pa.schema([(column, pa.string()) for column in columns])
+        self.parts = committed["parts"] if committed else 0
+        if self.path.exists() and not self.path.is_dir():
+            raise ValueError(f"Parquet export path {path} exists and is not a directory")
+        # Only ever delete our own part files; anything else means the directory isn't ours
+        foreign = [p.name for p in self.path.iterdir() if not _PART_RE.match(p.name)] if self.path.exists() else []
+        if foreign:
+            raise ValueError(
+                f"Parquet export directory {path} contains files this exporter did not write "
+                f"({', '.join(sorted(foreign)[:5])}); choose an empty or new directory"
+            )
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Remove parts written after the last checkpoint
+        for stale in self.path.glob("part-*.parquet"):
+            if int(stale.stem.split("-")[1]) >= self.parts:
+                stale.unlink()
+        self.buffer: Dict[str, List[Optional[str]]] = {column: [] for column in columns}
+        self.buffered = 0
+
+    async def write(self, records: List[Dict[str, Any]]) -> bool:
+        for record in records:
+            for column in self.columns:
+                self.buffer[column].append(_cell(record.get(column)))
+        self.buffered += len(records)
+        if self.buffered >= PARQUET_ROW_GROUP_SIZE:
+            await self._flush()
+            return True
+        return False
+
+    async def _flush(self) -> None:
+        if not self.buffered:
+            return
+        table = self.pa.table(self.buffer, schema=self.schema)
+        await asyncio.to_thread(self.pq.write_table, table, self.path / f"part-{self.parts:05d}.parquet")
+        self.parts += 1
+        self.buffer = {column: [] for column in self.columns}
+        self.buffered = 0
+
+    def state(self) -> Dict[str, Any]:
+        return {"parts": self.parts}
+
+    async def close(self) -> None:
+        await self._flush()
+
+
+def _open_writer(format: str, path: str, fields: Optional[str], committed: Optional[Dict[str, Any]]):
+    if format == "ndjson":
+        return _NdjsonWriter(path, committed)
+    columns = _columns(fields)
+    if format == "csv":
+        return _CsvWriter(path, committed, columns)
+    return _ParquetWriter(path, committed, columns)
+
+
+def _load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(checkpoint_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    tmp = checkpoint_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, checkpoint_path(path))
+
+
+async def export_candidates(
+    client,
+    path: str,
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    page_size: int = 100,
+    updated_at_start: Optional[int] = None,
+    resume: bool = False,
+    progress: Optional[Callable[[int], None]] = None
+) -> Dict[str, Any]:
+    """
+    Stream every candidate page from Lever to a file.
+
+    Args:
+        client: LeverClient used to fetch pages
+        path: Output file (a directory of part files for Parquet)
+        format: "ndjson", "csv" or "parquet"
+        fields: Field spec or preset applied to each record. Defaults to full
+            records for NDJSON and the "pipeline" preset for CSV/Parquet
+        page_size: Records per upstream request
+        updated_at_start: Only export candidates updated since this time (ms since epoch)
+        resume: Continue from the checkpoint left by an interrupted export
+        progress: Called with the running record count after each page
+
+    Returns:
+        Export summary with path, format, record count and timing
+
+    Raises:
+        ValueError: If the format is unknown, Parquet support is missing, or the
+            checkpoint belongs to a different export
+    """
+    format = format.lower()
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format '{format}'. Use one of: {', '.join(FORMATS)}")
+    if format != "ndjson" and not get_projection(fields):
+        fields = TABULAR_DEFAULT_FIELDS
+    projection = get_projection(fields)
+
+    options = {"format": format, "fields": fields, "updated_at_start": updated_at_start}
+    checkpoint = _load_checkpoint(path) if resume else None
+    if checkpoint is not None and checkpoint["options"] != options:
+        raise ValueError(f"Checkpoint for {path} was written by an export with different options: {checkpoint['options']}")
+
+    offset = checkpoint["offset"] if checkpoint else None
+    records = checkpoint["records"] if checkpoint else 0
+    if checkpoint:
+        logger.info(f"Resuming export to {path} after {records} records")
+
+    start = time.monotonic()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    writer = await asyncio.to_thread(_open_writer, format, path, fields, checkpoint["output"] if checkpoint else None)
+    pages = client.iter_candidate_pages(page_size=page_size, offset=offset, updated_at_start=updated_at_start)
+    try:
+        async for page in pages:
+            data = page.get("data", [])
+            if projection:
+                data = projection.apply_many(data)
+            records += len(data)
+            offset = page.get("next") if page.get("hasNext") else None
+            if await writer.write(data) and offset is not None:
+                await asyncio.to_thread(
+                    _save_checkpoint, path,
+                    {"options": options, "offset": offset, "records": records, "output": writer.state()}
+                )
+            if progress:
+                progress(records)
+    finally:
+        await pages.aclose()
+        await writer.close()
+
+    # Finished cleanly: the checkpoint is no longer needed
+    if os.path.exists(checkpoint_path(path)):
+        os.remove(checkpoint_path(path))
+
+    summary = {
+        "path": str(Path(path).resolve()),
+        "format": format,
+        "fields": fields,
+        "records": records,
+        "seconds": round(time.monotonic() - start, 3)
+    }
+    logger.info(f"Export complete: {summary}")
+    return summary
+
+
+class ExportJob:
+    """A background export started from the MCP tool."""
+
+    def __init__(self, export_id: str, path: str, format: str, fields: Optional[str]):
+        self.export_id = export_id
+        self.path = path
+        self.format = format
+        self.fields = fields
+        self.records = 0
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def status(self) -> str:
+        if self.summary is not None:
+            return "complete"
+        if self.error is not None:
+            return "failed"
+        return "running"
+
+    def _progress(self, records: int) -> None:
+        self.records = records
+
+    async def _run(self, client_factory, resume: bool) -> None:
+        try:
+            self.summary = await export_candidates(
+                client_factory(), self.path, format=self.format, fields=self.fields,
+                resume=resume, progress=self._progress
+            )
+            self.records = self.summary["records"]
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Export {self.export_id} failed: {e}")
+
+    def start(self, client_factory, resume: bool = False) -> None:
+        self.error = None
+        self._task = asyncio.create_task(self._run(client_factory, resume))
+
+    def snapshot(self) -> Dict[str, Any]:
+        path = Path(self.path).resolve()
+        return {
+            "export_id": self.export_id,
+            "status": self.status,
+            "format": self.format,
+            "records": self.records,
+            "path": str(path),
+            "url": path.as_uri(),
+            "error": self.error,
+            "resumable": self.error is not None and os.path.exists(checkpoint_path(self.path))
+        }
+
+
+_exports: Dict[str, ExportJob] = {}
+
+
+def export_dir() -> str:
+    """Directory for exports started from the MCP tool (LEVER_EXPORT_DIR)."""
+    return os.getenv("LEVER_EXPORT_DIR", "./exports")
+
+
+def start_export(client_factory, format: str = "ndjson", fields: Optional[str] = None, export_id: Optional[str] = None) -> ExportJob:
+    """
+    Start a background export, or report on / resume an existing one.
+
+    Args:
+        client_factory: Zero-argument callable returning a LeverClient
+        format: "ndjson", "csv" or "parquet"
+        fields: Field spec or preset applied to each record
+        export_id: ID of a previous export to check on or resume
+
+    Returns:
+        The export job
+
+    Raises:
+        ValueError: If the format or export ID is invalid
+    """
+    format = format.lower()
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format '{format}'. Use one of: {', '.join(FORMATS)}")
+    if export_id is not None and not _EXPORT_ID_RE.match(export_id):
+        raise ValueError(f"Invalid export_id: {export_id}")
+
+    job = _exports.get(export_id) if export_id else None
+    if job is not None and job.status != "failed":
+        return job
+
+    # The random suffix keeps exports started in the same second apart
+    export_id = export_id or f"candidates-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    if job is None:
+        path = os.path.join(export_dir(), f"{export_id}.{format}")
+        job = ExportJob(export_id, path, format, fields)
+        _exports[export_id] = job
+    # A failed (or unknown but checkpointed) export picks up where it stopped
+    job.start(client_factory, resume=os.path.exists(checkpoint_path(job.path)))
+    return job
+
+
+def export_main(argv: List[str]) -> int:
+    """`lever-mcp export` subcommand."""
+    parser = argparse.ArgumentParser(prog="lever-mcp export", description="Export Lever candidates to a file")
+    parser.add_argument("output", help="Output file (a directory of part files for parquet)")
+    parser.add_argument("--format", choices=FORMATS, help="Output format (default: from the file extension, else ndjson)")
+    parser.add_argument("--fields", help="Field spec or preset (default: full records for ndjson, 'pipeline' otherwise)")
+    parser.add_argument("--page-size", type=int, default=100, help="Records per Lever request (max 100)")
+    parser.add_argument("--updated-since", type=int, help="Only candidates updated since this time (ms since epoch)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted export from its checkpoint")
+    args = parser.parse_args(argv)
+
+    format = args.format
+    if format is None:
+        extension = Path(args.output).suffix.lstrip(".").lower()
+        format = extension if extension in FORMATS else "ndjson"
+
+    try:
+        from .client import get_lever_client, close_http_client
+    except ImportError:
+        from client import get_lever_client, close_http_client
+
+    async def run() -> Dict[str, Any]:
+        try:
+            return await export_candidates(
+                get_lever_client(), args.output, format=format, fields=args.fields,
+                page_size=args.page_size, updated_at_start=args.updated_since, resume=args.resume,
+                progress=lambda n: logger.info(f"Exported {n} records")
+            )
+        finally:
+            await close_http_client()
+
+    try:
+        summary = asyncio.run(run())
+    except ValueError as e:
+        print(f"Configuration error: {e}")
+        return 2
+    except Exception as e:
+        print(f"Export failed: {e}")
+        if os.path.exists(checkpoint_path(args.output)):
+            print("Re-run with --resume to continue from the last checkpoint.")
+        return 1
+    print(to_json(summary))
+    return 0
@@ -1,36 +1,194 @@
 """
 Gmail client with OAuth 2.0 support.
 Handles authentication and email sending via Gmail API.
+
+Sends and token refreshes are plain async REST calls on the shared pooled
+httpx client, so a slow Gmail round-trip never blocks the event loop.
 """
+import os
+import json
+import asyncio
 import logging
-import base64
-from typing import Optional, Dict, Any
+import secrets
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesParser
+from email.policy import compat32
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlsplit
+import httpx
+import httplib2
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 # Import with fallback for cloud deployment
 try:
     from .oauth_config import oauth_config, GMAIL_SCOPES
+    from .circuit_breaker import get_breaker
+    from .client import get_http_client
+    from .mime_cache import encode_raw_message
 except ImportError:
     from oauth_config import oauth_config, GMAIL_SCOPES
+    from circuit_breaker import get_breaker
+    from client import get_http_client
+    from mime_cache import encode_raw_message
 
 logger = logging.getLogger(__name__)
 
+GOOGLE_TOKEN_URI = 'https://oauth2.googleapis.com/token'
+
+# Gmail's batch endpoint and the most requests it accepts per batch
+GMAIL_BATCH_URI = 'https://gmail.googleapis.com/batch/gmail/v1'
+GMAIL_BATCH_MAX = 100
+
+# Status codes worth retrying a message for (throttled or transient)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared with the OAuth token exchange in server.py
+google_breaker = get_breaker("google")
+
+# One refresh at a time per stored user, so concurrent sends share a refreshed token
+_refresh_locks: Dict[str, asyncio.Lock] = {}
+
+
+class GmailAPIError(Exception):
+    """A Gmail or Google OAuth REST call that returned an error response."""
+
+    def __init__(self, status_code: int, message: str):
+        self.status_code = status_code
+        super().__init__(f"Gmail API error {status_code}: {message}")
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        error = response.json().get("error")
+    except ValueError:
+        return response.text[:200]
+    if isinstance(error, dict):
+        return error.get("message") or str(error)
+    return str(error)
+
+
+# Gmail API resource shared by every GmailClient, built on first use
+_gmail_messages = None
+
+
+def gmail_messages():
+    """
+    The Gmail users.messages resource, built once per process.
+
+    The resource tree is built from the Gmail discovery document bundled with
+    google-api-python-client (no discovery fetch) and holds no credentials.
+    It is only used to describe requests (URI, method, body); they are sent
+    with the sending user's token through the pooled async HTTP client.
+    """
+    global _gmail_messages
+    if _gmail_messages is None:
+        service = build('gmail', 'v1', http=httplib2.Http(), static_discovery=True, cache_discovery=False)
+        _gmail_messages = service.users().messages()
+    return _gmail_messages
+
+
+def build_raw_message(
+    to: str,
+    subject: str,
+    body: str,
+    cc: Optional[str] = None,
+    bcc: Optional[str] = None,
+    is_html: bool = True
+) -> str:
+    """
+    RFC 2822 message, base64url-encoded for the Gmail 'raw' field.
+
+    The headers and body are encoded separately and spliced; a body rendered
+    from a mail-merge template reuses the cached encoding of its static text.
+    """
+    message_parts = [
+        f"To: {to}",
+        f"Subject: {subject}",
+        "MIME-Version: 1.0",
+    ]
+    
+    if is_html:
+        message_parts.append("Content-Type: text/html; charset=utf-8")
+    else:
+        message_parts.append("Content-Type: text/plain; charset=utf-8")
+    
+    if cc:
+        message_parts.append(f"Cc: {cc}")
+    if bcc:
+        message_parts.append(f"Bcc: {bcc}")
+    
+    headers = "\n".join(message_parts) + "\n\n"  # Empty line between headers and body
+    
+    return encode_raw_message(headers, body)
+
+
+def _batch_body(boundary: str, requests: List[Any]) -> bytes:
+    """multipart/mixed body wrapping each API request as an application/http part."""
+    parts = []
+    for content_id, request in requests:
+        url = urlsplit(request.uri)
+        target = url.path + (f"?{url.query}" if url.query else "")
+        parts.append(
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <{content_id}>\r\n\r\n"
+            f"{request.method} {target} HTTP/1.1\r\n"
+            "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+            f"{request.body}\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n")
+    return "".join(parts).encode("utf-8")
+
+
+def _parse_batch_response(response: httpx.Response) -> Dict[str, Tuple[int, Any]]:
+    """Map each part's Content-ID (without the 'response-' prefix) to (status, parsed JSON body)."""
+    header = f"content-type: {response.headers.get('content-type', '')}\r\n\r\n".encode("utf-8")
+    container = BytesParser(policy=compat32).parsebytes(header + response.content)
+    results = {}
+    for part in container.get_payload() if container.is_multipart() else []:
+        content_id = (part.get("Content-ID") or "").strip("<> ")
+        if content_id.startswith("response-"):
+            content_id = content_id[len("response-"):]
+        payload = part.get_payload()
+        if isinstance(payload, list):
+            payload = payload[0].as_string()
+        status_line, _, rest = payload.lstrip().partition("\n")
+        status = int(status_line.split()[1])
+        _, _, body = rest.replace("\r\n", "\n").partition("\n\n")
+        try:
+            results[content_id] = (status, json.loads(body) if body.strip() else {})
+        except ValueError:
+            results[content_id] = (status, {"error": {"message": body.strip()[:200]}})
+    return results
+
+
+def _part_error(body: Any) -> str:
+    error = body.get("error") if isinstance(body, dict) else None
+    if isinstance(error, dict):
+        return error.get("message") or str(error)
+    return str(error or body)
+
 
 class GmailClient:
     """Client for interacting with Gmail API using OAuth 2.0."""
     
-    def __init__(self, access_token: Optional[str] = None, user_id: str = "default"):
+    def __init__(
+        self,
+        access_token: Optional[str] = None,
+        user_id: str = "default",
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         """
         Initialize Gmail client.
         
         Args:
             access_token: OAuth access token from the agent (on-behalf-of flow)
             user_id: User identifier for token storage
+            http_client: Explicit HTTP client (e.g. for tests); defaults to the shared pooled client
         """
         self.user_id = user_id
         self.credentials = None
+        self._http_client = http_client
         
         if access_token:
             # Use token provided by agent (on-behalf-of flow)
@@ -39,8 +197,12 @@ class GmailClient:
                 scopes=GMAIL_SCOPES
             )
         else:
-            # Try to load stored token
+            # Try to load stored token (refreshed on first use if expired)
             self._load_credentials()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
     
     def _load_credentials(self) -> None:
         """Load credentials from storage."""
@@ -51,17 +213,6 @@ class GmailClient:
                 token_data,
                 GMAIL_SCOPES
             )
-            
-            # Refresh token if expired
-            if self.credentials and self.credentials.expired and self.credentials.refresh_token:
-                try:
-                    self.credentials.refresh(Request())
-                    # Save refreshed token
-                    self._save_credentials()
-                    logger.info("Token refreshed successfully")
-                except Exception as e:
-                    logger.error(f"Failed to refresh token: {e}")
-                    self.credentials = None
     
     def _save_credentials(self) -> None:
         """Save credentials to storage."""
@@ -74,12 +225,97 @@ class GmailClient:
                 'client_secret': self.credentials.client_secret,
                 'scopes': self.credentials.scopes
             }
+            if self.credentials.expiry:
+                token_data['expiry'] = self.credentials.expiry.strftime('%Y-%m-%dT%H:%M:%SZ')
             oauth_config.save_token(token_data, self.user_id)
-    
+
+    def _can_refresh(self) -> bool:
+        return bool(self.credentials and self.credentials.refresh_token)
+
     def is_authenticated(self) -> bool:
-        """Check if client has valid credentials."""
-        return self.credentials is not None and self.credentials.valid
-    
+        """Check if client has valid credentials (or expired ones it can refresh)."""
+        if self.credentials is None:
+            return False
+        return self.credentials.valid or (self.credentials.expired and self._can_refresh())
+
+    async def refresh(self) -> None:
+        """
+        Refresh the access token with the refresh token, without blocking the event loop.
+
+        Concurrent refreshes for the same user wait for one request to Google.
+
+        Raises:
+            ValueError: If there is no refresh token
+            GmailAPIError: If Google rejects the refresh
+            CircuitOpenError: If Google's circuit is open
+        """
+        if not self._can_refresh():
+            raise ValueError("No refresh token available")
+        stale_token = self.credentials.token
+        lock = _refresh_locks.setdefault(self.user_id, asyncio.Lock())
+        async with lock:
+            if self.credentials.token != stale_token:
+                return
+            # Another client for this user may have refreshed and saved a token already
+            stored = oauth_config.load_token(self.user_id)
+            if stored and stored.get('token') not in (None, stale_token):
+                fresh = Credentials.from_authorized_user_info(stored, GMAIL_SCOPES)
+                if fresh.valid:
+                    self.credentials = fresh
+                    return
+
+            response = await google_breaker.call(lambda: self.http.post(
+                self.credentials.token_uri or GOOGLE_TOKEN_URI,
+                data={
+                    'grant_type': 'refresh_token',
+                    'refresh_token': self.credentials.refresh_token,
+                    'client_id': self.credentials.client_id or oauth_config.client_id,
+                    'client_secret': self.credentials.client_secret or oauth_config.client_secret
+                }
+            ))
+            if response.status_code != 200:
+                raise GmailAPIError(response.status_code, f"token refresh failed: {_error_message(response)}")
+
+            token_data = response.json()
+            self.credentials.token = token_data['access_token']
+            if token_data.get('expires_in'):
+                # google-auth compares expiry as naive UTC
+                now = datetime.now(timezone.utc).replace(tzinfo=None)
+                self.credentials.expiry = now + timedelta(seconds=int(token_data['expires_in']))
+            self._save_credentials()
+            logger.info("Token refreshed successfully")
+
+    async def _request(self, method: str, uri: str, content: Any, headers: Dict[str, str]) -> httpx.Response:
+        """
+        Send an authorized Google API request, refreshing the token once on 401.
+
+        Raises:
+            GmailAPIError: If Google returns an error response
+            CircuitOpenError: If Google's circuit is open
+        """
+        if self.credentials.expired and self._can_refresh():
+            await self.refresh()
+        headers = {k: v for k, v in headers.items() if k.lower() != 'content-length'}
+
+        for attempt in range(2):
+            headers['authorization'] = f"Bearer {self.credentials.token}"
+            response = await google_breaker.call(lambda: self.http.request(
+                method, uri, content=content, headers=headers
+            ))
+            if response.status_code == 401 and attempt == 0 and self._can_refresh():
+                await self.refresh()
+                continue
+            break
+
+        if response.status_code >= 400:
+            raise GmailAPIError(response.status_code, _error_message(response))
+        return response
+
+    async def _execute(self, request) -> Dict[str, Any]:
+        """Send a Gmail API request described by the discovery resource and return its JSON."""
+        response = await self._request(request.method, request.uri, request.body, request.headers)
+        return response.json()
+
     def set_token(self, token_data: Dict[str, Any]) -> None:
         """
         Set OAuth token from agent.
@@ -136,7 +372,8 @@ class GmailClient:
             
         Raises:
             ValueError: If not authenticated
-            HttpError: If Gmail API request fails
+            GmailAPIError: If Gmail API request fails
+            CircuitOpenError: If Google's circuit is open
         """
         if not self.is_authenticated():
             raise ValueError(
@@ -144,41 +381,13 @@ class GmailClient:
             )
         
         try:
-            # Build Gmail service
-            service = build('gmail', 'v1', credentials=self.credentials)
-            
-            # Create message
-            message_parts = [
-                f"To: {to}",
-                f"Subject: {subject}",
-                "MIME-Version: 1.0",
-            ]
-            
-            if is_html:
-                message_parts.append("Content-Type: text/html; charset=utf-8")
-            else:
-                message_parts.append("Content-Type: text/plain; charset=utf-8")
-            
-            if cc:
-                message_parts.append(f"Cc: {cc}")
-            if bcc:
-                message_parts.append(f"Bcc: {bcc}")
-            
-            message_parts.append("")  # Empty line between headers and body
-            message_parts.append(body)
-            
-            raw_message = "\n".join(message_parts)
-            
-            # Encode message
-            encoded_message = base64.urlsafe_b64encode(
-                raw_message.encode('utf-8')
-            ).decode('utf-8')
+            encoded_message = build_raw_message(to, subject, body, cc=cc, bcc=bcc, is_html=is_html)
             
             # Send message
-            message = service.users().messages().send(
+            message = await self._execute(gmail_messages().send(
                 userId='me',
                 body={'raw': encoded_message}
-            ).execute()
+            ))
             
             logger.info(f"Email sent successfully. Message ID: {message['id']}")
             
@@ -189,13 +398,121 @@ class GmailClient:
                 "subject": subject
             }
             
-        except HttpError as error:
+        except GmailAPIError as error:
             logger.error(f"Gmail API error: {error}")
             raise
         except Exception as error:
             logger.error(f"Error sending email: {error}")
             raise
     
+    async def send_emails(
+        self,
+        messages: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Send many emails through Gmail's batch endpoint.
+        
+        Messages go out in batches of up to 100 (GMAIL_BATCH_SIZE), with
+        GMAIL_BATCH_INTERVAL seconds between batches to stay under Gmail's
+        per-user sending rate. A failed message doesn't stop the others.
+        
+        Args:
+            messages: Dicts with to, subject, body and optional cc, bcc, is_html
+            batch_size: Messages per batch request (capped at 100)
+            interval: Seconds to wait between batch requests
+            
+        Returns:
+            One result per message, in input order, with status "sent" and
+            message_id, or status "error", error, error_code and retryable
+            
+        Raises:
+            ValueError: If not authenticated
+        """
+        if not self.is_authenticated():
+            raise ValueError(
+                "Not authenticated. Please provide an OAuth token or complete authentication flow."
+            )
+        if batch_size is None:
+            batch_size = int(os.getenv("GMAIL_BATCH_SIZE", str(GMAIL_BATCH_MAX)))
+        batch_size = max(1, min(batch_size, GMAIL_BATCH_MAX))
+        if interval is None:
+            interval = float(os.getenv("GMAIL_BATCH_INTERVAL", "1.0"))
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+        for start in range(0, len(messages), batch_size):
+            if start:
+                await asyncio.sleep(interval)
+            await self._send_batch(messages, range(start, min(start + batch_size, len(messages))), results)
+        
+        sent = sum(1 for r in results if r["status"] == "sent")
+        logger.info(f"Batch send finished: {sent} sent, {len(results) - sent} failed")
+        return results
+    
+    @staticmethod
+    def _failure(index: int, message: Dict[str, Any], code: Optional[int], error: str) -> Dict[str, Any]:
+        return {
+            "index": index,
+            "to": message.get("to"),
+            "status": "error",
+            "error": error,
+            "error_code": code,
+            "retryable": code is None or code in RETRYABLE_STATUS_CODES
+        }
+    
+    async def _send_batch(self, messages: List[Dict[str, Any]], indexes, results: List[Any]) -> None:
+        """Send one batch request, filling in results for its messages; retries 401 parts once after a refresh."""
+        pending: Dict[str, Tuple[int, Any]] = {}
+        for i in indexes:
+            message = messages[i]
+            missing = [field for field in ("to", "subject", "body") if not message.get(field)]
+            if missing:
+                results[i] = self._failure(i, message, 400, f"Missing field: {', '.join(missing)}")
+                continue
+            raw = build_raw_message(
+                message["to"], message["subject"], message["body"],
+                cc=message.get("cc"), bcc=message.get("bcc"), is_html=message.get("is_html", True)
+            )
+            pending[f"item-{i}"] = (i, gmail_messages().send(userId='me', body={'raw': raw}))
+        
+        for attempt in range(2):
+            if not pending:
+                return
+            boundary = f"batch_{secrets.token_hex(12)}"
+            try:
+                response = await self._request(
+                    "POST", GMAIL_BATCH_URI,
+                    _batch_body(boundary, [(content_id, request) for content_id, (_, request) in pending.items()]),
+                    {"content-type": f"multipart/mixed; boundary={boundary}"}
+                )
+                parts = _parse_batch_response(response)
+            except Exception as error:
+                logger.error(f"Gmail batch request failed: {error}")
+                for i, _ in pending.values():
+                    results[i] = self._failure(i, messages[i], getattr(error, "status_code", None), str(error))
+                return
+            
+            unauthorized = {}
+            for content_id, (i, request) in pending.items():
+                status, body = parts.get(content_id, (502, {"error": {"message": "No response for this message in the batch"}}))
+                if status == 401 and attempt == 0 and self._can_refresh():
+                    unauthorized[content_id] = (i, request)
+                elif status < 300:
+                    results[i] = {"index": i, "to": messages[i]["to"], "status": "sent", "message_id": body.get("id")}
+                else:
+                    results[i] = self._failure(i, messages[i], status, _part_error(body))
+            
+            if not unauthorized:
+                return
+            try:
+                await self.refresh()
+            except Exception as error:
+                for i, _ in unauthorized.values():
+                    results[i] = self._failure(i, messages[i], 401, f"Token refresh failed: {error}")
+                return
+            pending = unauthorized
+    
     def get_auth_url(self) -> str:
         """
         Get OAuth authorization URL for user to authenticate.
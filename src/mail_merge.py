@@ -0,0 +1,116 @@
+"""
+Mail-merge templates for the themed emails.
+
+A template is HTML (or a subject line) with `{{ name }}` slots, optionally
+with a default: `{{ candidate_name | there }}`. Each template is compiled once
+into a str.format pattern, so rendering a personalized copy is a single
+C-level format call over pre-escaped values. Values are HTML-escaped in bodies
+and have line breaks folded in subjects (no header injection). Compiled
+templates are cached by key and recompiled when the template text changes.
+
+Rendered text remembers its segments (static template text alternating with
+the merged values), so the message encoder can reuse cached encodings of the
+static parts.
+"""
+import re
+import html
+from typing import Optional, Dict, Any, Callable, Hashable, Tuple
+
+# {{ name }} or {{ name | default text }}
+_SLOT = re.compile(r"\{\{\s*(\w+)\s*(?:\|\s*(.*?)\s*)?\}\}")
+
+
+def escape_html(value: str) -> str:
+    return html.escape(value, quote=True)
+
+
+def escape_header(value: str) -> str:
+    """Fold line breaks so a value can't end a header line."""
+    return " ".join(value.splitlines())
+
+
+class MergedText(str):
+    """
+    Rendered template text.
+
+    segments holds the static template text at even indexes and the
+    merged-in (escaped) values at odd indexes; joined, they are the text.
+    """
+
+    segments: Tuple[str, ...]
+
+
+def _merged(text: str, segments: Tuple[str, ...]) -> MergedText:
+    merged = MergedText(text)
+    merged.segments = segments
+    return merged
+
+
+class CompiledTemplate:
+    """A template compiled to a format pattern with one positional field per slot."""
+
+    __slots__ = ("source", "slots", "_statics", "_defaults", "_format", "_escape", "_unchanged")
+
+    def __init__(self, source: str, escape: Callable[[str], str] = escape_html):
+        pieces = []
+        statics = []
+        slots = []
+        defaults = []
+        position = 0
+        for match in _SLOT.finditer(source):
+            statics.append(source[position:match.start()])
+            pieces.append(statics[-1].replace("{", "{{").replace("}", "}}"))
+            pieces.append(f"{{{len(slots)}}}")
+            slots.append(match.group(1))
+            defaults.append(escape(match.group(2) or ""))
+            position = match.end()
+        statics.append(source[position:])
+        pieces.append(statics[-1].replace("{", "{{").replace("}", "}}"))
+
+        self.source = source
+        self.slots = tuple(slots)
+        self._statics = tuple(statics)
+        self._defaults = tuple(defaults)
+        self._format = "".join(pieces).format
+        self._escape = escape
+        self._unchanged = _merged(source, (source,))
+
+    def render(self, values: Optional[Dict[str, Any]] = None) -> MergedText:
+        """Fill the slots from values (escaped); missing or empty values use the slot default."""
+        if not self.slots:
+            return self._unchanged
+        values = values or {}
+        escape = self._escape
+        filled = [
+            escape(str(value)) if (value := values.get(name)) not in (None, "") else default
+            for name, default in zip(self.slots, self._defaults)
+        ]
+        segments = [None] * (2 * len(filled) + 1)
+        segments[0::2] = self._statics
+        segments[1::2] = filled
+        return _merged(self._format(*filled), tuple(segments))
+
+
+class TemplateCache:
+    """Compiled templates by key, recompiled whenever a key's template text changes."""
+
+    def __init__(self):
+        self._compiled: Dict[Hashable, CompiledTemplate] = {}
+        self.hits = 0
+        self.compiles = 0
+
+    def get(self, key: Hashable, source: str, escape: Callable[[str], str] = escape_html) -> CompiledTemplate:
+        compiled = self._compiled.get(key)
+        if compiled is not None and compiled.source == source:
+            self.hits += 1
+            return compiled
+        compiled = self._compiled[key] = CompiledTemplate(source, escape)
+        self.compiles += 1
+        return compiled
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"templates": len(self._compiled), "hits": self.hits, "compiles": self.compiles}
+
+
+# Shared by every email tool
+template_cache = TemplateCache()
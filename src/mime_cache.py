@@ -0,0 +1,123 @@
+"""
+Base64url encoding of Gmail raw messages, with cached template segments.
+
+A raw message is the RFC 2822 headers followed by the HTML body, base64url
+encoded as a whole. Bodies rendered from a mail-merge template are mostly
+static template text, so the encoding of each static segment is computed
+once and cached; a message is then assembled by encoding only the headers
+and the merged-in values and splicing them between the cached segments.
+
+Base64 works on 3-byte groups, so a cached segment keeps its encoding for
+each of the three alignments it can start at, and the one group straddling
+each splice point is encoded per message. The result is byte-for-byte what
+encoding the whole message at once gives.
+"""
+from binascii import b2a_base64
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
+
+# Shorter static segments are cheaper to encode inline than to look up and splice
+MIN_CACHED_SEGMENT = 512
+# Bodies whose cached static text is a smaller share are cheaper to encode in one go
+MIN_CACHED_SHARE = 0.5
+
+
+_URLSAFE = bytes.maketrans(b"+/", b"-_")
+
+
+def _b64(data: bytes) -> bytes:
+    return b2a_base64(data, newline=False).translate(_URLSAFE)
+
+
+class EncodedSegment:
+    """Static text with its base64url encoding cached per alignment."""
+
+    __slots__ = ("data", "_aligned")
+
+    def __init__(self, text: str):
+        self.data = text.encode("utf-8")
+        self._aligned: List[Optional[Tuple[bytes, bytes]]] = [None, None, None]
+
+    def aligned(self, skip: int) -> Tuple[bytes, bytes]:
+        """Encoding of the whole 3-byte groups after the first skip bytes, and the leftover bytes."""
+        cached = self._aligned[skip]
+        if cached is None:
+            end = skip + (len(self.data) - skip) // 3 * 3
+            cached = self._aligned[skip] = (_b64(self.data[skip:end]), self.data[end:])
+        return cached
+
+
+def encode_pieces(pieces: Iterable[Union[bytes, EncodedSegment]]) -> str:
+    """base64url-encode the concatenation of pieces, reusing cached segment encodings."""
+    out = []
+    pending = bytearray()  # bytes since the last cached segment, encoded together
+    for piece in pieces:
+        if type(piece) is EncodedSegment:
+            # Borrow enough of the segment to end pending on a whole 3-byte group
+            skip = -len(pending) % 3
+            if len(piece.data) > skip:
+                pending += piece.data[:skip]
+                out.append(_b64(pending))
+                encoded, tail = piece.aligned(skip)
+                out.append(encoded)
+                pending = bytearray(tail)
+                continue
+            piece = piece.data
+        pending += piece
+    out.append(_b64(pending))
+    return b"".join(out).decode("ascii")
+
+
+class SegmentCache:
+    """Encoded static segments by text, least recently used evicted past max_segments."""
+
+    def __init__(self, max_segments: int = 256):
+        self.max_segments = max_segments
+        self._segments: "OrderedDict[str, EncodedSegment]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> EncodedSegment:
+        segment = self._segments.get(text)
+        if segment is not None:
+            self.hits += 1
+            self._segments.move_to_end(text)
+            return segment
+        self.misses += 1
+        segment = self._segments[text] = EncodedSegment(text)
+        if len(self._segments) > self.max_segments:
+            self._segments.popitem(last=False)
+        return segment
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"segments": len(self._segments), "hits": self.hits, "misses": self.misses}
+
+
+# Shared by every email path
+segment_cache = SegmentCache()
+
+
+def encode_raw_message(headers: str, body: str) -> str:
+    """
+    base64url-encode headers + body for the Gmail 'raw' field.
+
+    Bodies rendered from a mail-merge template carry their segments
+    (static template text alternating with merged values); the static
+    segments come from the cache. Any other body, or one that is mostly
+    merged values and short static runs, is encoded in full.
+    """
+    segments = getattr(body, "segments", None)
+    cached = 0
+    if segments is not None:
+        for text in segments[::2]:
+            if len(text) >= MIN_CACHED_SEGMENT:
+                cached += len(text)
+    if cached < len(body) * MIN_CACHED_SHARE:
+        return _b64((headers + body).encode("utf-8")).decode("ascii")
+    pieces: List[Union[bytes, EncodedSegment]] = [headers.encode("utf-8")]
+    for i, text in enumerate(segments):
+        if i % 2 == 0 and len(text) >= MIN_CACHED_SEGMENT:
+            pieces.append(segment_cache.get(text))
+        else:
+            pieces.append(text.encode("utf-8"))
+    return encode_pieces(pieces)
@@ -0,0 +1,397 @@
+"""
+Local SQLite mirror of Lever candidates (opportunities).
+
+A background job pulls only records changed since the last sync watermark
+(Lever's `updated_at_start` filter) and upserts them into SQLite. Read tools
+serve from the mirror while the last successful sync is within the configured
+staleness bound, and fall back to the live API otherwise.
+"""
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable
+
+# Import with fallback for cloud deployment
+try:
+    from .search import CandidateSearchIndex, resume_text
+    from .analytics import PipelineAnalytics
+except ImportError:
+    from search import CandidateSearchIndex, resume_text
+    from analytics import PipelineAnalytics
+
+logger = logging.getLogger(__name__)
+
+# Offsets handed out by the mirror are prefixed so they are never sent to Lever
+MIRROR_OFFSET_PREFIX = "m:"
+
+# Applications are inlined so records carry their posting IDs for pipeline stats
+SYNC_EXPAND = ["applications"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    created_at INTEGER,
+    updated_at INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates (created_at DESC, id);
+CREATE INDEX IF NOT EXISTS idx_candidates_updated ON candidates (updated_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class CandidateMirror:
+    """SQLite-backed copy of Lever candidate records."""
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Open (or create) the mirror database.
+
+        Args:
+            path: SQLite file path, or ':memory:' for a process-local mirror
+        """
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.search_index = CandidateSearchIndex(self.conn)
+        self.conn.commit()
+
+        # Pipeline stats run in a worker thread. A file mirror gives them a read-only
+        # connection, which under WAL sees only committed writes; an in-memory mirror has
+        # a single connection, so stats and writes hold the lock while they use it.
+        self._lock = threading.RLock()
+        self.read_conn: Optional[sqlite3.Connection] = None
+        if path != ":memory:":
+            self.read_conn = sqlite3.connect(
+                Path(path).resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False
+            )
+        self.analytics = PipelineAnalytics(self.conn, read_conn=self.read_conn)
+        self._backfill_search_index()
+        self._backfill_analytics()
+
+    def close(self) -> None:
+        if self.read_conn is not None:
+            self.read_conn.close()
+        self.conn.close()
+
+    # Sync state
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_state(self, key: str, value: Any) -> None:
+        self.conn.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value))
+        )
+
+    @property
+    def watermark(self) -> Optional[int]:
+        """Highest Lever updatedAt (ms since epoch) seen by a sync."""
+        value = self._get_state("watermark")
+        return int(value) if value else None
+
+    @property
+    def last_synced_at(self) -> Optional[float]:
+        """Wall-clock time of the last successful sync."""
+        value = self._get_state("last_synced_at")
+        return float(value) if value else None
+
+    def is_fresh(self, max_staleness: float) -> bool:
+        last = self.last_synced_at
+        return last is not None and time.time() - last <= max_staleness
+
+    def mark_synced(self, watermark: Optional[int]) -> None:
+        with self._lock:
+            if watermark is not None:
+                self._set_state("watermark", watermark)
+            self._set_state("last_synced_at", time.time())
+            self.conn.commit()
+
+    # Records
+
+    def _rowid(self, candidate_id: str) -> Optional[int]:
+        row = self.conn.execute("SELECT rowid FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+        return row[0] if row else None
+
+    def _backfill_search_index(self) -> None:
+        """Index mirror rows written before the search index existed."""
+        indexed = self.conn.execute("SELECT COUNT(*) FROM candidate_search").fetchone()[0]
+        if indexed >= self.count():
+            return
+        logger.info("Rebuilding candidate search index from mirror")
+        self.conn.execute("DELETE FROM candidate_search")
+        for row in self.conn.execute("SELECT rowid, data FROM candidates").fetchall():
+            self.search_index.index(row[0], json.loads(row[1]), resume="")
+        self.conn.commit()
+
+    def _backfill_analytics(self) -> None:
+        """Index postings of mirror rows written before pipeline stats existed."""
+        if self._get_state("analytics_indexed"):
+            return
+        self.analytics.backfill(self.conn.execute("SELECT id, data FROM candidates").fetchall())
+        self._set_state("analytics_indexed", 1)
+        self.conn.commit()
+        self.analytics.committed()
+
+    def upsert_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace records (and their search entries), returning how many were written."""
+        written = 0
+        with self._lock:
+            for record in records:
+                candidate_id = record.get("id")
+                if not candidate_id:
+                    continue
+                self.conn.execute(
+                    "INSERT INTO candidates (id, name, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET name = excluded.name, created_at = excluded.created_at, "
+                    "updated_at = excluded.updated_at, data = excluded.data",
+                    (
+                        candidate_id,
+                        record.get("name"),
+                        record.get("createdAt"),
+                        record.get("updatedAt"),
+                        json.dumps(record, separators=(",", ":"))
+                    )
+                )
+                self.search_index.index(self._rowid(candidate_id), record)
+                self.analytics.index(candidate_id, record)
+                written += 1
+            self.conn.commit()
+            self.analytics.committed()
+        return written
+
+    def set_resume_text(self, candidate_id: str, text: str) -> None:
+        """Attach parsed resume text to a mirrored candidate's search entry."""
+        with self._lock:
+            rowid = self._rowid(candidate_id)
+            record = self.get_candidate(candidate_id)
+            if rowid is None or record is None:
+                return
+            self.search_index.index(rowid, record, resume=text)
+            self.conn.commit()
+
+    def delete(self, candidate_id: str) -> bool:
+        with self._lock:
+            rowid = self._rowid(candidate_id)
+            if rowid is None:
+                return False
+            self.search_index.remove(rowid)
+            self.analytics.remove(candidate_id)
+            self.conn.execute("DELETE FROM candidates WHERE rowid = ?", (rowid,))
+            self.conn.commit()
+            self.analytics.committed()
+        return True
+
+    def search(self, query: str, limit: int = 20, match_all: bool = False) -> List[Dict[str, Any]]:
+        """Full-text search over mirrored candidates, best match first."""
+        return self.search_index.search(query, limit=limit, match_all=match_all)
+
+    def pipeline_stats(self, posting_id: Optional[str] = None) -> Dict[str, Any]:
+        """Funnel, time-in-stage and source stats for a posting (or all candidates)."""
+        if self.read_conn is not None:
+            return self.analytics.stats(posting_id)
+        with self._lock:
+            return self.analytics.stats(posting_id)
+
+    def get_candidate(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT data FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def list_candidates(self, limit: int = 10, offset: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return a page shaped like Lever's list response.
+
+        Args:
+            limit: Records per page
+            offset: Mirror offset token from a previous page's 'next'
+
+        Returns:
+            Dict with 'data', 'hasNext' and (when more remain) 'next'
+
+        Raises:
+            ValueError: If offset is not a mirror offset (e.g. a live Lever cursor)
+        """
+        start = 0
+        if offset:
+            if not offset.startswith(MIRROR_OFFSET_PREFIX):
+                raise ValueError(f"Offset {offset!r} is a Lever cursor, not a mirror offset")
+            start = int(offset[len(MIRROR_OFFSET_PREFIX):] or 0)
+
+        rows = self.conn.execute(
+            "SELECT data FROM candidates ORDER BY created_at DESC, id LIMIT ? OFFSET ?",
+            (limit + 1, start)
+        ).fetchall()
+        has_next = len(rows) > limit
+        page = {"data": [json.loads(row["data"]) for row in rows[:limit]], "hasNext": has_next}
+        if has_next:
+            page["next"] = f"{MIRROR_OFFSET_PREFIX}{start + limit}"
+        return page
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "records": self.count(),
+            "watermark": self.watermark,
+            "last_synced_at": self.last_synced_at,
+            "pipeline_stats": self.analytics.snapshot()
+        }
+
+
+async def _index_resumes(client, mirror: CandidateMirror, records: List[Dict[str, Any]], concurrency: int = 4) -> None:
+    """Fetch parsed resumes for changed candidates and add them to the search index."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(candidate_id: str) -> None:
+        async with semaphore:
+            try:
+                resumes = await client.get_candidate_resumes(candidate_id)
+            except Exception as e:
+                logger.warning(f"Could not fetch resumes for {candidate_id}: {e}")
+                return
+        mirror.set_resume_text(candidate_id, resume_text(resumes.get("data", [])))
+
+    await asyncio.gather(*(fetch(r["id"]) for r in records if r.get("id")))
+
+
+async def sync_mirror(
+    client,
+    mirror: CandidateMirror,
+    page_size: int = 100,
+    index_resumes: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    Pull candidates changed since the mirror's watermark and upsert them.
+
+    The first sync (no watermark) pulls everything. The watermark is only
+    advanced once every page has been written, so an interrupted sync simply
+    repeats from the previous watermark.
+
+    Args:
+        client: LeverClient used to fetch pages
+        mirror: Mirror to update
+        page_size: Records per upstream request
+        index_resumes: Also fetch parsed resumes of changed candidates for search
+            (one extra request per candidate; defaults to LEVER_SEARCH_INDEX_RESUMES)
+
+    Returns:
+        Sync summary with record count and new watermark
+    """
+    if index_resumes is None:
+        index_resumes = os.getenv("LEVER_SEARCH_INDEX_RESUMES", "").lower() in ("1", "true", "yes")
+
+    start = time.monotonic()
+    since = mirror.watermark
+    watermark = since
+    written = 0
+
+    async for page in client.iter_candidate_pages(page_size=page_size, updated_at_start=since, expand=SYNC_EXPAND):
+        records = page.get("data", [])
+        written += mirror.upsert_many(records)
+        if index_resumes:
+            await _index_resumes(client, mirror, records)
+        for record in records:
+            updated_at = record.get("updatedAt")
+            if updated_at is not None and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+
+    mirror.mark_synced(watermark)
+    summary = {
+        "records": written,
+        "since": since,
+        "watermark": watermark,
+        "seconds": round(time.monotonic() - start, 3)
+    }
+    logger.info(f"Mirror sync complete: {summary}")
+    return summary
+
+
+class MirrorSyncJob:
+    """Periodically runs sync_mirror in the background."""
+
+    def __init__(self, mirror: CandidateMirror, client_factory, interval: float = 60.0):
+        """
+        Args:
+            mirror: Mirror to keep in sync
+            client_factory: Zero-argument callable returning a LeverClient
+            interval: Seconds between syncs
+        """
+        self.mirror = mirror
+        self.client_factory = client_factory
+        self.interval = interval
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await sync_mirror(self.client_factory(), self.mirror)
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Mirror sync failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Process-wide mirror, configured by LEVER_MIRROR_PATH
+_mirror: Optional[CandidateMirror] = None
+
+
+def get_mirror() -> Optional[CandidateMirror]:
+    """Return the configured mirror, or None when LEVER_MIRROR_PATH is not set."""
+    global _mirror
+    if _mirror is None:
+        path = os.getenv("LEVER_MIRROR_PATH")
+        if not path:
+            return None
+        _mirror = CandidateMirror(path)
+        logger.info(f"Lever mirror database: {path}")
+    return _mirror
+
+
+def mirror_max_staleness() -> float:
+    """Seconds since the last sync for which the mirror may serve reads."""
+    return float(os.getenv("LEVER_MIRROR_MAX_STALENESS", "300"))
+
+
+def get_fresh_mirror() -> Optional[CandidateMirror]:
+    """Return the mirror if it is configured and within the staleness bound."""
+    mirror = get_mirror()
+    if mirror is not None and mirror.is_fresh(mirror_max_staleness()):
+        return mirror
+    return None
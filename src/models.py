@@ -0,0 +1,142 @@
+"""
+Compact typed records for Lever candidates (opportunities) and requisitions.
+
+Each model holds only the documented Lever fields; anything else in a
+response is dropped at decode time. With msgspec installed the models are
+msgspec Structs and response bytes are decoded straight into them in C,
+skipping unknown fields without building dicts for them. Without it they are
+plain `__slots__` classes filled from json.loads output. Both expose the same
+attributes and the same helpers (decode, decode_page, from_dict, to_dict), so
+callers don't care which is in use.
+"""
+import json
+from typing import Optional, Dict, Any, List, Union
+
+try:
+    import msgspec
+except ImportError:  # Optional speedup: pip install msgspec
+    msgspec = None
+
+# Lever opportunity fields (the legacy /candidates endpoint returns the same shape)
+CANDIDATE_FIELDS = (
+    "id", "name", "headline", "contact", "emails", "phones", "confidentiality",
+    "location", "links", "createdAt", "updatedAt", "lastInteractionAt",
+    "lastAdvancedAt", "snoozedUntil", "archivedAt", "archiveReason", "stage",
+    "stageChanges", "owner", "tags", "sources", "origin", "sourcedBy",
+    "applications", "resume", "followers", "urls", "dataProtection",
+    "isAnonymized", "archived", "deletedAt", "deletedBy"
+)
+
+REQUISITION_FIELDS = (
+    "id", "requisitionCode", "name", "backfill", "confidentiality", "createdAt",
+    "updatedAt", "creator", "headcountHired", "headcountInfinite",
+    "headcountTotal", "hiringManager", "owner", "status", "location", "team",
+    "department", "offerIds", "postings", "compensationBand",
+    "employmentStatus", "internalNotes", "customFields", "approval",
+    "timeToFillStartAt", "timeToFillEndAt", "closedAt"
+)
+
+Body = Union[bytes, bytearray, str, Dict[str, Any]]
+
+
+class _SlottedModel:
+    """Fallback model: one slot per field, unset fields are None."""
+
+    __slots__ = ()
+    FIELDS: tuple = ()
+
+    def __init__(self, **values: Any):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.FIELDS if getattr(self, f) is not None)
+        return f"{type(self).__name__}({values})"
+
+
+def _define(name: str, fields: tuple):
+    if msgspec is not None:
+        # gc=False: records hold only JSON values, so they can't form reference cycles
+        return msgspec.defstruct(name, [(f, Any, None) for f in fields], omit_defaults=True, gc=False)
+    return type(name, (_SlottedModel,), {"__slots__": fields, "FIELDS": fields})
+
+
+Candidate = _define("Candidate", CANDIDATE_FIELDS)
+Requisition = _define("Requisition", REQUISITION_FIELDS)
+
+# Lever calls candidates "opportunities" in the current API
+Opportunity = Candidate
+
+_FIELDS = {Candidate: CANDIDATE_FIELDS, Requisition: REQUISITION_FIELDS}
+
+if msgspec is not None:
+    def _envelope(model):
+        return msgspec.defstruct(f"{model.__name__}Envelope", [("data", Optional[model], None)])
+
+    def _page(model):
+        return msgspec.defstruct(
+            f"{model.__name__}Page",
+            [("data", List[model], []), ("hasNext", Any, False), ("next", Any, None)]
+        )
+
+    _decoders = {
+        model: (msgspec.json.Decoder(_envelope(model)), msgspec.json.Decoder(_page(model)))
+        for model in _FIELDS
+    }
+
+
+def from_dict(model, data: Dict[str, Any]):
+    """Build a model from a parsed record, dropping unknown fields."""
+    if msgspec is not None:
+        return msgspec.convert(data, model)
+    return model(**{f: data[f] for f in model.FIELDS if f in data})
+
+
+def to_dict(record) -> Dict[str, Any]:
+    """Plain dict of a model's set fields, in Lever's field order."""
+    if msgspec is not None:
+        return msgspec.to_builtins(record)
+    return {f: v for f in record.FIELDS if (v := getattr(record, f)) is not None}
+
+
+def _parse(body: Body) -> Dict[str, Any]:
+    return body if isinstance(body, dict) else json.loads(body)
+
+
+def decode(body: Body, model):
+    """
+    Decode a single-record response ({"data": {...}}) into a model.
+
+    Args:
+        body: Raw response bytes, or an already parsed response
+
+    Returns:
+        The model, or None if the response has no data
+    """
+    if msgspec is not None and not isinstance(body, dict):
+        return _decoders[model][0].decode(body).data
+    data = _parse(body).get("data")
+    return from_dict(model, data) if data is not None else None
+
+
+def decode_page(body: Body, model) -> Dict[str, Any]:
+    """
+    Decode a list response into {"data": [models], "hasNext", "next"}.
+
+    Args:
+        body: Raw response bytes, or an already parsed response
+    """
+    if msgspec is not None and not isinstance(body, dict):
+        page = _decoders[model][1].decode(body)
+        records, has_next, next_offset = page.data, page.hasNext, page.next
+    else:
+        parsed = _parse(body)
+        records = [from_dict(model, r) for r in parsed.get("data") or []]
+        has_next, next_offset = parsed.get("hasNext", False), parsed.get("next")
+    result = {"data": records, "hasNext": has_next}
+    if next_offset is not None:
+        result["next"] = next_offset
+    return result
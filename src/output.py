@@ -0,0 +1,141 @@
+"""
+Tool output helpers.
+
+Lever payloads are large and deeply nested. Tools serialize them as compact
+JSON (no indentation or padding, UTF-8 kept as-is); field selection lives in
+projection.py.
+
+Each tool also has an output byte budget. List-style tools serialize records
+one at a time, keep as many as fit, and hand back an opaque continuation
+cursor that resumes at the first record that was left out. Every response's
+size is recorded so it shows up in /metrics.
+"""
+import os
+import json
+import base64
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default per-tool output budget in bytes (override with LEVER_OUTPUT_BUDGET[_<TOOL>])
+DEFAULT_OUTPUT_BUDGET = 65536
+
+# Continuation cursors are prefixed so they can't be confused with Lever or mirror offsets
+CURSOR_PREFIX = "c:"
+
+
+def to_json(value: Any) -> str:
+    """Serialize a tool response as compact JSON."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def output_budget(tool: str) -> int:
+    """Byte budget for a tool's response, e.g. LEVER_OUTPUT_BUDGET_LIST_CANDIDATES."""
+    value = os.getenv(f"LEVER_OUTPUT_BUDGET_{tool.upper()}") or os.getenv("LEVER_OUTPUT_BUDGET")
+    return int(value) if value else DEFAULT_OUTPUT_BUDGET
+
+
+def encode_cursor(offset: Optional[str], skip: int = 0) -> str:
+    """
+    Build an opaque cursor: re-read the page at `offset` and skip `skip` records.
+
+    `offset` is whatever produced the page: a Lever token, a mirror offset,
+    or, for a first page, "" (Lever) or None (source not recorded).
+    """
+    raw = to_json([offset, skip]).encode("utf-8")
+    return CURSOR_PREFIX + base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[Optional[str], int]:
+    """
+    Split a cursor into (upstream offset, records to skip).
+
+    Plain Lever/mirror offsets pass through with a skip of 0.
+
+    Raises:
+        ValueError: If a continuation cursor is malformed
+    """
+    if not cursor or not cursor.startswith(CURSOR_PREFIX):
+        return cursor or None, 0
+    payload = cursor[len(CURSOR_PREFIX):]
+    try:
+        offset, skip = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return offset, int(skip)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid continuation cursor: {cursor}") from e
+
+
+def fit_records(records: List[Any], budget: int, at_least_one: bool = True) -> Tuple[List[str], int]:
+    """
+    Serialize records until the next one would exceed the budget.
+
+    With at_least_one, the first record is kept even if it alone is over
+    budget, so a caller paging through results always makes progress.
+
+    Returns:
+        (JSON fragments for the records that fit, bytes they use)
+    """
+    parts = []
+    used = 0
+    for record in records:
+        part = to_json(record)
+        size = len(part.encode("utf-8")) + 1  # separating comma
+        if used + size > budget and (parts or not at_least_one):
+            break
+        parts.append(part)
+        used += size
+    return parts, used
+
+
+def render_records(envelope: Dict[str, Any], key: str, parts: List[str]) -> str:
+    """Serialize envelope with pre-serialized record fragments under `key`."""
+    head = to_json({**{k: v for k, v in envelope.items() if k != key}, key: []})
+    # The records key is serialized last, so the document ends with '[]}'
+    return head[:-3] + "[" + ",".join(parts) + "]}"
+
+
+def envelope_size(envelope: Dict[str, Any], key: str) -> int:
+    """Bytes used by an envelope around an empty record list."""
+    return len(render_records(envelope, key, []).encode("utf-8"))
+
+
+class OutputStats:
+    """Per-tool response size counters."""
+
+    def __init__(self):
+        self.responses = 0
+        self.total_bytes = 0
+        self.max_bytes = 0
+        self.truncated = 0
+
+    def record(self, size: int, truncated: bool) -> None:
+        self.responses += 1
+        self.total_bytes += size
+        self.max_bytes = max(self.max_bytes, size)
+        if truncated:
+            self.truncated += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "avg_bytes": self.total_bytes // self.responses if self.responses else 0,
+            "max_bytes": self.max_bytes,
+            "truncated_responses": self.truncated
+        }
+
+
+_output_stats: Dict[str, OutputStats] = {}
+
+
+def record_output(tool: str, text: str, truncated: bool = False) -> str:
+    """Measure a tool response, log oversized ones, and return it unchanged."""
+    size = len(text.encode("utf-8"))
+    _output_stats.setdefault(tool, OutputStats()).record(size, truncated)
+    if size > output_budget(tool):
+        logger.warning(f"{tool} response is {size} bytes, over its {output_budget(tool)} byte budget")
+    return text
+
+
+def output_metrics() -> Dict[str, Any]:
+    return {tool: stats.snapshot() for tool, stats in _output_stats.items()}
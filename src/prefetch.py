@@ -0,0 +1,120 @@
+"""
+Speculative prefetch of candidates an agent is likely to open next.
+
+After list_candidates returns a page, the agent usually calls get_candidate
+on some of its IDs. When enabled, the first few IDs of each page are fetched
+in the background into the get_candidate cache, so those follow-up calls are
+served from memory.
+
+Prefetching never competes with foreground calls: it runs at low
+concurrency and only takes a rate-limit token when the bucket has more than
+a reserve left and nobody is waiting on it; otherwise the ID is skipped.
+"""
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Set
+
+logger = logging.getLogger(__name__)
+
+# Prefetched IDs remembered for hit-rate accounting
+_TRACKED_IDS = 4096
+
+
+class Prefetcher:
+    """Warms the candidate cache for IDs from list pages, under a concurrency and rate budget."""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        top_n: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        reserve: Optional[float] = None
+    ):
+        """
+        Args:
+            enabled: Prefetch at all (default LEVER_PREFETCH, off)
+            top_n: IDs prefetched per page (default LEVER_PREFETCH_TOP_N, 5)
+            concurrency: Prefetch requests in flight (default LEVER_PREFETCH_CONCURRENCY, 2)
+            reserve: Rate-limit tokens always left for foreground calls
+                (default LEVER_PREFETCH_RESERVE, half the bucket's burst)
+        """
+        if enabled is None:
+            enabled = os.getenv("LEVER_PREFETCH", "").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self.top_n = top_n if top_n is not None else int(os.getenv("LEVER_PREFETCH_TOP_N", "5"))
+        concurrency = concurrency if concurrency is not None else int(os.getenv("LEVER_PREFETCH_CONCURRENCY", "2"))
+        reserve_env = os.getenv("LEVER_PREFETCH_RESERVE")
+        self.reserve = reserve if reserve is not None else (float(reserve_env) if reserve_env else None)
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: Set[asyncio.Task] = set()
+        self._prefetched: "OrderedDict[str, None]" = OrderedDict()
+
+        # Metrics
+        self.scheduled = 0
+        self.fetched = 0
+        self.skipped_cached = 0
+        self.skipped_budget = 0
+        self.failed = 0
+        self.hits = 0
+
+    def schedule(self, client, candidate_ids: List[str]) -> None:
+        """Start warming the cache for the first top_n IDs; returns immediately."""
+        if not self.enabled or not client.candidate_cache.enabled:
+            return
+        for candidate_id in candidate_ids[:self.top_n]:
+            if not candidate_id:
+                continue
+            self.scheduled += 1
+            task = asyncio.create_task(self._prefetch(client, candidate_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _prefetch(self, client, candidate_id: str) -> None:
+        async with self._semaphore:
+            # peek: get_candidate_model does the counted lookup, so don't count a second one here
+            entry = client.candidate_cache.peek(candidate_id)
+            if entry is not None and entry.fresh:
+                self.skipped_cached += 1
+                return
+            bucket = client.rate_limiter
+            reserve = self.reserve if self.reserve is not None else bucket.burst / 2
+            if not bucket.has_spare(reserve):
+                self.skipped_budget += 1
+                return
+            try:
+                await client.get_candidate_model(candidate_id)
+            except Exception as e:
+                self.failed += 1
+                logger.debug(f"Prefetch of candidate {candidate_id} failed: {e}")
+                return
+        self.fetched += 1
+        self._prefetched[candidate_id] = None
+        self._prefetched.move_to_end(candidate_id)
+        if len(self._prefetched) > _TRACKED_IDS:
+            self._prefetched.popitem(last=False)
+
+    def record_request(self, candidate_id: str) -> None:
+        """Note a foreground get_candidate call, counting a hit if it was prefetched."""
+        if candidate_id in self._prefetched:
+            del self._prefetched[candidate_id]
+            self.hits += 1
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "scheduled": self.scheduled,
+            "fetched": self.fetched,
+            "skipped_cached": self.skipped_cached,
+            "skipped_budget": self.skipped_budget,
+            "failed": self.failed,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.fetched, 4) if self.fetched else 0.0,
+            "in_flight": len(self._tasks)
+        }
@@ -0,0 +1,140 @@
+"""
+Field projection for Lever payloads.
+
+A field spec is a comma-separated list of dotted paths, e.g.
+"id,name,emails,applications[*].posting,archived.reason". Lists along a path
+are mapped element-wise (the "[*]" wildcard makes that explicit). Named
+presets such as "summary" can stand in for, or be mixed with, paths.
+
+Specs are compiled once into nested closures and cached, so applying a
+projection to every record of a page is a plain function call per record.
+"""
+import re
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Callable, Union
+
+# Named field sets for common agent tasks
+PRESETS: Dict[str, List[str]] = {
+    "summary": ["id", "name", "emails", "stage", "location", "tags"],
+    "contact": ["id", "name", "emails", "phones[*].value", "links", "location", "headline"],
+    "pipeline": [
+        "id", "name", "stage", "origin", "sources", "owner", "applications",
+        "stageChanges[*].toStageId", "stageChanges[*].updatedAt",
+        "archived.reason", "archived.archivedAt", "createdAt", "updatedAt"
+    ]
+}
+
+# "[*]" / "[]" list markers; lists are always mapped element-wise, so they are sugar
+_WILDCARD_RE = re.compile(r"\[\*?\]|^\*$")
+
+# A compiled spec: a tree of dicts where True marks a selected leaf
+FieldTree = Dict[str, Union["FieldTree", bool]]
+
+
+def _parse_path(path: str) -> List[str]:
+    """Split "applications[*].posting" into ["applications", "posting"]."""
+    segments = (_WILDCARD_RE.sub("", segment) for segment in path.split("."))
+    return [segment for segment in segments if segment]
+
+
+def _expand(spec: str) -> List[str]:
+    paths = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        paths.extend(PRESETS.get(item.lower(), [item]))
+    return paths
+
+
+def _build_tree(paths: List[str]) -> FieldTree:
+    tree: FieldTree = {}
+    for path in paths:
+        node = tree
+        segments = _parse_path(path)
+        for i, segment in enumerate(segments):
+            last = i == len(segments) - 1
+            current = node.get(segment)
+            if current is True:
+                # A shorter path already selects the whole subtree
+                break
+            if last:
+                node[segment] = True
+            else:
+                node = node.setdefault(segment, {})
+    return tree
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _compile(tree: Union[FieldTree, bool]) -> Callable[[Any], Any]:
+    if tree is True:
+        return _identity
+
+    fields = [(key, _compile(subtree)) for key, subtree in tree.items()]
+
+    def project(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: fn(value[key]) for key, fn in fields if key in value}
+        if isinstance(value, list):
+            # Lists along a path are mapped element-wise
+            return [project(v) for v in value]
+        return value
+    return project
+
+
+class Projection:
+    """A compiled field spec that can be applied to records and Lever responses."""
+
+    __slots__ = ("spec", "fields", "_apply")
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        self.fields = _expand(spec)
+        self._apply = _compile(_build_tree(self.fields))
+
+    def apply(self, record: Any) -> Any:
+        """Project a single record."""
+        return self._apply(record)
+
+    def apply_many(self, records: List[Any]) -> List[Any]:
+        apply = self._apply
+        return [apply(record) for record in records]
+
+    def apply_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Project the records of a Lever response envelope.
+
+        Handles list responses ({"data": [...], "hasNext", "next"}) and
+        single-record responses ({"data": {...}}); envelope keys are kept.
+        """
+        if not isinstance(response, dict) or "data" not in response:
+            return response
+        data = response["data"]
+        data = self.apply_many(data) if isinstance(data, list) else self.apply(data)
+        return dict(response, data=data)
+
+
+@lru_cache(maxsize=256)
+def compile_projection(spec: str) -> Projection:
+    """Compile (or fetch the cached compilation of) a field spec."""
+    return Projection(spec)
+
+
+def get_projection(fields: Optional[str], default: Optional[str] = None) -> Optional[Projection]:
+    """
+    Resolve a tool's `fields` argument to a compiled projection.
+
+    Args:
+        fields: Field spec or preset name from the caller
+        default: Spec to use when fields is empty (None for the full record)
+
+    Returns:
+        Compiled projection, or None to return records unchanged
+    """
+    spec = (fields or "").strip() or default
+    if not spec or spec.lower() in ("all", "full"):
+        return None
+    return compile_projection(spec)
@@ -0,0 +1,180 @@
+"""
+Rate limiting and retry policy for Lever API calls.
+
+Lever enforces a per-API-key request rate. Every LeverClient request takes a
+token from a bucket shared by all clients using the same key, and throttled
+(429) or failed (5xx) responses are retried with jittered exponential backoff,
+honoring the Retry-After header when Lever sends one.
+"""
+import os
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: throttled or transient server-side failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Callers that
+    find the bucket empty wait in FIFO order, and the time spent waiting is
+    recorded so queueing delay is visible in metrics.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+        # Metrics
+        self.acquired = 0
+        self.queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting if necessary.
+
+        Returns:
+            Seconds spent waiting for the token
+        """
+        start = time.monotonic()
+        async with self._lock:
+            pause = self._blocked_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        if waited > 0.001:
+            self.queued += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def has_spare(self, reserve: float) -> bool:
+        """
+        Whether a token can be taken right now while leaving `reserve` for others.
+
+        Used by background work that must never delay foreground calls: it
+        is False while anyone is waiting on the bucket or it is paused.
+        """
+        if self._lock.locked() or time.monotonic() < self._blocked_until:
+            return False
+        self._refill()
+        return self.tokens >= reserve + 1
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller on this bucket, e.g. after a 429 with Retry-After."""
+        self.throttled += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "requests": self.acquired,
+            "queued_requests": self.queued,
+            "total_queue_seconds": round(self.total_wait, 3),
+            "avg_queue_seconds": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            "max_queue_seconds": round(self.max_wait, 3),
+            "throttled_responses": self.throttled,
+            "retries": self.retries
+        }
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for retryable Lever responses."""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LEVER_MAX_RETRIES", "3"))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("LEVER_RETRY_BASE_DELAY", "0.5"))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv("LEVER_RETRY_MAX_DELAY", "30"))
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before retry number `attempt` (0-based).
+
+        A Retry-After value from Lever takes precedence; otherwise "full jitter"
+        is used so parallel callers don't retry in lockstep.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# Buckets shared process-wide, keyed by a hash of the API key
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def api_key_id(api_key: str) -> str:
+    """Short, non-reversible identifier for an API key (safe to log and key metrics by)."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+def get_rate_limiter(api_key: str) -> TokenBucket:
+    """Return the token bucket shared by every client using this API key."""
+    key_id = api_key_id(api_key)
+    bucket = _buckets.get(key_id)
+    if bucket is None:
+        bucket = TokenBucket(
+            rate=float(os.getenv("LEVER_RATE_LIMIT", "10")),
+            burst=int(os.getenv("LEVER_RATE_BURST", "20"))
+        )
+        _buckets[key_id] = bucket
+    return bucket
+
+
+def rate_limit_metrics() -> Dict[str, Any]:
+    """Per-key limiter metrics, keyed by a non-reversible key id."""
+    return {key_id: bucket.snapshot() for key_id, bucket in _buckets.items()}
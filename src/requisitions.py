@@ -0,0 +1,72 @@
+"""
+Requisition payload validation for bulk creation.
+
+Every row of a hiring plan is checked locally before anything is sent to
+Lever, and each row gets a requisition code that doubles as its idempotency
+key. Unless the caller supplies a code, it is derived from the row's
+content, so re-submitting the same plan maps each row to the same code and
+never creates a duplicate.
+"""
+import hashlib
+from typing import Dict, Any, List, Tuple
+
+# Upper bound on rows accepted by a single create_requisitions_bulk call
+BULK_MAX_ROWS = 200
+
+REQUIRED_FIELDS = ("title", "location", "team")
+
+
+def requisition_code(row: Dict[str, Any]) -> str:
+    """Deterministic requisition code for a row without one."""
+    content = "\x1f".join(str(row.get(field, "")).strip().lower() for field in REQUIRED_FIELDS)
+    # Two otherwise identical openings are distinguished by an explicit 'slot'
+    content += f"\x1f{row.get('slot', 0)}"
+    return "REQ-" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:12].upper()
+
+
+def validate_requisitions(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+    """
+    Validate rows and build Lever requisition payloads.
+
+    Args:
+        rows: Dicts with 'title', 'location', 'team' and optionally
+            'headcount' (default 1), 'requisition_code' and 'slot'
+
+    Returns:
+        (payloads in row order, errors keyed by row index). Payloads are only
+        meaningful when there are no errors.
+    """
+    payloads: List[Dict[str, Any]] = []
+    errors: Dict[int, str] = {}
+    seen: Dict[str, int] = {}
+
+    if len(rows) > BULK_MAX_ROWS:
+        return [], {-1: f"At most {BULK_MAX_ROWS} requisitions per call, got {len(rows)}"}
+
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[i] = "Row must be an object"
+            continue
+        missing = [field for field in REQUIRED_FIELDS if not isinstance(row.get(field), str) or not row[field].strip()]
+        if missing:
+            errors[i] = f"Missing required field(s): {', '.join(missing)}"
+            continue
+        headcount = row.get("headcount", 1)
+        if isinstance(headcount, bool) or not isinstance(headcount, int) or headcount < 1:
+            errors[i] = "headcount must be a positive integer"
+            continue
+
+        code = str(row.get("requisition_code") or requisition_code(row)).strip()
+        if code in seen:
+            errors[i] = f"Duplicate of row {seen[code]} (requisition code {code}); set 'slot' or 'requisition_code' to open both"
+            continue
+        seen[code] = i
+
+        payloads.append({
+            "requisitionCode": code,
+            "name": row["title"].strip(),
+            "location": row["location"].strip(),
+            "team": row["team"].strip(),
+            "headcountTotal": headcount
+        })
+    return payloads, errors
@@ -0,0 +1,126 @@
+"""
+Full-text candidate search over the local mirror.
+
+Uses an SQLite FTS5 table stored alongside the mirror and ranked with BM25.
+Rows share the rowid of the mirror's candidates table, so the index is
+updated in place whenever the mirror upserts or deletes a candidate.
+"""
+import re
+import json
+import logging
+import sqlite3
+from typing import Optional, Dict, Any, List, Iterable
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS candidate_search USING fts5(
+    name, emails, tags, sources, location, headline, resume,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+# BM25 column weights, in schema order: a name match outranks a resume mention
+COLUMN_WEIGHTS = (10.0, 5.0, 4.0, 2.0, 4.0, 3.0, 1.0)
+
+# Words that carry no signal in natural-language queries like "engineers in Berlin"
+STOP_WORDS = {"a", "an", "and", "at", "for", "from", "in", "of", "on", "or", "the", "to", "with", "who", "based"}
+
+_TOKEN_RE = re.compile(r"[\w@.+-]+", re.UNICODE)
+
+
+def _join(values: Any) -> str:
+    if not values:
+        return ""
+    if isinstance(values, str):
+        return values
+    return " ".join(str(v) for v in values if v)
+
+
+def resume_text(resumes: Iterable[Dict[str, Any]]) -> str:
+    """Flatten Lever parsed resume data (positions and schools) into searchable text."""
+    parts = []
+    for resume in resumes:
+        parsed = resume.get("parsedData") or {}
+        for position in parsed.get("positions") or []:
+            parts.extend(position.get(k) or "" for k in ("title", "org", "location", "summary"))
+        for school in parsed.get("schools") or []:
+            parts.extend(school.get(k) or "" for k in ("org", "degree", "field"))
+    return " ".join(p for p in parts if p)
+
+
+def build_match_query(query: str, match_all: bool = False) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Each term is quoted so user input can't inject FTS syntax. Terms are
+    OR-ed by default so BM25 ranks candidates matching more terms first.
+    """
+    terms = [t for t in _TOKEN_RE.findall(query.lower()) if t not in STOP_WORDS]
+    if not terms:
+        return None
+    quoted = ['"' + t.replace('"', '""') + '"' for t in terms]
+    return (" AND " if match_all else " OR ").join(quoted)
+
+
+class CandidateSearchIndex:
+    """FTS5 index over candidate records, kept in the mirror's database."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.conn.executescript(SCHEMA)
+
+    def index(self, rowid: int, record: Dict[str, Any], resume: Optional[str] = None) -> None:
+        """
+        (Re)index one candidate under the mirror row's rowid.
+
+        When resume is None, previously indexed resume text is kept.
+        """
+        if resume is None:
+            row = self.conn.execute("SELECT resume FROM candidate_search WHERE rowid = ?", (rowid,)).fetchone()
+            resume = row[0] if row else ""
+        self.conn.execute("DELETE FROM candidate_search WHERE rowid = ?", (rowid,))
+        self.conn.execute(
+            "INSERT INTO candidate_search (rowid, name, emails, tags, sources, location, headline, resume) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                rowid,
+                record.get("name") or "",
+                _join(record.get("emails")),
+                _join(record.get("tags")),
+                _join(record.get("sources")),
+                _join(record.get("location")),
+                record.get("headline") or "",
+                resume
+            )
+        )
+
+    def remove(self, rowid: int) -> None:
+        self.conn.execute("DELETE FROM candidate_search WHERE rowid = ?", (rowid,))
+
+    def search(self, query: str, limit: int = 20, match_all: bool = False) -> List[Dict[str, Any]]:
+        """
+        Rank candidates for a free-text query.
+
+        Returns:
+            Candidate records, best match first, each with a '_score' (higher is better)
+        """
+        match = build_match_query(query, match_all)
+        if match is None:
+            return []
+
+        weights = ", ".join(str(w) for w in COLUMN_WEIGHTS)
+        rows = self.conn.execute(
+            f"SELECT c.data, bm25(candidate_search, {weights}) AS rank "
+            "FROM candidate_search JOIN candidates c ON c.rowid = candidate_search.rowid "
+            "WHERE candidate_search MATCH ? ORDER BY rank LIMIT ?",
+            (match, limit)
+        ).fetchall()
+
+        results = []
+        for data, rank in rows:
+            record = json.loads(data)
+            # FTS5's bm25() is negative with lower meaning better
+            record["_score"] = round(-rank, 4)
+            results.append(record)
+        return results
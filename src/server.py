@@ -1,13 +1,15 @@
 import os
 import sys
 import json
+import asyncio
 import logging
 import httpx
 import base64
 import uuid
 import secrets
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List
 from pathlib import Path
 
 # Load environment variables from .env file
@@ -17,6 +19,7 @@ load_dotenv()
 from fastapi import Request
 from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
 from fastmcp import FastMCP
+from starlette.middleware import Middleware
 
 # Add current directory to Python path for cloud deployment
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -25,15 +28,49 @@ if current_dir not in sys.path:
 
 try:
     from .oauth_config import OAuthConfig, GMAIL_SCOPES, oauth_config
-    from .gmail_client import GmailClient
+    from .gmail_client import GmailClient, build_raw_message
+    from .mime_cache import segment_cache
     from .client_registry import client_registry
-    from .client import LeverClient
+    from .rate_limit import rate_limit_metrics
+    from .cache import cache_metrics, invalidate_candidate
+    from .coalesce import coalesce_metrics, forget as forget_inflight
+    from .webhooks import WebhookProcessor, ReplayGuard, signature_tokens, verify_signature
+    from .prefetch import Prefetcher
+    from .mirror import get_mirror, get_fresh_mirror, MirrorSyncJob, MIRROR_OFFSET_PREFIX
+    from .output import (
+        to_json, output_budget, encode_cursor, decode_cursor, fit_records,
+        render_records, envelope_size, record_output, output_metrics
+    )
+    from .projection import get_projection
+    from .export import start_export, export_main
+    from .requisitions import validate_requisitions
+    from .compression import CompressionMiddleware, compression_enabled, compression_metrics
+    from .circuit_breaker import get_breaker, breaker_states, CircuitOpenError, CLOSED
+    from .mail_merge import template_cache, escape_header
+    from .client import get_lever_client, close_http_client, MAX_PAGE_SIZE
 except ImportError:
     # Fallback for cloud deployment
-    from client import LeverClient
-    from gmail_client import GmailClient
+    from client import get_lever_client, close_http_client, MAX_PAGE_SIZE
+    from gmail_client import GmailClient, build_raw_message
+    from mime_cache import segment_cache
     from oauth_config import OAuthConfig, GMAIL_SCOPES, oauth_config
     from client_registry import client_registry
+    from rate_limit import rate_limit_metrics
+    from cache import cache_metrics, invalidate_candidate
+    from coalesce import coalesce_metrics, forget as forget_inflight
+    from webhooks import WebhookProcessor, ReplayGuard, signature_tokens, verify_signature
+    from prefetch import Prefetcher
+    from mirror import get_mirror, get_fresh_mirror, MirrorSyncJob, MIRROR_OFFSET_PREFIX
+    from output import (
+        to_json, output_budget, encode_cursor, decode_cursor, fit_records,
+        render_records, envelope_size, record_output, output_metrics
+    )
+    from projection import get_projection
+    from export import start_export, export_main
+    from requisitions import validate_requisitions
+    from compression import CompressionMiddleware, compression_enabled, compression_metrics
+    from circuit_breaker import get_breaker, breaker_states, CircuitOpenError, CLOSED
+    from mail_merge import template_cache, escape_header
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -208,10 +245,49 @@ EMAIL_TEMPLATES = {
     </div>
 </body>
 </html>
+"""
+    },
+    "interview": {
+        "subject": "📅 Your interview for {{ role | the role }}",
+        "body": """
+<html>
+<body style="font-family: Arial, sans-serif; background: #f4f6fb; padding: 40px;">
+    <div style="max-width: 600px; margin: 0 auto; background: white; border-top: 6px solid #3b5bdb; border-radius: 12px; padding: 40px; box-shadow: 0 10px 30px rgba(0,0,0,0.08);">
+        <h1 style="color: #3b5bdb; font-size: 32px; margin-bottom: 20px;">📅 Interview reminder</h1>
+        <p style="font-size: 18px; color: #333; line-height: 1.6;">
+            Hi {{ candidate_name | there }},
+        </p>
+        <p style="font-size: 16px; color: #333; line-height: 1.6;">
+            This is a friendly reminder about your upcoming interview for the
+            <strong>{{ role | open }}</strong> position with {{ interviewer | our team }}.
+            We're looking forward to speaking with you!
+        </p>
+        <p style="font-size: 14px; color: #666;">
+            If you need to reschedule, just reply to this email.<br>
+            - The Hiring Team
+        </p>
+    </div>
+</body>
+</html>
 """
     }
 }
 
+def _render_email(theme: str, subject: Optional[str] = None, variables: Optional[Dict[str, Any]] = None):
+    """
+    Personalized subject and HTML body for a theme (birthday if unknown).
+
+    Templates are compiled once and cached; variables are HTML-escaped in the
+    body and folded onto one line in the subject. A custom subject is plain
+    text (no slots), only folded onto one line.
+    """
+    key = theme.lower() if theme.lower() in EMAIL_TEMPLATES else "birthday"
+    template = EMAIL_TEMPLATES[key]
+    body = template_cache.get((key, "body"), template["body"]).render(variables)
+    if subject:
+        return escape_header(subject), body
+    return template_cache.get((key, "subject"), template["subject"], escape_header).render(variables), body
+
 # Initialize FastMCP server with OAuth proxy
 # Check if OAuth is configured and set up accordingly
 oauth_enabled = oauth_config.is_configured()
@@ -231,10 +307,58 @@ else:
     logger.warning("OAuth not configured - email sending will return payloads only")
     logger.warning("Set GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET to enable OAuth")
 
+def _invalidate_candidate(candidate_id: str) -> None:
+    """Drop a candidate from the response caches and any in-flight read of it."""
+    invalidate_candidate(candidate_id)
+    forget_inflight(("candidate", candidate_id))
+
+# Applies verified Lever webhooks to the candidate cache and mirror in the background
+webhook_processor = WebhookProcessor(get_mirror, _invalidate_candidate, get_lever_client)
+# Drops resent (replayed) webhook deliveries
+webhook_replay_guard = ReplayGuard()
+
+# Warms the get_candidate cache for candidates on pages returned by list_candidates (LEVER_PREFETCH)
+candidate_prefetcher = Prefetcher()
+
+# Fail fast while an upstream is down; states are reported on /health
+lever_breaker = get_breaker("lever")
+google_breaker = get_breaker("google")
+
+@asynccontextmanager
+async def lever_lifespan(server):
+    """Own process-wide resources (pooled Lever HTTP client, mirror sync, webhook worker) for the server lifetime."""
+    sync_job = None
+    mirror = get_mirror()
+    if mirror is not None and os.getenv("LEVER_API_KEY"):
+        sync_job = MirrorSyncJob(
+            mirror,
+            get_lever_client,
+            interval=float(os.getenv("LEVER_MIRROR_SYNC_INTERVAL", "60"))
+        )
+        sync_job.start()
+        logger.info("Started Lever mirror sync job")
+    webhook_processor.start()
+    try:
+        yield
+    finally:
+        await webhook_processor.stop()
+        await candidate_prefetcher.stop()
+        if sync_job is not None:
+            await sync_job.stop()
+        await close_http_client()
+
 # Initialize FastMCP server WITHOUT auth requirement
 # Don't pass auth_provider to FastMCP - we'll handle OAuth manually to avoid scope validation
 # The OAuthProxy's built-in endpoints do strict scope validation which breaks with Google
-mcp = FastMCP("lever")
+class LeverMCP(FastMCP):
+    """FastMCP whose HTTP apps (streamable-http, SSE and custom routes) compress responses."""
+
+    def http_app(self, path=None, middleware=None, **kwargs):
+        if compression_enabled():
+            middleware = [Middleware(CompressionMiddleware), *(middleware or [])]
+        return super().http_app(path=path, middleware=middleware, **kwargs)
+
+mcp = LeverMCP("lever", lifespan=lever_lifespan)
 
 if oauth_enabled:
     # Add OAuth callback handler
@@ -362,7 +486,7 @@ if oauth_enabled:
                     google_redirect_uri = oauth_config.redirect_uri
                     
                     async with httpx.AsyncClient() as client:
-                        token_response = await client.post(
+                        token_response = await google_breaker.call(lambda: client.post(
                             "https://oauth2.googleapis.com/token",
                             data={
                                 "code": code,
@@ -371,7 +495,7 @@ if oauth_enabled:
                                 "redirect_uri": google_redirect_uri,
                                 "grant_type": "authorization_code"
                             }
-                        )
+                        ))
                         
                         if token_response.status_code != 200:
                             logger.error(f"Google token exchange failed: {token_response.text}")
@@ -878,16 +1002,22 @@ if oauth_enabled:
         google_redirect_uri = oauth_config.redirect_uri
         
         async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "code": code,
-                    "client_id": google_client_id,
-                    "client_secret": google_client_secret,
-                    "redirect_uri": google_redirect_uri,
-                    "grant_type": "authorization_code"
-                }
-            )
+            try:
+                response = await google_breaker.call(lambda: client.post(
+                    "https://oauth2.googleapis.com/token",
+                    data={
+                        "code": code,
+                        "client_id": google_client_id,
+                        "client_secret": google_client_secret,
+                        "redirect_uri": google_redirect_uri,
+                        "grant_type": "authorization_code"
+                    }
+                ))
+            except CircuitOpenError as e:
+                return JSONResponse({
+                    "error": "temporarily_unavailable",
+                    "error_description": str(e)
+                }, status_code=503, headers={"Retry-After": str(max(1, round(e.retry_in)))})
             
             if response.status_code != 200:
                 logger.error(f"Token exchange failed: {response.status_code} - {response.text}")
@@ -1174,13 +1304,69 @@ async def list_clients(request: Request):
 # Add health check endpoint
 @mcp.custom_route("/health", methods=["GET"])
 async def health_check(request: Request):
-    """Health check endpoint."""
+    """Health check endpoint, including upstream circuit breaker states."""
+    breakers = breaker_states()
+    degraded = any(b["state"] != CLOSED for b in breakers.values())
     return JSONResponse({
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "oauth_configured": oauth_config.is_configured(),
-        "base_url": os.getenv('MCP_SERVER_BASE_URL', 'not set')
+        "base_url": os.getenv('MCP_SERVER_BASE_URL', 'not set'),
+        "circuit_breakers": breakers
+    })
+
+# Add Lever client metrics endpoint
+@mcp.custom_route("/metrics", methods=["GET"])
+async def lever_metrics(request: Request):
+    """Runtime metrics for Lever API calls, caches, coalescing, prefetch, mirror, webhooks, tool output sizes, compression, email templates and encoded email segments."""
+    mirror = get_mirror()
+    return JSONResponse({
+        "rate_limit": rate_limit_metrics(),
+        "candidate_cache": cache_metrics(),
+        "coalescing": coalesce_metrics(),
+        "mirror": mirror.snapshot() if mirror is not None else None,
+        "tool_output": output_metrics(),
+        "webhooks": dict(webhook_processor.snapshot(), **webhook_replay_guard.snapshot()),
+        "prefetch": candidate_prefetcher.snapshot(),
+        "compression": compression_metrics(),
+        "email_templates": template_cache.snapshot(),
+        "email_segments": segment_cache.snapshot()
     })
 
+# Add Lever webhook receiver
+@mcp.custom_route("/webhooks/lever", methods=["POST"])
+async def lever_webhook(request: Request):
+    """Verify a Lever webhook and queue it for the background worker."""
+    tokens = signature_tokens()
+    if not tokens:
+        return JSONResponse({
+            "error": "webhooks_not_configured",
+            "error_description": "Set LEVER_WEBHOOK_SIGNATURE_TOKENS to accept Lever webhooks"
+        }, status_code=503)
+
+    try:
+        payload = await request.json()
+    except Exception:
+        return JSONResponse({"error": "invalid_request", "error_description": "Body must be JSON"}, status_code=400)
+
+    if not isinstance(payload, dict) or not verify_signature(payload, tokens):
+        logger.warning("Rejected Lever webhook with invalid signature")
+        return JSONResponse({"error": "invalid_signature"}, status_code=401)
+
+    rejected = webhook_replay_guard.check(payload)
+    if rejected == "duplicate":
+        # Already applied; acknowledge so a retried delivery isn't sent again
+        return JSONResponse({"status": "duplicate"})
+    if rejected:
+        logger.warning("Rejected Lever webhook outside the replay window")
+        return JSONResponse({"error": "stale_event"}, status_code=400)
+
+    if not webhook_processor.enqueue(payload):
+        # Lever retries failed deliveries, so shed load rather than block
+        return JSONResponse({"error": "queue_full"}, status_code=503)
+
+    webhook_replay_guard.remember(payload)
+    return JSONResponse({"status": "accepted"})
+
 # Add OAuth session polling endpoint for browser agents
 @mcp.custom_route("/oauth/poll/{session_id}", methods=["GET"])
 async def oauth_poll_session(request: Request):
@@ -1345,18 +1531,69 @@ async def preview_email(request: Request):
     theme = request.path_params.get("theme", "birthday")
     to = request.query_params.get("to", "recipient@example.com")
     
-    # Get the template or default to birthday
-    template = EMAIL_TEMPLATES.get(theme.lower(), EMAIL_TEMPLATES["birthday"])
+    # Render the template (or birthday) with any variables given in the query string
+    _, body = _render_email(theme, variables=dict(request.query_params))
     
     # Return the HTML with proper content type
-    return HTMLResponse(template["body"])
+    return HTMLResponse(body)
+
+async def _list_candidates(limit: int = 10, offset: Optional[str] = None, fields: Optional[str] = None) -> str:
+    """
+    List candidates from Lever.
+
+    Responses are capped at the tool's byte budget (LEVER_OUTPUT_BUDGET). When
+    the page doesn't fit, the candidates that fit are returned with
+    'truncated': true and 'next' resumes at the first one left out.
 
-async def _list_candidates(limit: int = 10, offset: Optional[str] = None) -> str:
-    logger.info(f"Listing candidates with limit={limit}, offset={offset}")
+    Args:
+        limit: Maximum number of candidates to return
+        offset: Pagination cursor from a previous response's 'next'
+        fields: Optional fields to return per candidate: comma-separated dotted paths
+            (e.g. "id,name,emails,applications[*].posting") and/or a preset
+            ("summary", "contact", "pipeline")
+
+    Returns:
+        Compact JSON page with 'data', 'hasNext' and 'next'
+    """
+    logger.info(f"Listing candidates with limit={limit}, offset={offset}, fields={fields}")
     try:
-        client = LeverClient()
-        result = await client.get_candidates(limit=limit, offset=offset)
-        return str(result)
+        base_offset, skip = decode_cursor(offset)
+
+        # Serve from the local mirror when it is fresh (or the offset came from it). A live
+        # Lever cursor keeps paging Lever, even if the mirror became fresh in between.
+        if base_offset and base_offset.startswith(MIRROR_OFFSET_PREFIX):
+            mirror = get_mirror()
+        elif base_offset is not None:
+            mirror = None
+        else:
+            mirror = get_fresh_mirror()
+        client = None
+        if mirror is not None:
+            # Continuation cursors carry the source: "m:0" is the mirror's first page...
+            base_offset = base_offset or f"{MIRROR_OFFSET_PREFIX}0"
+            page = mirror.list_candidates(limit=skip + limit, offset=base_offset)
+        else:
+            # ...and "" is Lever's, so a skip is never applied to the other ordering
+            base_offset = base_offset or ""
+            client = get_lever_client()
+            page = await client.get_candidates(limit=min(MAX_PAGE_SIZE, skip + limit), offset=base_offset or None)
+
+        records = page.get("data", [])[skip:skip + limit]
+        if client is not None:
+            # The agent usually opens some of these next; warm the cache in the background
+            candidate_prefetcher.schedule(client, [r.get("id") for r in records])
+        projection = get_projection(fields)
+        if projection:
+            records = projection.apply_many(records)
+
+        envelope = {key: page[key] for key in ("hasNext", "next") if key in page}
+        worst_case = dict(envelope, hasNext=True, next=encode_cursor(base_offset, skip + len(records)), truncated=True)
+        parts, _ = fit_records(records, output_budget("list_candidates") - envelope_size(worst_case, "data"))
+
+        truncated = len(parts) < len(records)
+        if truncated:
+            envelope = {"hasNext": True, "next": encode_cursor(base_offset, skip + len(parts)), "truncated": True}
+        return record_output("list_candidates", render_records(envelope, "data", parts), truncated)
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         return f"Configuration error: {str(e)}"
@@ -1364,12 +1601,33 @@ async def _list_candidates(limit: int = 10, offset: Optional[str] = None) -> str
         logger.error(f"Error listing candidates: {e}")
         return f"Error listing candidates: {str(e)}"
 
-async def _get_candidate(candidate_id: str) -> str:
-    logger.info(f"Getting candidate with id={candidate_id}")
+async def _get_candidate(candidate_id: str, fields: Optional[str] = None) -> str:
+    """
+    Get a single candidate from Lever.
+
+    Args:
+        candidate_id: The candidate ID
+        fields: Optional fields to return: comma-separated dotted paths and/or a preset
+            ("summary", "contact", "pipeline")
+
+    Returns:
+        Compact JSON with the candidate under 'data'
+    """
+    logger.info(f"Getting candidate with id={candidate_id}, fields={fields}")
+    candidate_prefetcher.record_request(candidate_id)
     try:
-        client = LeverClient()
-        result = await client.get_candidate(candidate_id)
-        return str(result)
+        result = None
+        mirror = get_fresh_mirror()
+        if mirror is not None:
+            record = mirror.get_candidate(candidate_id)
+            if record is not None:
+                result = {"data": record}
+
+        if result is None:
+            client = get_lever_client()
+            result = await client.get_candidate(candidate_id)
+        projection = get_projection(fields)
+        return record_output("get_candidate", to_json(projection.apply_response(result) if projection else result))
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         return f"Configuration error: {str(e)}"
@@ -1377,10 +1635,252 @@ async def _get_candidate(candidate_id: str) -> str:
         logger.error(f"Error getting candidate: {e}")
         return f"Error getting candidate: {str(e)}"
 
+# Upper bound on records a single scan_candidates call may return
+SCAN_MAX_ITEMS = 2000
+
+async def _scan_candidates(max_items: int = 500, offset: Optional[str] = None, fields: str = "summary") -> str:
+    """
+    Walk candidate pages and return a bounded, summarized slice.
+
+    Pages are fetched back-to-back with the next page prefetched while the
+    current one is summarized. The scan stops on a page boundary, or mid-page
+    when the tool's byte budget is reached, and next_offset resumes exactly
+    where this call stopped.
+
+    Args:
+        max_items: Maximum number of candidates to return (capped at 2000)
+        offset: Cursor from a previous scan's next_offset
+        fields: Fields per candidate: a preset ("summary", "contact", "pipeline")
+            and/or comma-separated dotted paths (default "summary")
+
+    Returns:
+        JSON with summarized candidates, count and next_offset (null when done)
+    """
+    logger.info(f"Scanning candidates with max_items={max_items}, offset={offset}")
+    max_items = max(1, min(max_items, SCAN_MAX_ITEMS))
+    page_size = min(MAX_PAGE_SIZE, max_items)
+    projection = get_projection(fields, default="summary")
+    try:
+        page_offset, skip = decode_cursor(offset)
+        if not 0 <= skip < MAX_PAGE_SIZE:
+            raise ValueError(f"Invalid continuation cursor: {offset}")
+        if skip:
+            # The skip counts from the start of the page at page_offset, whatever page size
+            # produced the cursor; re-read enough of it to return a full page past the skip
+            page_size = min(MAX_PAGE_SIZE, skip + page_size)
+        client = get_lever_client()
+        worst_case = {"count": max_items, "has_more": True, "next_offset": encode_cursor(page_offset, MAX_PAGE_SIZE), "truncated": True}
+        remaining = output_budget("scan_candidates") - envelope_size(worst_case, "candidates")
+        parts = []
+        next_offset = None
+        truncated = False
+        pages = client.iter_candidate_pages(page_size=page_size, offset=page_offset)
+        try:
+            async for page in pages:
+                records = page.get("data", [])[skip:]
+                if projection:
+                    records = projection.apply_many(records)
+                page_parts, used = fit_records(records, remaining, at_least_one=not parts)
+                parts.extend(page_parts)
+                remaining -= used
+
+                if len(page_parts) < len(records):
+                    truncated = True
+                    next_offset = encode_cursor(page_offset, skip + len(page_parts))
+                    break
+                skip = 0
+                next_offset = page.get("next") if page.get("hasNext") else None
+                page_offset = next_offset
+                if next_offset is None or len(parts) + page_size > max_items:
+                    break
+        finally:
+            await pages.aclose()
+
+        envelope = {"count": len(parts), "has_more": next_offset is not None, "next_offset": next_offset}
+        if truncated:
+            envelope["truncated"] = True
+        return record_output("scan_candidates", render_records(envelope, "candidates", parts), truncated)
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        return f"Configuration error: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error scanning candidates: {e}")
+        return f"Error scanning candidates: {str(e)}"
+
+# Upper bound on IDs accepted by a single get_candidates_batch call
+BATCH_MAX_IDS = 100
+
+async def _get_candidates_batch(candidate_ids: List[str], fields: Optional[str] = None) -> str:
+    """
+    Fetch several candidates in one call.
+
+    IDs are deduplicated and fetched concurrently (bounded by
+    LEVER_BATCH_CONCURRENCY). Failures are reported per ID instead of
+    failing the whole batch. If the results exceed the tool's byte budget,
+    the IDs that didn't fit are listed in 'remaining_ids'.
+
+    Args:
+        candidate_ids: Candidate IDs to fetch (max 100)
+        fields: Optional fields to return per candidate: comma-separated dotted paths
+            and/or a preset ("summary", "contact", "pipeline")
+
+    Returns:
+        JSON with candidates in request order plus an errors map keyed by ID
+    """
+    logger.info(f"Getting {len(candidate_ids)} candidates in batch")
+    unique_ids = list(dict.fromkeys(candidate_ids))
+    if len(unique_ids) > BATCH_MAX_IDS:
+        return f"Error getting candidates: at most {BATCH_MAX_IDS} IDs per batch (got {len(unique_ids)})"
+    try:
+        found: Dict[str, Any] = {}
+        mirror = get_fresh_mirror()
+        if mirror is not None:
+            for candidate_id in unique_ids:
+                record = mirror.get_candidate(candidate_id)
+                if record is not None:
+                    found[candidate_id] = record
+
+        errors: Dict[str, str] = {}
+        missing = [candidate_id for candidate_id in unique_ids if candidate_id not in found]
+        if missing:
+            client = get_lever_client()
+            batch = await client.get_candidates_by_id(missing)
+            for candidate_id, response in batch["results"].items():
+                found[candidate_id] = response.get("data", response)
+            errors = batch["errors"]
+
+        found_ids = [candidate_id for candidate_id in unique_ids if candidate_id in found]
+        candidates = [found[candidate_id] for candidate_id in found_ids]
+        projection = get_projection(fields)
+        if projection:
+            candidates = projection.apply_many(candidates)
+
+        worst_case = {"count": len(candidates), "errors": errors, "remaining_ids": found_ids}
+        parts, _ = fit_records(candidates, output_budget("get_candidates_batch") - envelope_size(worst_case, "candidates"))
+
+        envelope = {"count": len(parts), "errors": errors}
+        truncated = len(parts) < len(candidates)
+        if truncated:
+            envelope["remaining_ids"] = found_ids[len(parts):]
+        return record_output("get_candidates_batch", render_records(envelope, "candidates", parts), truncated)
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        return f"Configuration error: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error getting candidates: {e}")
+        return f"Error getting candidates: {str(e)}"
+
+async def _search_candidates(
+    query: str,
+    limit: int = 20,
+    match_all: bool = False,
+    fields: str = "summary",
+    offset: Optional[str] = None
+) -> str:
+    """
+    Full-text search over candidates in the local mirror, ranked by BM25.
+
+    Searches names, emails, tags, sources, location, headline and (when resume
+    indexing is enabled) parsed resume text. Requires LEVER_MIRROR_PATH.
+
+    Args:
+        query: Free-text query, e.g. "backend engineer Berlin"
+        limit: Maximum number of results (default 20, max 100)
+        match_all: Require every term to match instead of ranking partial matches
+        fields: Fields per candidate: a preset ("summary", "contact", "pipeline")
+            and/or comma-separated dotted paths (default "summary")
+        offset: Cursor from a previous search's next_offset
+
+    Returns:
+        JSON with summarized candidates, best match first, each with a score
+    """
+    logger.info(f"Searching candidates: query={query!r}, limit={limit}, offset={offset}")
+    mirror = get_mirror()
+    if mirror is None:
+        return "Configuration error: search_candidates requires the local mirror (set LEVER_MIRROR_PATH)"
+    try:
+        _, skip = decode_cursor(offset)
+        limit = max(1, min(limit, 100))
+        results = mirror.search(query, limit=skip + limit, match_all=match_all)[skip:]
+        projection = get_projection(fields, default="summary")
+        candidates = [dict(projection.apply(r) if projection else r, score=r.pop("_score")) for r in results]
+
+        envelope = {"query": query, "count": len(candidates), "last_synced_at": mirror.last_synced_at,
+                    "next_offset": encode_cursor(None, skip + len(candidates)), "truncated": True}
+        parts, _ = fit_records(candidates, output_budget("search_candidates") - envelope_size(envelope, "candidates"))
+
+        truncated = len(parts) < len(candidates)
+        envelope["count"] = len(parts)
+        # More results may exist if this page was cut short or came back full
+        envelope["next_offset"] = encode_cursor(None, skip + len(parts)) if truncated or len(results) == limit else None
+        if not truncated:
+            del envelope["truncated"]
+        return record_output("search_candidates", render_records(envelope, "candidates", parts), truncated)
+    except Exception as e:
+        logger.error(f"Error searching candidates: {e}")
+        return f"Error searching candidates: {str(e)}"
+
+async def _pipeline_stats(posting_id: Optional[str] = None) -> str:
+    """
+    Summarize the hiring pipeline from the local mirror.
+
+    Computes funnel counts per stage (currently in / ever reached), median
+    days spent in each stage, and how candidates from each source advance.
+    Results are cached per posting until a candidate on it changes; stats
+    across every posting refresh at most once a minute while candidates change.
+    Requires LEVER_MIRROR_PATH.
+
+    Args:
+        posting_id: Lever posting ID to scope to (default: every candidate)
+
+    Returns:
+        JSON pipeline summary
+    """
+    logger.info(f"Computing pipeline stats for posting_id={posting_id}")
+    mirror = get_mirror()
+    if mirror is None:
+        return "Configuration error: pipeline_stats requires the local mirror (set LEVER_MIRROR_PATH)"
+    try:
+        # The aggregation is synchronous SQL; keep it off the event loop
+        stats = dict(await asyncio.to_thread(mirror.pipeline_stats, posting_id), last_synced_at=mirror.last_synced_at)
+        return record_output("pipeline_stats", to_json(stats))
+    except Exception as e:
+        logger.error(f"Error computing pipeline stats: {e}")
+        return f"Error computing pipeline stats: {str(e)}"
+
+async def _export_candidates(format: str = "ndjson", fields: Optional[str] = None, export_id: Optional[str] = None) -> str:
+    """
+    Export every candidate to a file on the server, in the background.
+
+    Pages are streamed straight to disk (constant memory) and checkpointed, so
+    a failed export resumes where it stopped. Call again with the returned
+    export_id to check progress; calling it on a failed export resumes it.
+
+    Args:
+        format: "ndjson" (full records), "csv" or "parquet" (one column per field)
+        fields: Field spec or preset applied to each record. Defaults to full
+            records for NDJSON and the "pipeline" preset for CSV/Parquet
+        export_id: ID from a previous call, to check on or resume that export
+
+    Returns:
+        JSON with export_id, status, records written so far, path and file URL
+    """
+    logger.info(f"Exporting candidates: format={format}, fields={fields}, export_id={export_id}")
+    try:
+        get_lever_client()
+        job = start_export(get_lever_client, format=format, fields=fields, export_id=export_id)
+        return record_output("export_candidates", to_json(job.snapshot()))
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        return f"Configuration error: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error exporting candidates: {e}")
+        return f"Error exporting candidates: {str(e)}"
+
 async def _create_requisition(title: str, location: str, team: str) -> str:
     logger.info(f"Creating requisition: title={title}, location={location}, team={team}")
     try:
-        client = LeverClient()
+        client = get_lever_client()
         # Construct the data payload based on Lever API requirements
         data = {
             "name": title,
@@ -1388,7 +1888,7 @@ async def _create_requisition(title: str, location: str, team: str) -> str:
             "team": team
         }
         result = await client.create_requisition(data)
-        return str(result)
+        return record_output("create_requisition", to_json(result))
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         return f"Configuration error: {str(e)}"
@@ -1396,12 +1896,55 @@ async def _create_requisition(title: str, location: str, team: str) -> str:
         logger.error(f"Error creating requisition: {e}")
         return f"Error creating requisition: {str(e)}"
 
+async def _create_requisitions_bulk(requisitions: List[Dict[str, Any]]) -> str:
+    """
+    Create many requisitions in one call.
+
+    Every row is validated before anything is sent; if any row is invalid,
+    nothing is created and the errors are returned per row. Valid plans are
+    written concurrently (bounded by LEVER_BATCH_CONCURRENCY). Each row's
+    requisition code is its idempotency key, so re-submitting a plan after a
+    partial failure only creates the rows that are still missing.
+
+    Args:
+        requisitions: Rows with 'title', 'location', 'team' and optionally
+            'headcount' (default 1), 'requisition_code' (derived from the row
+            when omitted) and 'slot' (to open otherwise identical rows twice)
+
+    Returns:
+        JSON with created/exists/error counts and a result per row
+    """
+    logger.info(f"Creating {len(requisitions)} requisitions")
+    payloads, errors = validate_requisitions(requisitions)
+    if errors:
+        return record_output("create_requisitions_bulk", to_json({
+            "error": "validation_failed",
+            "created": 0,
+            "errors": [{"row": row, "error": error} for row, error in sorted(errors.items())]
+        }))
+    try:
+        client = get_lever_client()
+        results = await client.create_requisitions(payloads)
+        counts = {"created": 0, "exists": 0, "error": 0}
+        for row, result in enumerate(results):
+            result["row"] = row
+            counts[result["status"]] += 1
+        envelope = {"created": counts["created"], "exists": counts["exists"], "failed": counts["error"], "results": results}
+        return record_output("create_requisitions_bulk", to_json(envelope))
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        return f"Configuration error: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error creating requisitions: {e}")
+        return f"Error creating requisitions: {str(e)}"
+
 async def _send_email(
     to: str, 
     theme: str, 
     subject: Optional[str] = None, 
     cc: Optional[str] = None, 
     bcc: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None,
     access_token: Optional[str] = None,
     user_id: str = "default"
 ) -> str:
@@ -1426,10 +1969,11 @@ async def _send_email(
     
     Args:
         to: Recipient email address
-        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical)
+        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical, interview)
         subject: Optional custom subject (uses theme default if not provided)
         cc: Optional CC recipients
         bcc: Optional BCC recipients
+        variables: Optional template variables, e.g. candidate_name, role, interviewer (HTML-escaped)
         user_id: User identifier for token storage
         
     Returns:
@@ -1440,15 +1984,9 @@ async def _send_email(
             
     logger.info(f"Generating themed email: to={to}, theme={theme}, has_token={bool(access_token)}")
     
-    # Use shared email templates
+    # Use shared email templates (birthday if the theme is unknown)
     email_templates = EMAIL_TEMPLATES
-    
-    # Get the template or default to birthday
-    template = email_templates.get(theme.lower(), email_templates["birthday"])
-    
-    # Use provided subject or template subject
-    email_subject = subject if subject else template["subject"]
-    email_body = template["body"]
+    email_subject, email_body = _render_email(theme, subject, variables)
     
     # Try to send email ONLY if we have an access_token (on-behalf-of flow)
     # Do NOT try to load tokens from disk - production has read-only filesystem
@@ -1504,26 +2042,8 @@ async def _send_email(
         logger.info("No access_token provided - returning OAuth instructions for agent")
     
     # Fallback: Generate payload for manual sending or agent to use
-    # Create the email message in RFC 2822 format
-    message_parts = [
-        f"To: {to}",
-        f"Subject: {email_subject}",
-        "MIME-Version: 1.0",
-        "Content-Type: text/html; charset=utf-8",
-    ]
-    
-    if cc:
-        message_parts.append(f"Cc: {cc}")
-    if bcc:
-        message_parts.append(f"Bcc: {bcc}")
-    
-    message_parts.append("")  # Empty line between headers and body
-    message_parts.append(email_body)
-    
-    raw_message = "\n".join(message_parts)
-    
-    # Encode the message in base64url format as required by Gmail API
-    encoded_message = base64.urlsafe_b64encode(raw_message.encode('utf-8')).decode('utf-8')
+    # Create the email message in RFC 2822 format, base64url-encoded as required by Gmail API
+    encoded_message = build_raw_message(to, email_subject, email_body, cc=cc, bcc=bcc)
     
     # Create the Gmail API payload
     gmail_payload = {
@@ -2167,7 +2687,8 @@ async def _generate_email_content(
     theme: str,
     subject: Optional[str] = None,
     cc: Optional[str] = None,
-    bcc: Optional[str] = None
+    bcc: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None
 ) -> str:
     """
     Generate themed Gmail email content WITHOUT sending it.
@@ -2205,46 +2726,22 @@ async def _generate_email_content(
     
     Args:
         to: Recipient email address
-        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical)
+        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical, interview)
         subject: Optional custom subject (uses theme default if not provided)
         cc: Optional CC recipients
         bcc: Optional BCC recipients
+        variables: Optional template variables, e.g. candidate_name, role, interviewer (HTML-escaped)
         
     Returns:
         JSON with gmail_payload.raw field (base64url encoded with HTML MIME headers) ready to send
     """
     logger.info(f"Generating email content: to={to}, theme={theme}")
     
-    # Use shared email templates
-    email_templates = EMAIL_TEMPLATES
-    
-    # Get the template or default to birthday
-    template = email_templates.get(theme.lower(), email_templates["birthday"])
-    
-    # Use provided subject or template subject
-    email_subject = subject if subject else template["subject"]
-    email_body = template["body"]
-    
-    # Create RFC 2822 formatted message for Gmail API
-    message_parts = [
-        f"To: {to}",
-        f"Subject: {email_subject}",
-        "MIME-Version: 1.0",
-        "Content-Type: text/html; charset=utf-8",
-    ]
+    # Use shared email templates (birthday if the theme is unknown)
+    email_subject, email_body = _render_email(theme, subject, variables)
     
-    if cc:
-        message_parts.append(f"Cc: {cc}")
-    if bcc:
-        message_parts.append(f"Bcc: {bcc}")
-    
-    message_parts.append("")  # Empty line between headers and body
-    message_parts.append(email_body)
-    
-    raw_message = "\n".join(message_parts)
-    
-    # Encode the message in base64url format as required by Gmail API
-    encoded_message = base64.urlsafe_b64encode(raw_message.encode('utf-8')).decode('utf-8')
+    # Create RFC 2822 formatted message for Gmail API, base64url-encoded
+    encoded_message = build_raw_message(to, email_subject, email_body, cc=cc, bcc=bcc)
     
     # Generate preview URL
     base_url = os.getenv('MCP_SERVER_BASE_URL', 'http://localhost:8000')
@@ -2333,7 +2830,13 @@ response = requests.post(
 # Register tools
 mcp.tool(name="list_candidates")(_list_candidates)
 mcp.tool(name="get_candidate")(_get_candidate)
+mcp.tool(name="get_candidates_batch")(_get_candidates_batch)
+mcp.tool(name="scan_candidates")(_scan_candidates)
+mcp.tool(name="search_candidates")(_search_candidates)
+mcp.tool(name="pipeline_stats")(_pipeline_stats)
+mcp.tool(name="export_candidates")(_export_candidates)
 mcp.tool(name="create_requisition")(_create_requisition)
+mcp.tool(name="create_requisitions_bulk")(_create_requisitions_bulk)
 
 async def _send_email_simple(
     to: str, 
@@ -2341,7 +2844,8 @@ async def _send_email_simple(
     subject: Optional[str] = None, 
     cc: Optional[str] = None, 
     bcc: Optional[str] = None,
-    access_token: str = ""
+    access_token: str = "",
+    variables: Optional[Dict[str, Any]] = None
 ) -> str:
     """
     Send a themed email via Gmail API. Requires valid MCP access token.
@@ -2351,11 +2855,12 @@ async def _send_email_simple(
     
     Args:
         to: Recipient email address
-        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical)
+        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical, interview)
         subject: Optional custom subject (uses theme default if not provided)
         cc: Optional CC recipients
         bcc: Optional BCC recipients
         access_token: MCP access token (required)
+        variables: Optional template variables, e.g. candidate_name, role, interviewer (HTML-escaped)
         
     Returns:
         JSON response with email status and details
@@ -2372,10 +2877,8 @@ async def _send_email_simple(
     
     logger.info(f"Sending themed email: to={to}, theme={theme}")
     
-    # Use shared email templates
-    template = EMAIL_TEMPLATES.get(theme.lower(), EMAIL_TEMPLATES["birthday"])
-    email_subject = subject if subject else template["subject"]
-    email_body = template["body"]
+    # Use shared email templates, personalized with variables
+    email_subject, email_body = _render_email(theme, subject, variables)
     
     try:
         logger.info(f"_send_email_simple called with access_token: {access_token[:20]}..." if access_token else "None")
@@ -2437,30 +2940,102 @@ async def _send_email_simple(
             "message": f"Failed to send email: {str(e)}"
         }, indent=2)
 
-# FastMCP handles authentication automatically with auth providers
-# No manual auth middleware needed
+# Most recipients accepted by one send_emails_batch call
+EMAIL_BATCH_MAX_RECIPIENTS = 500
 
-# Modified send_email using FastMCP's proper dependency injection
-async def _send_email_with_auth(
-    to: str, 
-    theme: str, 
-    subject: Optional[str] = None, 
-    cc: Optional[str] = None, 
-    bcc: Optional[str] = None
+def _gmail_client_for_token(access_token: str) -> GmailClient:
+    """GmailClient for an MCP access token (mapped to its Google token) or a Google token."""
+    google_token_data = get_google_token_from_mcp_token(access_token)
+    if google_token_data:
+        return GmailClient(access_token=google_token_data.get("access_token"), user_id="default")
+    return GmailClient(access_token=access_token, user_id="default")
+
+async def _send_emails_batch_simple(
+    recipients: List[Dict[str, Any]],
+    theme: str,
+    subject: Optional[str] = None,
+    access_token: str = "",
+    variables: Optional[Dict[str, Any]] = None
 ) -> str:
     """
-    Generate and send a themed email via Gmail API.
-
+    Send a themed email to many recipients through Gmail's batch endpoint.
+    
     Args:
-        to: Recipient email address
-        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical)
-        subject: Optional custom subject (uses theme default if not provided)
-        cc: Optional CC recipients
-        bcc: Optional BCC recipients
+        recipients: List of {"to", optional "subject", "cc", "bcc"} entries
+        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical, interview)
+        subject: Optional subject for every recipient (uses theme default if not provided)
+        access_token: MCP access token (required)
+        variables: Template variables shared by every recipient (recipient fields override them)
         
     Returns:
-        JSON response with email status and details
+        JSON with sent/failed counts and one status entry per recipient (in input order)
     """
+    if access_token and access_token.startswith("Bearer "):
+        access_token = access_token[7:]
+    
+    if not access_token:
+        return json.dumps({
+            "status": "error",
+            "message": "Authentication required"
+        }, indent=2)
+    
+    if not recipients:
+        return json.dumps({"status": "error", "message": "No recipients given"}, indent=2)
+    if len(recipients) > EMAIL_BATCH_MAX_RECIPIENTS:
+        return json.dumps({
+            "status": "error",
+            "message": f"Too many recipients: {len(recipients)} (max {EMAIL_BATCH_MAX_RECIPIENTS} per call)"
+        }, indent=2)
+    
+    messages = []
+    for recipient in recipients:
+        # Per-recipient fields override the shared variables
+        email_subject, email_body = _render_email(
+            theme, recipient.get("subject") or subject, {**(variables or {}), **recipient}
+        )
+        messages.append({
+            "to": recipient.get("to"),
+            "subject": email_subject,
+            "body": email_body,
+            "cc": recipient.get("cc"),
+            "bcc": recipient.get("bcc")
+        })
+    
+    logger.info(f"Sending themed batch email: {len(messages)} recipients, theme={theme}")
+    
+    try:
+        gmail_client = _gmail_client_for_token(access_token)
+        if not gmail_client.is_authenticated():
+            return json.dumps({
+                "status": "error",
+                "message": "Invalid or expired access token"
+            }, indent=2)
+        
+        results = await gmail_client.send_emails(messages)
+        
+        sent = sum(1 for r in results if r["status"] == "sent")
+        failed = len(results) - sent
+        return json.dumps({
+            "status": "sent" if not failed else ("partial" if sent else "error"),
+            "theme": theme,
+            "sent": sent,
+            "failed": failed,
+            "retryable": [r["index"] for r in results if r["status"] == "error" and r["retryable"]],
+            "results": results
+        }, indent=2)
+        
+    except Exception as e:
+        logger.error(f"Error sending batch email: {e}")
+        return json.dumps({
+            "status": "error",
+            "message": f"Failed to send emails: {str(e)}"
+        }, indent=2)
+
+# FastMCP handles authentication automatically with auth providers
+# No manual auth middleware needed
+
+def _google_token_from_request_headers() -> Optional[str]:
+    """Google access token for the MCP bearer token on the current HTTP request, if any."""
     from fastmcp.server.dependencies import get_access_token, get_http_headers
     
     # Debug FastMCP auth first
@@ -2502,10 +3077,37 @@ async def _send_email_with_auth(
         logger.error(f"Failed to extract token from headers: {e}")
         access_token = None
     
+    return access_token
+
+# Modified send_email using FastMCP's proper dependency injection
+async def _send_email_with_auth(
+    to: str, 
+    theme: str, 
+    subject: Optional[str] = None, 
+    cc: Optional[str] = None, 
+    bcc: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Generate and send a themed email via Gmail API.
+
+    Args:
+        to: Recipient email address
+        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical, interview)
+        subject: Optional custom subject (uses theme default if not provided)
+        cc: Optional CC recipients
+        bcc: Optional BCC recipients
+        variables: Optional template variables, e.g. candidate_name, role, interviewer (HTML-escaped)
+        
+    Returns:
+        JSON response with email status and details
+    """
+    access_token = _google_token_from_request_headers()
+    
     logger.info(f"About to call _send_email_simple with access_token: {access_token[:20]}..." if access_token else "None")
     
     try:
-        result = await _send_email_simple(to, theme, subject, cc, bcc, access_token)
+        result = await _send_email_simple(to, theme, subject, cc, bcc, access_token, variables)
         logger.info(f"_send_email_simple returned successfully")
         return result
     except Exception as e:
@@ -2518,6 +3120,32 @@ async def _send_email_with_auth(
             "message": f"Email sending failed: {str(e)}"
         }, indent=2)
 
+async def _send_emails_batch_with_auth(
+    recipients: List[Dict[str, Any]],
+    theme: str,
+    subject: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Send a themed email to many recipients in one call via Gmail's batch endpoint.
+    
+    Messages are sent in batches of up to 100. Each recipient gets its own
+    status, and failed ones that are worth retrying are listed under
+    "retryable" (indexes into recipients) so just those can be sent again.
+
+    Args:
+        recipients: List of {"to": address, optional "subject", "cc", "bcc", and template
+            variables such as "candidate_name"} (max 500)
+        theme: Email theme (birthday, pirate, space, medieval, superhero, tropical, interview)
+        subject: Optional subject for every recipient (uses theme default if not provided)
+        variables: Template variables shared by every recipient, e.g. role, interviewer
+        
+    Returns:
+        JSON with sent/failed counts, retryable indexes and per-recipient results
+    """
+    access_token = _google_token_from_request_headers()
+    return await _send_emails_batch_simple(recipients, theme, subject, access_token or "", variables)
+
 # Tool-only logging middleware
 async def tool_logging_middleware(request, call_next):
     """Log only tool requests with headers and request details for debugging."""
@@ -2657,6 +3285,7 @@ mcp.add_middleware(all_request_logging_middleware)
 
 # Register send_email tool with auth support
 mcp.tool(name="send_email")(_send_email_with_auth)
+mcp.tool(name="send_emails_batch")(_send_emails_batch_with_auth)
 
 # Register generate_email_content - NO OAuth required (just generates content)
 # mcp.tool(name="generate_email_content")(_generate_email_content)
@@ -2670,7 +3299,9 @@ mcp.tool(name="send_email")(_send_email_with_auth)
 # mcp.tool(name="poll_oauth_code")(_poll_oauth_code)
 
 def main():
-    """Main entry point for the MCP server."""
+    """Main entry point for the MCP server (or `lever-mcp export ...`)."""
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        sys.exit(export_main(sys.argv[2:]))
     mcp.run()
 
 if __name__ == "__main__":
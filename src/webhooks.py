@@ -0,0 +1,227 @@
+"""
+Lever webhook ingestion.
+
+Lever signs each webhook with an HMAC-SHA256 of `token + triggeredAt`, keyed by
+the webhook's signature token. A signed delivery could be captured and resent,
+so events triggered outside a short window, or whose token was already
+accepted, are dropped. Verified events are put on an in-process queue
+and the route acknowledges immediately; a background worker applies them to
+the candidate cache and local mirror so reads stay fresh without polling.
+"""
+import os
+import hmac
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable
+
+logger = logging.getLogger(__name__)
+
+# Candidate events we apply; anything else is acknowledged and ignored
+STAGE_CHANGE = "candidateStageChange"
+ARCHIVE_CHANGE = "candidateArchiveChange"
+HIRED = "candidateHired"
+DELETED = "candidateDeleted"
+HANDLED_EVENTS = {STAGE_CHANGE, ARCHIVE_CHANGE, HIRED, DELETED}
+
+
+def signature_tokens() -> List[str]:
+    """Signature tokens from LEVER_WEBHOOK_SIGNATURE_TOKENS (comma-separated; one per Lever webhook)."""
+    value = os.getenv("LEVER_WEBHOOK_SIGNATURE_TOKENS", "")
+    return [token.strip() for token in value.split(",") if token.strip()]
+
+
+def verify_signature(payload: Dict[str, Any], tokens: List[str]) -> bool:
+    """Check a webhook's signature against any of the configured tokens."""
+    token = payload.get("token")
+    triggered_at = payload.get("triggeredAt")
+    signature = payload.get("signature")
+    if not token or triggered_at is None or not isinstance(signature, str):
+        return False
+
+    message = f"{token}{triggered_at}".encode("utf-8")
+    for secret in tokens:
+        expected = hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+        if hmac.compare_digest(expected, signature):
+            return True
+    return False
+
+
+class ReplayGuard:
+    """Rejects stale deliveries and tokens already accepted within the window."""
+
+    def __init__(self, max_age: Optional[float] = None, max_tokens: int = 10000):
+        """
+        Args:
+            max_age: Seconds an event's triggeredAt may be from now (LEVER_WEBHOOK_MAX_AGE, 300)
+            max_tokens: Accepted tokens remembered, oldest forgotten first
+        """
+        self.max_age = max_age if max_age is not None else float(os.getenv("LEVER_WEBHOOK_MAX_AGE", "300"))
+        self.max_tokens = max_tokens
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+        # Metrics
+        self.stale = 0
+        self.duplicates = 0
+
+    def check(self, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Return why a verified delivery must be dropped, or None to accept it.
+
+        Returns:
+            "stale" if triggeredAt (ms) is outside the window, "duplicate" if
+            its token was already accepted, else None
+        """
+        now = time.time()
+        self._expire(now)
+        try:
+            age = abs(now - float(payload["triggeredAt"]) / 1000)
+        except (KeyError, TypeError, ValueError):
+            age = float("inf")
+        if age > self.max_age:
+            self.stale += 1
+            return "stale"
+        if payload.get("token") in self._seen:
+            self.duplicates += 1
+            return "duplicate"
+        return None
+
+    def remember(self, payload: Dict[str, Any]) -> None:
+        """Record an accepted delivery's token."""
+        self._seen[payload["token"]] = time.time()
+        if len(self._seen) > self.max_tokens:
+            self._seen.popitem(last=False)
+
+    def _expire(self, now: float) -> None:
+        # Twice the window after acceptance, a resent delivery fails the age check anyway
+        while self._seen:
+            token, seen_at = next(iter(self._seen.items()))
+            if now - seen_at <= 2 * self.max_age:
+                break
+            del self._seen[token]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"rejected_stale": self.stale, "rejected_duplicate": self.duplicates}
+
+
+class WebhookProcessor:
+    """Queues verified Lever events and applies them in a background worker."""
+
+    def __init__(
+        self,
+        get_mirror: Callable[[], Any],
+        invalidate_candidate: Callable[[str], None],
+        client_factory: Optional[Callable[[], Any]] = None,
+        max_queue: int = 10000
+    ):
+        """
+        Args:
+            get_mirror: Returns the local mirror, or None if not configured
+            invalidate_candidate: Drops a candidate from the response cache
+            client_factory: Returns a LeverClient for refetching records an
+                event doesn't fully describe (e.g. hires)
+            max_queue: Events buffered before the route starts rejecting
+        """
+        self.get_mirror = get_mirror
+        self.invalidate_candidate = invalidate_candidate
+        self.client_factory = client_factory
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.received = 0
+        self.processed = 0
+        self.ignored = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Queue an event without waiting. Returns False if the queue is full."""
+        self.start()
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.received += 1
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            event = await self.queue.get()
+            try:
+                await self.handle(event)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to apply Lever webhook {event.get('event')}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def handle(self, event: Dict[str, Any]) -> None:
+        """Apply one event to the cache and mirror."""
+        event_type = event.get("event")
+        data = event.get("data") or {}
+        candidate_id = data.get("opportunityId") or data.get("candidateId")
+        if event_type not in HANDLED_EVENTS or not candidate_id:
+            self.ignored += 1
+            return
+
+        self.invalidate_candidate(candidate_id)
+        mirror = self.get_mirror()
+        if mirror is not None:
+            if event_type == DELETED:
+                mirror.delete(candidate_id)
+            else:
+                await self._update_mirror(mirror, candidate_id, event_type, data, event.get("triggeredAt"))
+        self.processed += 1
+
+    async def _update_mirror(self, mirror, candidate_id: str, event_type: str, data: Dict[str, Any], triggered_at: Optional[int]) -> None:
+        record = mirror.get_candidate(candidate_id)
+
+        if record is not None and event_type == STAGE_CHANGE:
+            record["stage"] = data.get("toStageId")
+            record.setdefault("stageChanges", []).append({
+                "toStageId": data.get("toStageId"),
+                "updatedAt": triggered_at
+            })
+        elif record is not None and event_type == ARCHIVE_CHANGE:
+            record["archived"] = data.get("toArchived")
+        elif self.client_factory is not None:
+            # Hires, and records the mirror hasn't seen yet, carry too little
+            # data to patch locally; fetch the current record instead
+            response = await self.client_factory().get_candidate(candidate_id)
+            record = response.get("data")
+            triggered_at = None
+        else:
+            return
+
+        if record is None:
+            return
+        if triggered_at is not None:
+            record["updatedAt"] = max(record.get("updatedAt") or 0, triggered_at)
+        mirror.upsert_many([record])
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "ignored": self.ignored,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "queued": self.queue.qsize()
+        }
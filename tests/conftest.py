@@ -0,0 +1,51 @@
+import httpx
+import pytest
+
+from lever_mcp import cache, circuit_breaker, client as lever_client, coalesce, rate_limit
+from lever_mcp.client import LeverClient
+from lever_mcp.rate_limit import RetryPolicy
+
+
+def _reset_shared_state() -> None:
+    rate_limit._buckets.clear()
+    cache._candidate_caches.clear()
+    coalesce._flights.clear()
+    lever_client._lever_clients.clear()
+    # Modules hold on to their breakers, so reset them in place rather than dropping them
+    for breaker in circuit_breaker._breakers.values():
+        breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def shared_state():
+    """Start and end every test with fresh per-key rate limiters, caches, flights, breakers and clients."""
+    _reset_shared_state()
+    yield
+    _reset_shared_state()
+
+
+@pytest.fixture
+def mock_http():
+    """Factory for an httpx.AsyncClient answered by a handler (MockTransport) or an ASGI app."""
+    def factory(handler=None, app=None) -> httpx.AsyncClient:
+        transport = httpx.ASGITransport(app=app) if app is not None else httpx.MockTransport(handler)
+        return httpx.AsyncClient(transport=transport)
+    return factory
+
+
+@pytest.fixture
+def make_client(mock_http):
+    """
+    Factory for LeverClients backed by mock_http.
+
+    Pass app= to talk to an ASGI app (e.g. the Lever simulator) instead of a
+    handler, and fast_retries=True to retry with millisecond backoff.
+    """
+    def factory(handler=None, api_key: str = "test_key", app=None, fast_retries: bool = False) -> LeverClient:
+        client = LeverClient(api_key=api_key, http_client=mock_http(handler, app=app))
+        if app is not None:
+            client.base_url = "http://lever.test/v1"
+        if fast_retries:
+            client.retry_policy = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.05)
+        return client
+    return factory
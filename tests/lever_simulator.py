@@ -0,0 +1,215 @@
+"""
+Local stand-in for the Lever API, for load tests and end-to-end checks.
+
+Serves a deterministic set of candidates and requisitions with Lever's
+pagination (limit/offset/hasNext/next), ETags, and optional latency, 5xx and
+rate-limit (429 + Retry-After) injection.
+
+Run it and point the MCP server at it:
+
+    python tests/lever_simulator.py --port 8100 --candidates 5000 --latency 0.05 --rate-limit 10
+    LEVER_API_KEY=sim LEVER_API_BASE_URL=http://localhost:8100/v1 ./run_http.sh
+"""
+import time
+import json
+import random
+import asyncio
+import hashlib
+import argparse
+from typing import Optional, Dict, Any, List
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+STAGES = ["applicant", "phone-screen", "onsite", "offer"]
+SOURCES = ["LinkedIn", "Referral", "Careers site", "Agency"]
+LOCATIONS = ["Berlin", "London", "New York", "Remote"]
+
+
+def make_candidate(i: int, rng: random.Random) -> Dict[str, Any]:
+    stage_count = rng.randint(1, len(STAGES))
+    created = 1700000000000 + i * 60000
+    return {
+        "id": f"sim-{i:06d}",
+        "name": f"Candidate {i}",
+        "headline": rng.choice(["Backend Engineer", "Designer", "Data Scientist", "Product Manager"]),
+        "emails": [f"candidate{i}@example.com"],
+        "phones": [{"type": "mobile", "value": f"+1555{i:07d}"}],
+        "location": rng.choice(LOCATIONS),
+        "tags": rng.sample(["python", "go", "remote", "senior", "design"], 2),
+        "sources": [rng.choice(SOURCES)],
+        "origin": "applied",
+        "stage": STAGES[stage_count - 1],
+        "stageChanges": [
+            {"toStageId": STAGES[n], "toStageIndex": n, "updatedAt": created + n * 86400000}
+            for n in range(stage_count)
+        ],
+        "applications": [{"id": f"app-{i}", "posting": f"posting-{i % 5}"}],
+        "createdAt": created,
+        "updatedAt": created + stage_count * 86400000,
+    }
+
+
+class LeverSimulator:
+    """In-memory Lever API with fault injection, served as an ASGI app."""
+
+    def __init__(
+        self,
+        candidates: int = 1000,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: Optional[float] = None,
+        retry_after: float = 1.0,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            candidates: Number of candidates to generate
+            latency: Base response delay in seconds
+            jitter: Extra uniformly random delay in seconds
+            rate_limit: Requests per second allowed before answering 429 (None for unlimited)
+            retry_after: Retry-After seconds sent with 429s
+            error_rate: Fraction of requests answered with 503
+            seed: Seed for generated data and injected faults
+        """
+        rng = random.Random(seed)
+        self.candidates = [make_candidate(i, rng) for i in range(candidates)]
+        self.by_id = {c["id"]: c for c in self.candidates}
+        self.requisitions: Dict[str, Dict[str, Any]] = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self._rng = random.Random(seed + 1)
+        self._tokens = rate_limit or 0.0
+        self._updated = time.monotonic()
+
+        # Counters
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+        self.app = Starlette(routes=[
+            Route("/v1/candidates", self.list_candidates, methods=["GET"]),
+            Route("/v1/opportunities", self.list_candidates, methods=["GET"]),
+            Route("/v1/candidates/{id}", self.get_candidate, methods=["GET"]),
+            Route("/v1/opportunities/{id}", self.get_candidate, methods=["GET"]),
+            Route("/v1/candidates/{id}/resumes", self.get_resumes, methods=["GET"]),
+            Route("/v1/requisitions", self.list_requisitions, methods=["GET"]),
+            Route("/v1/requisitions", self.create_requisition, methods=["POST"]),
+            Route("/_stats", self.stats, methods=["GET"]),
+        ])
+
+    def _throttle(self) -> bool:
+        if self.rate_limit is None:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    async def _fault(self) -> Optional[Response]:
+        """Apply injected latency, then maybe answer with a 429 or 503 instead."""
+        self.requests += 1
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._throttle():
+            self.throttled += 1
+            return JSONResponse({"code": "TooManyRequests"}, status_code=429,
+                                headers={"Retry-After": f"{self.retry_after:g}"})
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return JSONResponse({"code": "ServiceUnavailable"}, status_code=503)
+        return None
+
+    async def list_candidates(self, request: Request) -> Response:
+        fault = await self._fault()
+        if fault:
+            return fault
+        params = request.query_params
+        limit = max(1, min(int(params.get("limit", 100)), 100))
+        start = int(params.get("offset") or 0)
+        records = self.candidates
+        if params.get("updated_at_start"):
+            since = int(params["updated_at_start"])
+            records = [c for c in records if c["updatedAt"] >= since]
+        page = records[start:start + limit]
+        body = {"data": page, "hasNext": start + limit < len(records)}
+        if body["hasNext"]:
+            body["next"] = str(start + limit)
+        return JSONResponse(body)
+
+    async def get_candidate(self, request: Request) -> Response:
+        fault = await self._fault()
+        if fault:
+            return fault
+        record = self.by_id.get(request.path_params["id"])
+        if record is None:
+            return JSONResponse({"code": "ResourceNotFound"}, status_code=404)
+        etag = '"' + hashlib.md5(json.dumps(record, sort_keys=True).encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse({"data": record}, headers={"ETag": etag})
+
+    async def get_resumes(self, request: Request) -> Response:
+        fault = await self._fault()
+        if fault:
+            return fault
+        return JSONResponse({"data": []})
+
+    async def list_requisitions(self, request: Request) -> Response:
+        fault = await self._fault()
+        if fault:
+            return fault
+        code = request.query_params.get("requisition_code")
+        data = [r for r in self.requisitions.values() if code is None or r["requisitionCode"] == code]
+        return JSONResponse({"data": data, "hasNext": False})
+
+    async def create_requisition(self, request: Request) -> Response:
+        fault = await self._fault()
+        if fault:
+            return fault
+        body = await request.json()
+        code = body.get("requisitionCode") or f"REQ-{len(self.requisitions) + 1}"
+        if code in self.requisitions:
+            return JSONResponse({"code": "BadRequest", "message": f"Requisition code {code} already exists"}, status_code=400)
+        requisition = dict(body, id=f"req-{len(self.requisitions) + 1}", requisitionCode=code, createdAt=int(time.time() * 1000))
+        self.requisitions[code] = requisition
+        return JSONResponse({"data": requisition}, status_code=201)
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse({"requests": self.requests, "throttled": self.throttled, "errors": self.errors})
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Lever API simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay in seconds")
+    parser.add_argument("--rate-limit", type=float, help="Requests/second before answering 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args(argv)
+
+    simulator = LeverSimulator(
+        candidates=args.candidates, latency=args.latency, jitter=args.jitter,
+        rate_limit=args.rate_limit, retry_after=args.retry_after, error_rate=args.error_rate
+    )
+    print(f"Lever simulator: {args.candidates} candidates at http://{args.host}:{args.port}/v1")
+    uvicorn.run(simulator.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Load generator for the MCP server over streamable HTTP.
+
+Each worker plays an agent: it lists a page of candidates and opens a few of
+them, as fast as the server answers. At the end, per-tool and overall
+p50/p95/p99 latency and calls per second are printed (or written as JSON),
+and the run fails if latency or error thresholds are exceeded, so it can
+gate a deploy.
+
+Against a running server (e.g. ./run_http.sh pointed at tests/lever_simulator.py):
+
+    python tests/load_generator.py --url http://localhost:8005/mcp --concurrency 20 --duration 30
+
+Or let it start the Lever simulator and the server itself:
+
+    python tests/load_generator.py --spawn --concurrency 20 --duration 30 --max-p95-ms 250
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+from typing import Optional, Dict, Any, List
+
+from fastmcp import Client
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    calls = len(values)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "calls_per_second": round(calls / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+class LoadRun:
+    """Collects per-tool latencies from concurrent workers."""
+
+    def __init__(self, url: str, concurrency: int, duration: float, opens_per_page: int, pages: int):
+        self.url = url
+        self.concurrency = concurrency
+        self.duration = duration
+        self.opens_per_page = opens_per_page
+        self.pages = pages
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def _call(self, client: Client, tool: str, arguments: Dict[str, Any]) -> Optional[str]:
+        start = time.perf_counter()
+        try:
+            result = await client.call_tool(tool, arguments, raise_on_error=False)
+            text = result.content[0].text if result.content else ""
+            failed = result.is_error or text.startswith(("Error", "Configuration error"))
+        except Exception:
+            text, failed = None, True
+        self.latencies.setdefault(tool, []).append(time.perf_counter() - start)
+        if failed:
+            self.errors[tool] = self.errors.get(tool, 0) + 1
+            return None
+        return text
+
+    async def _worker(self, seed: int, deadline: float) -> None:
+        rng = random.Random(seed)
+        async with Client(self.url) as client:
+            while time.monotonic() < deadline:
+                offset = str(rng.randrange(self.pages) * 10) if self.pages > 1 else None
+                arguments = {"limit": 10, "fields": "summary"}
+                if offset and offset != "0":
+                    arguments["offset"] = offset
+                text = await self._call(client, "list_candidates", arguments)
+                if text is None:
+                    continue
+                ids = [c["id"] for c in json.loads(text).get("data", []) if c.get("id")]
+                for candidate_id in rng.sample(ids, min(self.opens_per_page, len(ids))):
+                    await self._call(client, "get_candidate", {"candidate_id": candidate_id, "fields": "contact"})
+
+    async def run(self) -> Dict[str, Any]:
+        start = time.monotonic()
+        deadline = start + self.duration
+        await asyncio.gather(*(self._worker(i, deadline) for i in range(self.concurrency)))
+        seconds = time.monotonic() - start
+
+        all_latencies = [v for values in self.latencies.values() for v in values]
+        report = summarize(all_latencies, sum(self.errors.values()), seconds)
+        report["concurrency"] = self.concurrency
+        report["seconds"] = round(seconds, 2)
+        report["tools"] = {
+            tool: summarize(values, self.errors.get(tool, 0), seconds)
+            for tool, values in sorted(self.latencies.items())
+        }
+        return report
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout}s")
+
+
+def spawn(args) -> List[subprocess.Popen]:
+    """Start the Lever simulator and the MCP server (streamable HTTP) as subprocesses."""
+    sim_port, mcp_port = _free_port(), _free_port()
+    simulator = subprocess.Popen([
+        sys.executable, os.path.join(REPO_ROOT, "tests", "lever_simulator.py"),
+        "--port", str(sim_port), "--candidates", str(args.candidates),
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+        *(["--rate-limit", str(args.rate_limit)] if args.rate_limit else []),
+    ])
+    env = dict(
+        os.environ,
+        LEVER_API_KEY=os.environ.get("LEVER_API_KEY", "load-test"),
+        LEVER_API_BASE_URL=f"http://127.0.0.1:{sim_port}/v1",
+        PYTHONPATH=os.pathsep.join(filter(None, [os.environ.get("PYTHONPATH"), os.path.join(REPO_ROOT, "src")])),
+    )
+    server = subprocess.Popen(
+        ["fastmcp", "run", os.path.join(REPO_ROOT, "src", "server.py") + ":mcp",
+         "--transport", "streamable-http", "--port", str(mcp_port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    processes = [simulator, server]
+    try:
+        _wait_for_port(sim_port)
+        _wait_for_port(mcp_port)
+    except Exception:
+        for process in processes:
+            process.terminate()
+        raise
+    args.url = f"http://127.0.0.1:{mcp_port}/mcp"
+    return processes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the Lever MCP server over streamable HTTP")
+    parser.add_argument("--url", default="http://localhost:8005/mcp", help="MCP endpoint of a running server")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent simulated agents")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--opens-per-page", type=int, default=3, help="get_candidate calls after each list")
+    parser.add_argument("--pages", type=int, default=20, help="Distinct list pages agents pick from")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if overall p95 latency exceeds this")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Fail if the error rate exceeds this")
+    spawn_group = parser.add_argument_group("--spawn: start the Lever simulator and server locally")
+    spawn_group.add_argument("--spawn", action="store_true")
+    spawn_group.add_argument("--candidates", type=int, default=2000)
+    spawn_group.add_argument("--latency", type=float, default=0.05, help="Simulated Lever latency in seconds")
+    spawn_group.add_argument("--jitter", type=float, default=0.02)
+    spawn_group.add_argument("--rate-limit", type=float, help="Simulated Lever requests/second before 429s")
+    args = parser.parse_args(argv)
+
+    processes = spawn(args) if args.spawn else []
+    try:
+        run = LoadRun(args.url, args.concurrency, args.duration, args.opens_per_page, args.pages)
+        report = asyncio.run(run.run())
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    error_rate = report["errors"] / report["calls"] if report["calls"] else 1.0
+    if error_rate > args.max_error_rate:
+        failures.append(f"error rate {error_rate:.2%} > {args.max_error_rate:.2%}")
+    if args.max_p95_ms is not None and report["p95_ms"] > args.max_p95_ms:
+        failures.append(f"p95 {report['p95_ms']}ms > {args.max_p95_ms}ms")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
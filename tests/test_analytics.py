@@ -0,0 +1,176 @@
+import pytest
+
+from lever_mcp.mirror import CandidateMirror
+
+DAY = 86400000
+
+
+def candidate(i, posting, sources, stages, days_per_stage=2, archived=False):
+    record = {
+        "id": f"c{i}",
+        "name": f"Candidate {i}",
+        "applications": [{"id": f"a{i}", "posting": posting}],
+        "sources": sources,
+        "stage": stages[-1],
+        "stageChanges": [{"toStageId": s, "toStageIndex": n, "updatedAt": n * days_per_stage * DAY} for n, s in enumerate(stages)],
+    }
+    if archived:
+        record["archived"] = {"reason": "r", "archivedAt": 1}
+    return record
+
+
+def make_mirror():
+    mirror = CandidateMirror()
+    mirror.upsert_many([
+        candidate(0, "p1", ["Referral"], ["applied", "screen", "onsite"]),
+        candidate(1, "p1", ["LinkedIn"], ["applied", "screen"], days_per_stage=3),
+        candidate(2, "p1", ["LinkedIn"], ["applied"], archived=True),
+        candidate(3, "p2", ["LinkedIn"], ["applied"]),
+    ])
+    return mirror
+
+
+def test_funnel_time_in_stage_and_sources():
+    stats = make_mirror().pipeline_stats("p1")
+
+    assert stats["candidates"] == 3
+    assert stats["archived"] == 1
+    funnel = {entry["stage"]: entry for entry in stats["funnel"]}
+    assert [entry["stage"] for entry in stats["funnel"]] == ["applied", "screen", "onsite"]
+    assert funnel["applied"]["reached"] == 3
+    assert funnel["screen"] == {"stage": "screen", "current": 1, "reached": 2, "median_days_in_stage": 2.0}
+    # c0 spent 2 days and c1 3 days in "applied"
+    assert funnel["applied"]["median_days_in_stage"] == 2.5
+
+    sources = {s["source"]: s for s in stats["sources"]}
+    assert sources["LinkedIn"]["candidates"] == 2
+    assert sources["LinkedIn"]["advance_rate"] == 0.5
+    assert sources["Referral"]["advance_rate"] == 1.0
+
+
+def test_stats_are_cached_per_posting_and_invalidated_on_change():
+    mirror = make_mirror()
+    first = mirror.pipeline_stats("p1")
+    p2 = mirror.pipeline_stats("p2")
+    assert mirror.pipeline_stats("p1") is first
+    assert mirror.analytics.hits == 1
+
+    mirror.upsert_many([candidate(4, "p1", ["Referral"], ["applied"])])
+    assert mirror.pipeline_stats("p2") is p2
+    assert mirror.pipeline_stats("p1")["candidates"] == 4
+
+    mirror.delete("c3")
+    assert mirror.pipeline_stats("p2")["candidates"] == 0
+    assert mirror.pipeline_stats()["candidates"] == 4
+
+
+def test_unexpanded_applications_keep_known_postings():
+    mirror = make_mirror()
+    record = mirror.get_candidate("c0")
+    record["applications"] = ["a0"]
+    mirror.upsert_many([record])
+    assert mirror.pipeline_stats("p1")["candidates"] == 3
+
+
+def test_change_keeps_other_postings_and_bounds_all_postings_staleness(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("lever_mcp.analytics.time.monotonic", lambda: now[0])
+    mirror = make_mirror()
+    mirror.analytics.all_max_age = 60
+    everything = mirror.pipeline_stats()
+    p2 = mirror.pipeline_stats("p2")
+
+    mirror.upsert_many([candidate(4, "p1", ["Referral"], ["applied"])])
+    assert mirror.pipeline_stats("p2") is p2
+    assert mirror.pipeline_stats() is everything
+
+    now[0] += 61
+    assert mirror.pipeline_stats()["candidates"] == 5
+
+
+def test_stats_computed_across_a_change_are_not_cached(monkeypatch):
+    mirror = make_mirror()
+    analytics = mirror.analytics
+    compute = analytics._compute
+
+    def racing_compute(posting_id):
+        result = compute(posting_id)
+        mirror.upsert_many([candidate(5, "p1", ["Referral"], ["applied"])])
+        return result
+
+    monkeypatch.setattr(analytics, "_compute", racing_compute)
+    assert mirror.pipeline_stats("p1")["candidates"] == 3
+    monkeypatch.setattr(analytics, "_compute", compute)
+    assert mirror.pipeline_stats("p1")["candidates"] == 4
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stats_tool_computes_off_the_event_loop(monkeypatch):
+    import json
+    import threading
+    from lever_mcp import server
+
+    mirror = make_mirror()
+    compute = mirror.analytics._compute
+    threads = []
+
+    def recording_compute(posting_id):
+        threads.append(threading.current_thread())
+        return compute(posting_id)
+
+    monkeypatch.setattr(mirror.analytics, "_compute", recording_compute)
+    monkeypatch.setattr(server, "get_mirror", lambda: mirror)
+
+    stats = json.loads(await server._pipeline_stats("p1"))
+    assert stats["candidates"] == 3
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_file_mirror_stats_read_only_committed_data(tmp_path):
+    import threading
+
+    mirror = CandidateMirror(str(tmp_path / "mirror.db"))
+    mirror.upsert_many([candidate(0, "p1", ["Referral"], ["applied"])])
+    index = mirror.analytics.index
+    seen = []
+
+    def index_then_read(candidate_id, record):
+        index(candidate_id, record)
+        # A stats thread running mid-batch must not see the uncommitted rows
+        thread = threading.Thread(target=lambda: seen.append(mirror.pipeline_stats("p1")["candidates"]))
+        thread.start()
+        thread.join(5)
+
+    mirror.analytics.index = index_then_read
+    mirror.upsert_many([candidate(i, "p1", ["Referral"], ["applied"]) for i in range(1, 3)])
+    mirror.analytics.index = index
+
+    assert seen == [1, 1]
+    assert mirror.pipeline_stats("p1")["candidates"] == 3
+    mirror.close()
+
+
+def test_memory_mirror_stats_wait_for_a_batch_to_commit():
+    import threading
+
+    mirror = make_mirror()
+    index = mirror.analytics.index
+    seen = []
+    threads = []
+
+    def index_then_read(candidate_id, record):
+        index(candidate_id, record)
+        thread = threading.Thread(target=lambda: seen.append(mirror.pipeline_stats("p1")["candidates"]))
+        thread.start()
+        thread.join(0.1)
+        # Blocked on the shared connection until the batch commits
+        assert thread.is_alive()
+        threads.append(thread)
+
+    mirror.analytics.index = index_then_read
+    mirror.upsert_many([candidate(i, "p1", ["Referral"], ["applied"]) for i in range(4, 6)])
+    mirror.analytics.index = index
+    for thread in threads:
+        thread.join(5)
+
+    assert seen == [5, 5]
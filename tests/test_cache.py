@@ -0,0 +1,132 @@
+import pytest
+import httpx
+import time
+
+from lever_mcp.cache import TTLCache, get_candidate_cache, invalidate_candidate
+
+
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.lookup("a").value == 1
+    cache.set("c", 3)
+    assert cache.lookup("b") is None
+    assert cache.lookup("a").value == 1
+    assert cache.evictions == 1
+
+
+def test_expired_entry_without_validator_is_dropped():
+    cache = TTLCache(max_size=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.lookup("a") is None
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TTLCache(max_size=10, ttl=0)
+    cache.set("a", 1)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_candidate_served_from_cache(make_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"data": {"id": "c1"}})
+
+    client = make_client(handler)
+    first = await client.get_candidate("c1")
+    second = await client.get_candidate("c1")
+    assert first == second
+    assert len(calls) == 1
+    assert client.candidate_cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_revalidated_with_etag(make_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"data": {"id": "c1"}}, headers={"ETag": '"v1"'})
+
+    client = make_client(handler)
+    client.candidate_cache.ttl = 0.01
+    await client.get_candidate("c1")
+    time.sleep(0.02)
+
+    assert await client.get_candidate("c1") == {"data": {"id": "c1"}}
+    assert len(calls) == 2
+    assert client.candidate_cache.revalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_candidate_forces_refetch(make_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"data": {"id": "c1", "updatedAt": len(calls)}})
+
+    client = make_client(handler, "cache-invalidate")
+    await client.get_candidate("c1")
+    invalidate_candidate("c1")
+    result = await client.get_candidate("c1")
+    assert result["data"]["updatedAt"] == 2
+    assert get_candidate_cache("cache-invalidate").invalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_racing_an_invalidation_does_not_cache_stale_record(make_client):
+    import asyncio
+
+    started, release = asyncio.Event(), asyncio.Event()
+    versions = iter(["old", "new", "newer"])
+
+    async def handler(request):
+        name = next(versions)
+        if name == "old":
+            started.set()
+            await release.wait()
+        return httpx.Response(200, json={"data": {"id": "c1", "name": name}})
+
+    client = make_client(handler)
+    slow_read = asyncio.create_task(client.get_candidate("c1"))
+    await started.wait()
+
+    # A write lands while the first GET is still in flight
+    client.invalidate_candidate("c1")
+    assert (await client.get_candidate("c1"))["data"]["name"] == "new"
+
+    release.set()
+    assert (await slow_read)["data"]["name"] == "old"
+    assert (await client.get_candidate("c1"))["data"]["name"] == "new"
+
+
+def test_set_skips_values_fetched_before_an_invalidation():
+    cache = TTLCache(max_size=2, ttl=60)
+    generation = cache.generation("c1")
+    cache.invalidate("c1")
+    cache.set("c1", "stale", generation=generation)
+    assert len(cache) == 0
+
+    cache.set("c1", "fresh", generation=cache.generation("c1"))
+    assert cache.lookup("c1").value == "fresh"
+
+
+def test_peek_does_not_count_or_reorder():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.peek("a").value == 1
+    assert cache.peek("missing") is None
+    cache.set("c", 3)
+
+    assert cache.peek("a") is None  # still least recently used, so evicted
+    assert (cache.hits, cache.misses) == (0, 0)
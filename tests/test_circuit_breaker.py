@@ -0,0 +1,136 @@
+import json
+
+import httpx
+import pytest
+
+from lever_mcp.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("lever_mcp.circuit_breaker.time.monotonic", lambda: now[0])
+    return now
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.min_calls):
+        breaker.before_call()
+        breaker.record(False)
+
+
+def test_opens_once_error_rate_crosses_threshold(clock):
+    breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4)
+
+    for ok in (True, True, False):
+        breaker.before_call()
+        breaker.record(ok)
+    assert breaker.state == CLOSED  # too few calls to judge
+
+    breaker.before_call()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_failures_age_out_of_the_window(clock):
+    breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4, window=10)
+    for _ in range(3):
+        breaker.record(False)
+    clock[0] += 11
+    for _ in range(3):
+        breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_admits_one_probe_then_closes(clock):
+    breaker = CircuitBreaker("test", min_calls=2, open_seconds=5)
+    trip(breaker)
+
+    clock[0] += 5
+    breaker.before_call()  # the probe
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("test", min_calls=2, open_seconds=5)
+    trip(breaker)
+
+    clock[0] += 5
+    breaker.before_call()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["times_opened"] == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_lost_probe_is_replaced_after_cool_down(clock):
+    breaker = CircuitBreaker("test", min_calls=2, open_seconds=5)
+    trip(breaker)
+
+    clock[0] += 5
+    breaker.before_call()  # never reports back
+    clock[0] += 5
+    breaker.before_call()
+
+
+@pytest.mark.asyncio
+async def test_call_counts_5xx_but_not_4xx():
+    breaker = CircuitBreaker("test", min_calls=2)
+
+    async def not_found():
+        return httpx.Response(404)
+
+    async def unavailable():
+        return httpx.Response(503)
+
+    await breaker.call(not_found)
+    await breaker.call(not_found)
+    assert breaker.state == CLOSED
+
+    await breaker.call(unavailable)
+    await breaker.call(unavailable)
+    assert breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_lever_client_fails_fast_while_lever_is_down(make_client):
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    client = make_client(handler, fast_retries=True)
+    client.breaker = CircuitBreaker("lever", min_calls=2, open_seconds=60)
+
+    # The breaker trips during the retries and cuts them short
+    with pytest.raises(CircuitOpenError):
+        await client.get_candidates(limit=10)
+    assert calls == 2
+
+    with pytest.raises(CircuitOpenError):
+        await client.get_candidate("abc")
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_health_reports_breaker_states():
+    from lever_mcp.server import health_check
+
+    response = await health_check(None)
+    body = json.loads(response.body)
+
+    assert {"lever", "google"} <= set(body["circuit_breakers"])
+    assert body["circuit_breakers"]["lever"]["state"] in (CLOSED, OPEN, HALF_OPEN)
@@ -0,0 +1,126 @@
+import pytest
+import httpx
+import asyncio
+import os
+
+from lever_mcp import client as client_module
+from lever_mcp.client import get_lever_client, get_http_client, close_http_client
+
+os.environ["LEVER_API_KEY"] = "test_key"
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client_is_reused():
+    first = get_http_client()
+    second = get_http_client()
+    assert first is second
+
+    await close_http_client()
+    assert first.is_closed
+    assert get_http_client() is not first
+    await close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_get_lever_client_is_cached_per_key():
+    assert get_lever_client() is get_lever_client("test_key")
+    assert get_lever_client("other_key") is not get_lever_client("test_key")
+    await close_http_client()
+    assert client_module._lever_clients == {}
+
+
+def test_get_lever_client_requires_key(monkeypatch):
+    monkeypatch.delenv("LEVER_API_KEY")
+    with pytest.raises(ValueError):
+        get_lever_client()
+
+
+@pytest.mark.asyncio
+async def test_pool_settings_from_environment(monkeypatch):
+    monkeypatch.setenv("LEVER_HTTP_TIMEOUT", "5")
+    monkeypatch.setenv("LEVER_HTTP_CONNECT_TIMEOUT", "2")
+    http = client_module.build_http_client()
+    assert http.timeout.read == 5.0
+    assert http.timeout.connect == 2.0
+    await http.aclose()
+
+
+@pytest.mark.asyncio
+async def test_requests_use_injected_client(make_client):
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["Authorization"].startswith("Basic ")
+        return httpx.Response(200, json={"data": {"id": request.url.path.rsplit("/", 1)[-1]}})
+
+    client = make_client(handler)
+    result = await client.get_candidate("abc")
+    assert result == {"data": {"id": "abc"}}
+
+
+def paged_handler(total: int, calls: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(dict(request.url.params))
+        start = int(request.url.params.get("offset", 0))
+        limit = int(request.url.params["limit"])
+        end = min(start + limit, total)
+        body = {"data": [{"id": str(i)} for i in range(start, end)], "hasNext": end < total}
+        if end < total:
+            body["next"] = str(end)
+        return httpx.Response(200, json=body)
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_iter_candidates_follows_cursor(make_client):
+    calls = []
+    client = make_client(paged_handler(250, calls))
+
+    ids = [c["id"] async for c in client.iter_candidates(page_size=100)]
+    assert ids == [str(i) for i in range(250)]
+    assert [c.get("offset") for c in calls] == [None, "100", "200"]
+
+
+@pytest.mark.asyncio
+async def test_iter_candidates_respects_max_items(make_client):
+    calls = []
+    client = make_client(paged_handler(250, calls))
+
+    ids = [c["id"] async for c in client.iter_candidates(page_size=100, max_items=30)]
+    assert ids == [str(i) for i in range(30)]
+    assert calls[0]["limit"] == "30"
+
+
+@pytest.mark.asyncio
+async def test_iter_candidate_pages_resumes_from_offset(make_client):
+    calls = []
+    client = make_client(paged_handler(250, calls))
+
+    pages = [page async for page in client.iter_candidate_pages(page_size=100, offset="200")]
+    assert len(pages) == 1
+    assert pages[0]["data"][0]["id"] == "200"
+
+
+@pytest.mark.asyncio
+async def test_get_candidates_by_id_dedupes_and_reports_errors(make_client):
+    calls = []
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        candidate_id = request.url.path.rsplit("/", 1)[-1]
+        calls.append(candidate_id)
+        if candidate_id == "missing":
+            return httpx.Response(404)
+        return httpx.Response(200, json={"data": {"id": candidate_id}})
+
+    client = make_client(handler)
+    client.candidate_cache.clear()
+    ids = ["b1", "b2", "b1", "missing", "b3", "b4"]
+    batch = await client.get_candidates_by_id(ids, concurrency=2)
+
+    assert sorted(calls) == ["b1", "b2", "b3", "b4", "missing"]
+    assert set(batch["results"]) == {"b1", "b2", "b3", "b4"}
+    assert batch["errors"] == {"missing": "HTTP 404"}
+    assert in_flight["max"] == 2
@@ -0,0 +1,75 @@
+import asyncio
+import httpx
+import pytest
+
+from lever_mcp.coalesce import SingleFlight
+
+
+def slow_handler(calls: list, status: int = 200):
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.01)
+        data = [{"id": "c1"}] if request.url.path.endswith("/candidates") else {"id": "c1"}
+        return httpx.Response(status, json={"data": data, "hasNext": False})
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_candidate_shares_one_call(monkeypatch, make_client):
+    monkeypatch.setenv("LEVER_CACHE_TTL", "0")
+    calls = []
+    client = make_client(slow_handler(calls))
+
+    results = await asyncio.gather(*(client.get_candidate("c1") for _ in range(5)))
+    assert len(calls) == 1
+    assert all(r == results[0] for r in results)
+    assert client.singleflight.snapshot()["coalesced"] == 4
+
+    # Once the call completes the key is released
+    await client.get_candidate("c1")
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_pages_coalesce_but_different_pages_do_not(make_client):
+    calls = []
+    client = make_client(slow_handler(calls))
+
+    await asyncio.gather(
+        client.get_candidates(limit=10),
+        client.get_candidates(limit=10),
+        client.get_candidates(limit=10, offset="abc"),
+    )
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_with_every_waiter():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    first = asyncio.ensure_future(flight.do("k", work))
+    second = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "ok"
+    assert flight.snapshot()["in_flight"] == 0
@@ -0,0 +1,172 @@
+import json
+import zlib
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from lever_mcp.client import LeverClient, build_http_client
+from lever_mcp.compression import CompressionMiddleware, CpuBudget, _accepted
+from tests.lever_simulator import LeverSimulator
+
+LARGE = {"data": [{"id": f"c-{i}", "name": "Candidate", "stage": "applicant"} for i in range(200)]}
+
+
+async def large(request):
+    return JSONResponse(LARGE)
+
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+
+async def image(request):
+    return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+
+async def events(request):
+    async def stream():
+        for i in range(3):
+            yield f"data: {json.dumps({'event': i, 'pad': 'x' * 500})}\n\n"
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def small_events(request):
+    async def stream():
+        yield "event: message\n"
+        yield f"data: {json.dumps({'result': 'x' * 200})}\n\n"
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+def make_app(**kwargs):
+    app = Starlette(routes=[
+        Route("/large", large), Route("/small", small), Route("/image", image),
+        Route("/events", events, methods=["GET", "POST"]), Route("/small-events", small_events, methods=["POST"])
+    ])
+    middleware = CompressionMiddleware(app, **kwargs)
+    return middleware, httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_gzipped():
+    middleware, client = make_app(minimum_size=1024)
+    response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(LARGE))
+    assert response.json() == LARGE
+    assert middleware.snapshot()["compressed_responses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_small_and_binary_responses_are_not_compressed():
+    middleware, client = make_app(minimum_size=1024)
+
+    small_response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+    image_response = await client.get("/image", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in small_response.headers
+    assert small_response.json() == {"ok": True}
+    assert "content-encoding" not in image_response.headers
+    assert middleware.snapshot()["skipped_small"] == 1
+
+
+@pytest.mark.asyncio
+async def test_identity_when_client_does_not_accept_gzip():
+    _, client = make_app(minimum_size=0)
+    response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE
+
+
+@pytest.mark.asyncio
+async def test_exhausted_cpu_budget_skips_compression():
+    middleware, client = make_app(minimum_size=0, cpu_budget=0.0)
+    response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE
+    assert middleware.snapshot()["skipped_cpu_budget"] == 1
+
+
+@pytest.mark.asyncio
+async def test_event_stream_is_compressed_and_flushed_per_event():
+    _, client = make_app(minimum_size=1024)
+    async with client.stream("GET", "/events", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = [decoder.decompress(chunk) async for chunk in response.aiter_raw()]
+
+    # Each compressed chunk decodes on its own to whole events, nothing held back
+    assert all(c.endswith(b"\n\n") for c in chunks if c)
+    events_seen = [json.loads(e[len("data: "):])["event"] for e in b"".join(chunks).decode().split("\n\n") if e]
+    assert events_seen == [0, 1, 2]
+
+
+def test_cpu_budget_refills_over_time(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("lever_mcp.compression.time.monotonic", lambda: now[0])
+    budget = CpuBudget(0.5)
+
+    budget.spend(1.0)
+    assert not budget.has_budget()
+    now[0] += 2.0
+    assert budget.has_budget()
+
+
+def test_accept_encoding_parsing_honours_q_zero():
+    assert _accepted("gzip;q=0, br, deflate;q=0.5") == ["br", "deflate"]
+
+
+def test_upstream_client_requests_compressed_responses():
+    client = build_http_client()
+    assert "gzip" in client.headers["accept-encoding"]
+
+
+@pytest.mark.asyncio
+async def test_lever_client_decodes_compressed_upstream_responses():
+    simulator = LeverSimulator(candidates=50)
+    compressed = CompressionMiddleware(simulator.app, minimum_size=0)
+    http_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=compressed), headers={"Accept-Encoding": "gzip"}
+    )
+    client = LeverClient(api_key="compressed-upstream", http_client=http_client)
+    client.base_url = "http://lever.test/v1"
+
+    page = await client.get_candidates(limit=50)
+
+    assert len(page["data"]) == 50
+    assert compressed.snapshot()["compressed_responses"] == 1
+
+
+def test_server_http_app_includes_compression():
+    from lever_mcp.server import mcp
+
+    app = mcp.http_app(transport="streamable-http")
+    assert any(m.cls is CompressionMiddleware for m in app.user_middleware)
+
+
+@pytest.mark.asyncio
+async def test_small_streamed_response_is_not_compressed():
+    middleware, client = make_app(minimum_size=1024)
+    response = await client.post("/small-events", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert json.loads(response.text.split("data: ")[1])["result"] == "x" * 200
+    assert middleware.snapshot()["skipped_small"] == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_is_compressed_once_past_the_threshold():
+    middleware, client = make_app(minimum_size=1024)
+    response = await client.post("/events", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    events_seen = [json.loads(e[len("data: "):])["event"] for e in response.text.split("\n\n") if e]
+    assert events_seen == [0, 1, 2]
+    assert middleware.snapshot()["compressed_responses"] == 1
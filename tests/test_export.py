@@ -0,0 +1,136 @@
+import csv
+import asyncio
+import json
+import httpx
+import pytest
+
+from lever_mcp.export import export_candidates, checkpoint_path
+
+
+def paged_handler(total: int, calls: list, fail_at=None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params.get("offset", 0))
+        calls.append(start)
+        if fail_at is not None and start == fail_at:
+            return httpx.Response(400, json={"message": "boom"})
+        end = min(start + int(request.url.params["limit"]), total)
+        body = {
+            "data": [{"id": str(i), "name": f"C{i}", "tags": ["a", "b"], "stage": "s"} for i in range(start, end)],
+            "hasNext": end < total
+        }
+        if end < total:
+            body["next"] = str(end)
+        return httpx.Response(200, json=body)
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_streams_all_pages(tmp_path, make_client):
+    path = str(tmp_path / "out.ndjson")
+    summary = await export_candidates(make_client(paged_handler(250, [])), path, page_size=100)
+
+    lines = open(path).read().splitlines()
+    assert summary["records"] == 250
+    assert [json.loads(line)["id"] for line in lines] == [str(i) for i in range(250)]
+    assert not (tmp_path / "out.ndjson.checkpoint.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_csv_export_flattens_projected_columns(tmp_path, make_client):
+    path = str(tmp_path / "out.csv")
+    await export_candidates(make_client(paged_handler(3, [])), path, format="csv", fields="id,name,tags")
+
+    rows = list(csv.reader(open(path)))
+    assert rows[0] == ["id", "name", "tags"]
+    assert rows[1] == ["0", "C0", '["a","b"]']
+    assert len(rows) == 4
+
+
+@pytest.mark.asyncio
+async def test_interrupted_export_resumes_from_checkpoint(tmp_path, make_client):
+    path = str(tmp_path / "out.ndjson")
+    with pytest.raises(httpx.HTTPStatusError):
+        await export_candidates(make_client(paged_handler(250, [], fail_at=200)), path, page_size=100)
+    assert json.load(open(checkpoint_path(path)))["offset"] == "200"
+
+    calls = []
+    summary = await export_candidates(make_client(paged_handler(250, calls)), path, page_size=100, resume=True)
+    assert calls == [200]
+    assert summary["records"] == 250
+    assert [json.loads(line)["id"] for line in open(path)] == [str(i) for i in range(250)]
+
+
+@pytest.mark.asyncio
+async def test_resume_rejects_different_options(tmp_path, make_client):
+    path = str(tmp_path / "out.ndjson")
+    with pytest.raises(httpx.HTTPStatusError):
+        await export_candidates(make_client(paged_handler(250, [], fail_at=100)), path, page_size=100)
+    with pytest.raises(ValueError):
+        await export_candidates(make_client(paged_handler(250, [])), path, fields="summary", resume=True)
+
+
+@pytest.mark.asyncio
+async def test_parquet_export(tmp_path, make_client):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "out.parquet")
+    await export_candidates(make_client(paged_handler(250, [])), path, format="parquet", fields="id,name")
+
+    table = pq.read_table(path)
+    assert table.num_rows == 250
+    assert table.column_names == ["id", "name"]
+
+
+@pytest.mark.asyncio
+async def test_parquet_export_refuses_directory_it_did_not_write(tmp_path, make_client):
+    pytest.importorskip("pyarrow.parquet")
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    (reports / "q3_board_deck.xlsx").write_bytes(b"keep me")
+
+    with pytest.raises(ValueError, match="did not write"):
+        await export_candidates(make_client(paged_handler(3, [])), str(reports), format="parquet", fields="id")
+    assert (reports / "q3_board_deck.xlsx").read_bytes() == b"keep me"
+
+
+@pytest.mark.asyncio
+async def test_fresh_parquet_export_replaces_previous_parts(tmp_path, monkeypatch, make_client):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr("lever_mcp.export.PARQUET_ROW_GROUP_SIZE", 100)
+    path = str(tmp_path / "out.parquet")
+
+    await export_candidates(make_client(paged_handler(250, [])), path, format="parquet", fields="id")
+    await export_candidates(make_client(paged_handler(50, [])), path, format="parquet", fields="id")
+
+    assert pq.read_table(path).num_rows == 50
+
+
+@pytest.mark.asyncio
+async def test_disk_writes_run_off_the_event_loop(tmp_path, monkeypatch, make_client):
+    import os
+    import threading
+
+    fsync = os.fsync
+    threads = []
+
+    def recording_fsync(fd):
+        threads.append(threading.current_thread())
+        fsync(fd)
+
+    monkeypatch.setattr("lever_mcp.export.os.fsync", recording_fsync)
+    await export_candidates(make_client(paged_handler(250, [])), str(tmp_path / "out.ndjson"), page_size=100)
+
+    assert threads and threading.main_thread() not in threads
+
+
+@pytest.mark.asyncio
+async def test_exports_started_together_get_distinct_ids(tmp_path, monkeypatch, make_client):
+    from lever_mcp.export import start_export
+
+    monkeypatch.setenv("LEVER_EXPORT_DIR", str(tmp_path))
+    first = start_export(lambda: make_client(paged_handler(3, [])))
+    second = start_export(lambda: make_client(paged_handler(3, [])))
+    await asyncio.gather(first._task, second._task)
+
+    assert first.export_id != second.export_id
+    assert first.path != second.path
+    assert first.status == second.status == "complete"
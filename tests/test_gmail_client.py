@@ -0,0 +1,198 @@
+import json
+import time
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from google.oauth2.credentials import Credentials
+
+from lever_mcp import gmail_client
+from lever_mcp.gmail_client import GmailClient, GmailAPIError, gmail_messages
+
+
+@pytest.fixture
+def make_gmail_client(mock_http):
+    def factory(handler, **kwargs) -> GmailClient:
+        return GmailClient(http_client=mock_http(handler), **kwargs)
+    return factory
+
+
+@pytest.fixture
+def token_store(monkeypatch):
+    store = {}
+    monkeypatch.setattr(gmail_client.oauth_config, "load_token", lambda user_id="default": store.get(user_id))
+    monkeypatch.setattr(gmail_client.oauth_config, "save_token", lambda data, user_id="default": store.__setitem__(user_id, data))
+    return store
+
+
+def expired_credentials() -> Credentials:
+    return Credentials(
+        token="old-token", refresh_token="refresh-1", token_uri="https://oauth2.googleapis.com/token",
+        client_id="cid", client_secret="secret", expiry=datetime.utcnow() - timedelta(minutes=5)
+    )
+
+
+def test_gmail_resource_is_built_once():
+    assert gmail_messages() is gmail_messages()
+
+
+@pytest.mark.asyncio
+async def test_send_posts_to_gmail_rest_endpoint(monkeypatch, make_gmail_client):
+    gmail_messages()
+    monkeypatch.setattr(gmail_client, "build", lambda *a, **k: pytest.fail("discovery service rebuilt on send"))
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"id": "msg-1"})
+
+    for token in ("token-a", "token-b"):
+        result = await make_gmail_client(handler, access_token=token).send_email("a@example.com", "Hi", "<p>Hi</p>")
+        assert result["message_id"] == "msg-1"
+
+    assert [r.headers["authorization"] for r in requests] == ["Bearer token-a", "Bearer token-b"]
+    assert all(r.method == "POST" and r.url.path == "/gmail/v1/users/me/messages/send" for r in requests)
+    assert "raw" in json.loads(requests[0].content)
+
+
+@pytest.mark.asyncio
+async def test_slow_send_does_not_block_other_sends(make_gmail_client):
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"id": "msg"})
+
+    start = time.monotonic()
+    await asyncio.gather(*(
+        make_gmail_client(handler, access_token=f"t{i}").send_email("a@example.com", "Hi", "x") for i in range(5)
+    ))
+    assert time.monotonic() - start < 0.6
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_refreshed_once_for_concurrent_sends(token_store, make_gmail_client):
+    refreshes = 0
+
+    async def handler(request):
+        nonlocal refreshes
+        if request.url.host == "oauth2.googleapis.com":
+            refreshes += 1
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"access_token": "new-token", "expires_in": 3600})
+        assert request.headers["authorization"] == "Bearer new-token"
+        return httpx.Response(200, json={"id": "msg"})
+
+    client = make_gmail_client(handler, user_id="refresh-user")
+    client.credentials = expired_credentials()
+    assert client.is_authenticated()
+
+    await asyncio.gather(*(client.send_email("a@example.com", "Hi", "x") for _ in range(3)))
+
+    assert refreshes == 1
+    assert client.credentials.valid
+    assert token_store["refresh-user"]["token"] == "new-token"
+
+
+@pytest.mark.asyncio
+async def test_401_triggers_one_refresh_and_retry(token_store, make_gmail_client):
+    tokens = []
+
+    def handler(request):
+        if request.url.host == "oauth2.googleapis.com":
+            return httpx.Response(200, json={"access_token": "new-token", "expires_in": 3600})
+        tokens.append(request.headers["authorization"])
+        if request.headers["authorization"] == "Bearer old-token":
+            return httpx.Response(401, json={"error": {"message": "Invalid Credentials"}})
+        return httpx.Response(200, json={"id": "msg"})
+
+    client = make_gmail_client(handler, user_id="retry-user")
+    client.credentials = expired_credentials()
+    client.credentials.expiry = None  # looks valid until Gmail says otherwise
+
+    result = await client.send_email("a@example.com", "Hi", "x")
+
+    assert result["message_id"] == "msg"
+    assert tokens == ["Bearer old-token", "Bearer new-token"]
+
+
+@pytest.mark.asyncio
+async def test_gmail_error_is_raised(make_gmail_client):
+    def handler(request):
+        return httpx.Response(400, json={"error": {"message": "Invalid To header"}})
+
+    with pytest.raises(GmailAPIError, match="Invalid To header"):
+        await make_gmail_client(handler, access_token="t").send_email("bad", "Hi", "x")
+
+
+def batch_handler(requests, fail_to=()):
+    """Fake Gmail batch endpoint: answers each part, failing recipients in fail_to with a 429."""
+    import base64
+    from email.parser import BytesParser
+    from email.policy import compat32
+
+    def handler(request):
+        assert request.url.path == "/batch/gmail/v1"
+        container = BytesParser(policy=compat32).parsebytes(
+            f"content-type: {request.headers['content-type']}\r\n\r\n".encode() + request.content
+        )
+        parts = container.get_payload()
+        requests.append(len(parts))
+        out = []
+        for part in parts:
+            content_id = part["Content-ID"].strip("<>")
+            request_line, _, rest = part.get_payload().partition("\r\n")
+            assert request_line == "POST /gmail/v1/users/me/messages/send?alt=json HTTP/1.1"
+            raw = json.loads(rest.split("\r\n\r\n", 1)[1])["raw"]
+            to = base64.urlsafe_b64decode(raw).decode().split("\n")[0][len("To: "):]
+            if to in fail_to:
+                status, body = "429 Too Many Requests", {"error": {"message": "Rate limit exceeded"}}
+            else:
+                status, body = "200 OK", {"id": f"id-{to}"}
+            out.append(
+                f"--resp\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(body)}\r\n"
+            )
+        out.append("--resp--\r\n")
+        return httpx.Response(200, content="".join(out).encode(), headers={"content-type": "multipart/mixed; boundary=resp"})
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_send_emails_batches_and_reports_each_message(make_gmail_client):
+    requests = []
+    client = make_gmail_client(batch_handler(requests, fail_to={"c2@example.com"}), access_token="t")
+    messages = [{"to": f"c{i}@example.com", "subject": "Reminder", "body": "<p>Hi</p>"} for i in range(5)]
+    messages.append({"subject": "Reminder", "body": "<p>Hi</p>"})
+
+    results = await client.send_emails(messages, batch_size=2, interval=0)
+
+    assert requests == [2, 2, 1]
+    assert [r["status"] for r in results] == ["sent", "sent", "error", "sent", "sent", "error"]
+    assert results[0]["message_id"] == "id-c0@example.com"
+    assert results[2]["error_code"] == 429 and results[2]["retryable"]
+    assert results[5]["error"] == "Missing field: to" and not results[5]["retryable"]
+
+
+@pytest.mark.asyncio
+async def test_send_emails_caps_batches_at_100(make_gmail_client):
+    requests = []
+    client = make_gmail_client(batch_handler(requests), access_token="t")
+    messages = [{"to": f"c{i}@example.com", "subject": "s", "body": "b"} for i in range(150)]
+
+    results = await client.send_emails(messages, batch_size=500, interval=0)
+
+    assert requests == [100, 50]
+    assert all(r["status"] == "sent" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_request_marks_its_messages_retryable(make_gmail_client):
+    def handler(request):
+        return httpx.Response(503, json={"error": {"message": "Backend Error"}})
+
+    client = make_gmail_client(handler, access_token="t")
+    results = await client.send_emails([{"to": "a@example.com", "subject": "s", "body": "b"}], interval=0)
+
+    assert results[0]["status"] == "error"
+    assert results[0]["error_code"] == 503 and results[0]["retryable"]
@@ -0,0 +1,49 @@
+import pytest
+
+from tests.lever_simulator import LeverSimulator
+from tests.load_generator import percentile
+
+
+@pytest.mark.asyncio
+async def test_client_pages_through_simulator(make_client):
+    simulator = LeverSimulator(candidates=250)
+    client = make_client(app=simulator.app)
+
+    ids = [c["id"] async for c in client.iter_candidates(page_size=100)]
+    assert len(ids) == 250
+    assert len(set(ids)) == 250
+    assert simulator.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_client_retries_simulated_429s(make_client):
+    simulator = LeverSimulator(candidates=10, rate_limit=2, retry_after=0)
+    client = make_client(app=simulator.app)
+    client.retry_policy.max_retries = 10
+
+    for candidate in simulator.candidates[:5]:
+        result = await client.get_candidate_model(candidate["id"])
+        assert result.id == candidate["id"]
+    assert simulator.throttled > 0
+    assert client.rate_limiter.retries == simulator.throttled
+
+
+@pytest.mark.asyncio
+async def test_simulator_requisitions_reject_duplicate_codes(make_client):
+    simulator = LeverSimulator(candidates=0)
+    client = make_client(app=simulator.app)
+    payload = {"requisitionCode": "ENG-1", "name": "Engineer", "location": "Remote", "team": "Eng", "headcountTotal": 1}
+
+    results = await client.create_requisitions([payload])
+    assert results[0]["status"] == "created"
+    client._created_requisitions.clear()
+    results = await client.create_requisitions([payload])
+    assert results[0]["status"] == "exists"
+    assert len(simulator.requisitions) == 1
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,53 @@
+import time
+
+from lever_mcp.mail_merge import CompiledTemplate, TemplateCache, escape_header
+
+
+def test_slots_are_filled_and_escaped():
+    template = CompiledTemplate("<p>Hi {{ candidate_name }}, {x: 1}</p>")
+    assert template.slots == ("candidate_name",)
+    assert template.render({"candidate_name": "<Ada & co>"}) == "<p>Hi &lt;Ada &amp; co&gt;, {x: 1}</p>"
+
+
+def test_missing_or_empty_values_use_the_default():
+    template = CompiledTemplate("Hi {{ candidate_name | there }}{{ role }}!")
+    assert template.render() == "Hi there!"
+    assert template.render({"candidate_name": ""}) == "Hi there!"
+    assert template.render({"candidate_name": "Ada", "role": 7}) == "Hi Ada7!"
+
+
+def test_template_without_slots_renders_as_is():
+    template = CompiledTemplate("<style>p { color: red; }</style>")
+    rendered = template.render({"candidate_name": "Ada"})
+    assert rendered == template.source
+    assert template.render() is rendered
+
+
+def test_rendered_text_keeps_its_segments():
+    rendered = CompiledTemplate("<p>{{ a }} and {{ b | x }}</p>").render({"a": "<1>"})
+    assert rendered.segments == ("<p>", "&lt;1&gt;", " and ", "x", "</p>")
+    assert "".join(rendered.segments) == rendered
+
+
+def test_subject_values_cannot_inject_headers():
+    template = CompiledTemplate("Interview: {{ role }}", escape=escape_header)
+    assert template.render({"role": "Engineer\r\nBcc: evil@example.com"}) == "Interview: Engineer Bcc: evil@example.com"
+
+
+def test_cache_compiles_once_and_recompiles_on_change():
+    cache = TemplateCache()
+    first = cache.get("k", "Hi {{ name }}")
+    assert cache.get("k", "Hi {{ name }}") is first
+    assert cache.get("k", "Hello {{ name }}").render({"name": "Ada"}) == "Hello Ada"
+    assert cache.snapshot() == {"templates": 1, "hits": 1, "compiles": 2}
+
+
+def test_render_is_cheap():
+    from lever_mcp.server import EMAIL_TEMPLATES
+
+    template = CompiledTemplate(EMAIL_TEMPLATES["interview"]["body"])
+    values = {"candidate_name": "Ada", "role": "Engineer", "interviewer": "Sam"}
+    start = time.perf_counter()
+    for _ in range(1000):
+        template.render(values)
+    assert time.perf_counter() - start < 0.5
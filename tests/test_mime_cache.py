@@ -0,0 +1,76 @@
+import base64
+
+import pytest
+
+from lever_mcp.gmail_client import build_raw_message
+from lever_mcp.mail_merge import CompiledTemplate
+from lever_mcp.mime_cache import EncodedSegment, SegmentCache, encode_pieces, segment_cache
+
+
+def plain_encode(headers: str, body: str) -> str:
+    return base64.urlsafe_b64encode((headers + body).encode("utf-8")).decode("utf-8")
+
+
+@pytest.mark.parametrize("lengths", [(0, 1, 0), (1, 2, 3), (2, 0, 5), (4, 7, 1), (5, 5, 5)])
+def test_splicing_matches_encoding_the_whole_message(lengths):
+    static = EncodedSegment("<html>" + "é" * 40 + "</html>")
+    pieces = [b"h" * lengths[0], static, b"v" * lengths[1], static, b"t" * lengths[2]]
+    whole = b"".join(p.data if isinstance(p, EncodedSegment) else p for p in pieces)
+
+    assert encode_pieces(pieces) == base64.urlsafe_b64encode(whole).decode("ascii")
+
+
+def test_segment_shorter_than_alignment_is_spliced():
+    pieces = [b"ab", EncodedSegment("c"), b"def"]
+    assert encode_pieces(pieces) == base64.urlsafe_b64encode(b"abcdef").decode("ascii")
+
+
+def test_templated_message_matches_plain_encoding():
+    from lever_mcp.server import EMAIL_TEMPLATES
+
+    template = CompiledTemplate(EMAIL_TEMPLATES["interview"]["body"] + "<p>Directions</p>\n" * 200)
+    hits = segment_cache.hits
+    for name in ("Ada", "Bø", "Cleopatra <Queen>"):
+        body = template.render({"candidate_name": name, "role": "Engineer"})
+        raw = build_raw_message(f"{name}@example.com", f"Hi {name}", body, cc="c@example.com")
+        decoded = base64.urlsafe_b64decode(raw).decode("utf-8")
+
+        assert decoded.endswith("\n\n" + body)
+        assert raw == plain_encode(decoded[:-len(body)], str(body))
+    assert segment_cache.hits > hits
+
+
+def test_plain_body_is_encoded_in_full():
+    raw = build_raw_message("a@example.com", "Hi", "<p>hello</p>")
+    assert base64.urlsafe_b64decode(raw).decode("utf-8").endswith("\n\n<p>hello</p>")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SegmentCache(max_segments=2)
+    first = cache.get("a")
+    cache.get("b")
+    assert cache.get("a") is first
+    cache.get("c")
+
+    assert cache.snapshot() == {"segments": 2, "hits": 1, "misses": 3}
+    assert cache.get("a") is first
+    cache.get("b")
+    assert cache.snapshot()["misses"] == 4
+
+
+def test_stock_themes_use_cached_segments_only_when_mostly_static():
+    from lever_mcp.server import _render_email
+
+    _, body = _render_email("pirate", variables={"candidate_name": "Ada"})
+    first = build_raw_message("a@example.com", "Ahoy", body)
+    hits = segment_cache.hits
+    second = build_raw_message("bo@example.com", "Ahoy", body)
+    assert segment_cache.hits == hits + 1
+    assert first == plain_encode(base64.urlsafe_b64decode(first).decode("utf-8")[:-len(body)], str(body))
+    assert second == plain_encode(base64.urlsafe_b64decode(second).decode("utf-8")[:-len(body)], str(body))
+
+    # The interview body's static text is broken up by slots into short runs
+    _, body = _render_email("interview", variables={"candidate_name": "Ada", "role": "Engineer"})
+    snapshot = segment_cache.snapshot()
+    build_raw_message("a@example.com", "Interview", body)
+    assert segment_cache.snapshot() == snapshot
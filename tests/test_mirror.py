@@ -0,0 +1,121 @@
+import pytest
+import httpx
+import time
+
+from lever_mcp.mirror import CandidateMirror, sync_mirror, MIRROR_OFFSET_PREFIX
+
+
+def candidate(i: int, updated_at: int) -> dict:
+    return {"id": f"c{i}", "name": f"Candidate {i}", "createdAt": i, "updatedAt": updated_at}
+
+
+@pytest.mark.asyncio
+async def test_delta_sync_uses_watermark(make_client):
+    mirror = CandidateMirror()
+    requests = []
+    responses = [
+        {"data": [candidate(1, 100), candidate(2, 200)], "hasNext": False},
+        {"data": [candidate(2, 300)], "hasNext": False},
+    ]
+
+    def handler(request):
+        requests.append(dict(request.url.params))
+        return httpx.Response(200, json=responses.pop(0))
+
+    client = make_client(handler)
+    await sync_mirror(client, mirror)
+    assert mirror.watermark == 200
+    assert "updated_at_start" not in requests[0]
+
+    summary = await sync_mirror(client, mirror)
+    assert requests[1]["updated_at_start"] == "200"
+    assert summary["records"] == 1
+    assert mirror.watermark == 300
+    assert mirror.count() == 2
+    assert mirror.get_candidate("c2")["updatedAt"] == 300
+
+
+def test_list_candidates_pages_with_mirror_offsets():
+    mirror = CandidateMirror()
+    mirror.upsert_many([candidate(i, i) for i in range(5)])
+
+    first = mirror.list_candidates(limit=3)
+    assert [c["id"] for c in first["data"]] == ["c4", "c3", "c2"]
+    assert first["hasNext"] is True
+    assert first["next"].startswith(MIRROR_OFFSET_PREFIX)
+
+    second = mirror.list_candidates(limit=3, offset=first["next"])
+    assert [c["id"] for c in second["data"]] == ["c1", "c0"]
+    assert second["hasNext"] is False
+
+
+def test_staleness_bound():
+    mirror = CandidateMirror()
+    assert not mirror.is_fresh(60)
+    mirror.mark_synced(None)
+    assert mirror.is_fresh(60)
+    mirror._set_state("last_synced_at", time.time() - 120)
+    assert not mirror.is_fresh(60)
+
+
+def test_list_candidates_rejects_live_lever_cursors():
+    mirror = CandidateMirror()
+    mirror.upsert_many([candidate(i, i) for i in range(3)])
+    with pytest.raises(ValueError):
+        mirror.list_candidates(limit=2, offset="live-cursor-2")
+
+
+@pytest.mark.asyncio
+async def test_live_cursor_keeps_paging_lever_once_mirror_is_fresh(monkeypatch, make_client):
+    import json
+    from lever_mcp import server
+
+    mirror = CandidateMirror()
+    mirror.upsert_many([candidate(i, i) for i in range(5)])
+    mirror.mark_synced(None)
+    monkeypatch.setattr(server, "get_fresh_mirror", lambda: mirror)
+
+    offsets = []
+
+    def handler(request):
+        offsets.append(request.url.params.get("offset"))
+        return httpx.Response(200, json={"data": [{"id": "live-2"}, {"id": "live-3"}], "hasNext": False})
+
+    monkeypatch.setattr(server, "get_lever_client", lambda: make_client(handler))
+    page = json.loads(await server._list_candidates(limit=2, offset="live-cursor-2"))
+
+    assert offsets == ["live-cursor-2"]
+    assert [c["id"] for c in page["data"]] == ["live-2", "live-3"]
+
+
+@pytest.mark.asyncio
+async def test_first_page_cursor_keeps_its_source_when_freshness_changes(monkeypatch, make_client):
+    import json
+    from lever_mcp import server
+
+    monkeypatch.setenv("LEVER_OUTPUT_BUDGET_LIST_CANDIDATES", "300")
+    mirror = CandidateMirror()
+    mirror.upsert_many([dict(candidate(i, i), name="x" * 40) for i in range(10)])
+    monkeypatch.setattr(server, "get_mirror", lambda: mirror)
+
+    def handler(request):
+        return httpx.Response(200, json={"data": [{"id": f"live-{i}", "name": "x" * 40} for i in range(10)], "hasNext": False})
+
+    monkeypatch.setattr(server, "get_lever_client", lambda: make_client(handler))
+
+    # Truncated Lever first page, then the mirror turns fresh: keep paging Lever
+    monkeypatch.setattr(server, "get_fresh_mirror", lambda: None)
+    first = json.loads(await server._list_candidates(limit=10))
+    returned = len(first["data"])
+    assert first["truncated"] is True and first["data"][0]["id"] == "live-0"
+    monkeypatch.setattr(server, "get_fresh_mirror", lambda: mirror)
+    second = json.loads(await server._list_candidates(limit=10, offset=first["next"]))
+    assert second["data"][0]["id"] == f"live-{returned}"
+
+    # Truncated mirror first page, then the mirror goes stale: keep paging the mirror
+    first = json.loads(await server._list_candidates(limit=10))
+    returned = len(first["data"])
+    assert first["truncated"] is True and first["data"][0]["id"] == "c9"
+    monkeypatch.setattr(server, "get_fresh_mirror", lambda: None)
+    second = json.loads(await server._list_candidates(limit=10, offset=first["next"]))
+    assert second["data"][0]["id"] == f"c{9 - returned}"
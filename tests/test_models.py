@@ -0,0 +1,39 @@
+import json
+
+from lever_mcp import models
+from lever_mcp.models import Candidate, Requisition, decode, decode_page, from_dict, to_dict
+
+RECORD = {"id": "c1", "name": "Ada", "tags": ["python"], "unknownField": {"big": "x" * 100}}
+
+
+def test_decode_drops_unknown_fields():
+    body = json.dumps({"data": RECORD}).encode()
+    record = decode(body, Candidate)
+    assert record.name == "Ada"
+    assert to_dict(record) == {"id": "c1", "name": "Ada", "tags": ["python"]}
+    assert decode(json.dumps({"data": RECORD}), Candidate) == record
+    assert decode({"data": RECORD}, Candidate) == record
+
+
+def test_decode_page():
+    body = json.dumps({"data": [RECORD, {"id": "c2"}], "hasNext": True, "next": "abc"}).encode()
+    page = decode_page(body, Candidate)
+    assert [r.id for r in page["data"]] == ["c1", "c2"]
+    assert page["hasNext"] is True
+    assert page["next"] == "abc"
+    assert decode_page(b'{"data": []}', Requisition) == {"data": [], "hasNext": False}
+
+
+def test_models_have_no_instance_dict():
+    assert not hasattr(from_dict(Candidate, RECORD), "__dict__")
+
+
+def test_slotted_fallback_without_msgspec(monkeypatch):
+    monkeypatch.setattr(models, "msgspec", None)
+    Slotted = models._define("Slotted", models.CANDIDATE_FIELDS)
+
+    record = decode(json.dumps({"data": RECORD}).encode(), Slotted)
+    assert isinstance(record, models._SlottedModel)
+    assert not hasattr(record, "__dict__")
+    assert to_dict(record) == {"id": "c1", "name": "Ada", "tags": ["python"]}
+    assert decode_page({"data": [RECORD], "hasNext": False}, Slotted)["data"] == [record]
@@ -0,0 +1,42 @@
+import json
+import pytest
+
+from lever_mcp.output import encode_cursor, decode_cursor, fit_records, render_records, envelope_size, to_json
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("lever-token", 7)) == ("lever-token", 7)
+    assert decode_cursor(encode_cursor(None, 3)) == (None, 3)
+
+
+def test_plain_offsets_pass_through():
+    assert decode_cursor("lever-token") == ("lever-token", 0)
+    assert decode_cursor(None) == (None, 0)
+
+
+def test_malformed_cursor_raises():
+    with pytest.raises(ValueError):
+        decode_cursor("c:not-base64!!")
+
+
+def test_fit_records_stops_at_budget():
+    records = [{"id": str(i), "pad": "x" * 20} for i in range(10)]
+    size = len(to_json(records[0])) + 1
+    parts, used = fit_records(records, size * 3 + 1)
+    assert len(parts) == 3
+    assert used == size * 3
+
+
+def test_fit_records_always_makes_progress():
+    parts, _ = fit_records([{"id": "big", "pad": "x" * 100}], 10)
+    assert len(parts) == 1
+    parts, _ = fit_records([{"id": "big"}], 0, at_least_one=False)
+    assert parts == []
+
+
+def test_render_records_matches_json_dumps():
+    envelope = {"hasNext": True, "next": "abc"}
+    records = [{"id": "1"}, {"id": "2", "name": "Zoë"}]
+    text = render_records(envelope, "data", [to_json(r) for r in records])
+    assert json.loads(text) == {"hasNext": True, "next": "abc", "data": records}
+    assert envelope_size(envelope, "data") == len(render_records(envelope, "data", []))
@@ -0,0 +1,74 @@
+import asyncio
+import httpx
+import pytest
+
+from lever_mcp.prefetch import Prefetcher
+
+
+def candidate_handler(calls: list):
+    def handler(request):
+        candidate_id = request.url.path.rsplit("/", 1)[-1]
+        calls.append(candidate_id)
+        return httpx.Response(200, json={"data": {"id": candidate_id}})
+    return handler
+
+
+async def drain(prefetcher: Prefetcher) -> None:
+    while prefetcher._tasks:
+        await asyncio.gather(*prefetcher._tasks)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_cache_for_top_ids_and_counts_hits(make_client):
+    calls = []
+    client = make_client(candidate_handler(calls))
+    prefetcher = Prefetcher(enabled=True, top_n=2, concurrency=2)
+
+    prefetcher.schedule(client, ["a", "b", "c"])
+    await drain(prefetcher)
+    assert sorted(calls) == ["a", "b"]
+
+    prefetcher.record_request("a")
+    assert await client.get_candidate("a") == {"data": {"id": "a"}}
+    assert len(calls) == 2
+    prefetcher.record_request("c")
+    assert prefetcher.snapshot()["hits"] == 1
+    assert prefetcher.snapshot()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_prefetch_skips_cached_ids_and_respects_rate_reserve(make_client):
+    calls = []
+    client = make_client(candidate_handler(calls))
+    await client.get_candidate("a")
+
+    prefetcher = Prefetcher(enabled=True, top_n=5, reserve=client.rate_limiter.burst)
+    prefetcher.schedule(client, ["a", "b"])
+    await drain(prefetcher)
+
+    assert calls == ["a"]
+    snapshot = prefetcher.snapshot()
+    assert snapshot["skipped_cached"] == 1
+    assert snapshot["skipped_budget"] == 1
+
+
+def test_prefetch_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("LEVER_PREFETCH", raising=False)
+    prefetcher = Prefetcher()
+    prefetcher.schedule(None, ["a"])
+    assert prefetcher.scheduled == 0
+
+
+@pytest.mark.asyncio
+async def test_prefetch_counts_one_cache_miss_per_fetch(make_client):
+    client = make_client(candidate_handler([]))
+    prefetcher = Prefetcher(enabled=True, top_n=2)
+
+    prefetcher.schedule(client, ["a", "b"])
+    await drain(prefetcher)
+    prefetcher.schedule(client, ["a"])
+    await drain(prefetcher)
+
+    stats = client.candidate_cache.snapshot()
+    assert (stats["misses"], stats["hits"]) == (2, 0)
+    assert prefetcher.snapshot()["skipped_cached"] == 1
@@ -0,0 +1,63 @@
+from lever_mcp.projection import compile_projection, get_projection
+
+CANDIDATE = {
+    "id": "c1",
+    "name": "Ada Lovelace",
+    "emails": ["ada@example.com"],
+    "phones": [{"type": "mobile", "value": "+1 555"}],
+    "stage": "offer",
+    "stageChanges": [
+        {"toStageId": "screen", "toStageIndex": 1, "updatedAt": 1, "userId": "u1"},
+        {"toStageId": "offer", "toStageIndex": 4, "updatedAt": 2, "userId": "u2"},
+    ],
+    "archived": {"reason": "hired", "archivedAt": 3},
+    "urls": {"show": "https://hire.lever.co/candidates/c1", "list": "https://hire.lever.co/candidates"},
+}
+
+
+def test_top_level_fields():
+    assert compile_projection("id,name").apply(CANDIDATE) == {"id": "c1", "name": "Ada Lovelace"}
+
+
+def test_dotted_paths_and_list_wildcards():
+    projection = compile_projection("urls.show,stageChanges[*].toStageId,archived.reason")
+    assert projection.apply(CANDIDATE) == {
+        "urls": {"show": "https://hire.lever.co/candidates/c1"},
+        "stageChanges": [{"toStageId": "screen"}, {"toStageId": "offer"}],
+        "archived": {"reason": "hired"},
+    }
+
+
+def test_lists_are_mapped_without_explicit_wildcard():
+    assert compile_projection("phones.value").apply(CANDIDATE) == {"phones": [{"value": "+1 555"}]}
+
+
+def test_shorter_path_selects_whole_subtree():
+    assert compile_projection("urls.show,urls").apply(CANDIDATE)["urls"] == CANDIDATE["urls"]
+
+
+def test_presets_expand_and_mix_with_paths():
+    projection = compile_projection("contact,urls.show")
+    assert projection.apply(CANDIDATE) == {
+        "id": "c1",
+        "name": "Ada Lovelace",
+        "emails": ["ada@example.com"],
+        "phones": [{"value": "+1 555"}],
+        "urls": {"show": "https://hire.lever.co/candidates/c1"},
+    }
+
+
+def test_missing_fields_are_omitted():
+    assert compile_projection("id,headline,archived.reason").apply({"id": "c2"}) == {"id": "c2"}
+
+
+def test_apply_response_keeps_envelope():
+    page = {"data": [CANDIDATE, CANDIDATE], "hasNext": True, "next": "abc"}
+    projected = compile_projection("id").apply_response(page)
+    assert projected == {"data": [{"id": "c1"}, {"id": "c1"}], "hasNext": True, "next": "abc"}
+
+
+def test_get_projection_defaults_and_full():
+    assert get_projection(None) is None
+    assert get_projection("all", default="summary") is None
+    assert get_projection("", default="summary") is compile_projection("summary")
@@ -0,0 +1,70 @@
+import pytest
+import httpx
+import time
+
+from lever_mcp.rate_limit import TokenBucket, parse_retry_after, get_rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_queues_beyond_burst():
+    bucket = TokenBucket(rate=100, burst=2)
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 0.015
+    stats = bucket.snapshot()
+    assert stats["requests"] == 4
+    assert stats["queued_requests"] >= 1
+
+
+def test_buckets_are_shared_per_api_key():
+    assert get_rate_limiter("key-a") is get_rate_limiter("key-a")
+    assert get_rate_limiter("key-a") is not get_rate_limiter("key-b")
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("garbage") is None
+
+
+@pytest.mark.asyncio
+async def test_retries_429_honoring_retry_after(make_client):
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0.01"}),
+        httpx.Response(200, json={"data": {"id": "abc"}}),
+    ]
+    client = make_client(lambda request: responses.pop(0), fast_retries=True)
+
+    assert await client.get_candidate("abc") == {"data": {"id": "abc"}}
+    assert client.rate_limiter.throttled == 1
+    assert client.rate_limiter.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(make_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = make_client(handler, fast_retries=True)
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get_candidate("abc")
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_post_not_retried_on_server_error(make_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    client = make_client(handler, fast_retries=True)
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.create_requisition({"name": "Engineer"})
+    assert len(calls) == 1
@@ -0,0 +1,72 @@
+import json
+import httpx
+import pytest
+
+from lever_mcp.requisitions import validate_requisitions, requisition_code
+
+
+def row(title="Engineer", **extra):
+    return {"title": title, "location": "Remote", "team": "Eng", **extra}
+
+
+def test_validation_reports_every_bad_row():
+    payloads, errors = validate_requisitions([row(), {"title": "PM"}, row(headcount=0), row()])
+    assert set(errors) == {1, 2, 3}
+    assert "location" in errors[1]
+    assert "Duplicate of row 0" in errors[3]
+
+
+def test_codes_are_deterministic_and_slot_distinguishes_rows():
+    assert requisition_code(row()) == requisition_code(row(title=" engineer "))
+    assert requisition_code(row()) != requisition_code(row(slot=1))
+    payloads, errors = validate_requisitions([row(), row(slot=1), row(requisition_code="ENG-7", headcount=3)])
+    assert not errors
+    assert payloads[2] == {"requisitionCode": "ENG-7", "name": "Engineer", "location": "Remote", "team": "Eng", "headcountTotal": 3}
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_per_row_results(make_client):
+    posted = []
+
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, json={"data": []})
+        body = json.loads(request.content)
+        posted.append(body["requisitionCode"])
+        assert request.headers["Idempotency-Key"] == body["requisitionCode"]
+        if body["name"] == "Bad":
+            return httpx.Response(400, json={"message": "invalid team"})
+        return httpx.Response(201, json={"data": {"id": f"id-{body['requisitionCode']}"}})
+
+    client = make_client(handler, fast_retries=True)
+    payloads, _ = validate_requisitions([row(), row(title="Bad"), row(title="PM")])
+    results = await client.create_requisitions(payloads, concurrency=2)
+
+    assert [r["status"] for r in results] == ["created", "error", "created"]
+    assert results[0]["id"] == f"id-{payloads[0]['requisitionCode']}"
+    assert "HTTP 400" in results[1]["error"]
+
+    # Re-submitting the plan only retries the row that failed
+    posted.clear()
+    results = await client.create_requisitions(payloads)
+    assert [r["status"] for r in results] == ["exists", "error", "exists"]
+    assert posted == [payloads[1]["requisitionCode"]]
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_failure_is_resolved_by_lookup_not_resend(make_client):
+    posts = []
+
+    def handler(request):
+        if request.method == "GET":
+            code = request.url.params["requisition_code"]
+            return httpx.Response(200, json={"data": [{"id": "existing", "requisitionCode": code}]})
+        posts.append(request)
+        return httpx.Response(502)
+
+    client = make_client(handler, fast_retries=True)
+    payloads, _ = validate_requisitions([row()])
+    results = await client.create_requisitions(payloads)
+
+    assert results == [{"requisition_code": payloads[0]["requisitionCode"], "status": "exists", "id": "existing"}]
+    assert len(posts) == 1
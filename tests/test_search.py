@@ -0,0 +1,52 @@
+from lever_mcp.mirror import CandidateMirror
+from lever_mcp.search import build_match_query, resume_text
+
+
+def make_mirror() -> CandidateMirror:
+    mirror = CandidateMirror()
+    mirror.upsert_many([
+        {"id": "c1", "name": "Ada Lovelace", "emails": ["ada@example.com"], "tags": ["backend", "python"],
+         "location": "Berlin", "createdAt": 1},
+        {"id": "c2", "name": "Grace Hopper", "emails": ["grace@example.com"], "tags": ["frontend"],
+         "location": "Berlin", "createdAt": 2},
+        {"id": "c3", "name": "Alan Turing", "tags": ["backend"], "location": "London", "createdAt": 3},
+    ])
+    return mirror
+
+
+def test_match_query_quotes_terms_and_drops_stop_words():
+    assert build_match_query("backend engineers in Berlin") == '"backend" OR "engineers" OR "berlin"'
+    assert build_match_query('x" OR name:*', match_all=True) == '"x" AND "name"'
+    assert build_match_query("in the") is None
+
+
+def test_search_ranks_candidates_matching_more_terms_first():
+    mirror = make_mirror()
+    results = mirror.search("backend engineers in Berlin")
+    assert [r["id"] for r in results][0] == "c1"
+    assert {r["id"] for r in results} == {"c1", "c2", "c3"}
+
+
+def test_search_match_all():
+    mirror = make_mirror()
+    assert [r["id"] for r in mirror.search("backend berlin", match_all=True)] == ["c1"]
+
+
+def test_index_follows_upserts_and_deletes():
+    mirror = make_mirror()
+    mirror.upsert_many([{"id": "c3", "name": "Alan Turing", "tags": ["backend"], "location": "Manchester"}])
+    assert [r["id"] for r in mirror.search("manchester")] == ["c3"]
+    assert mirror.search("london") == []
+
+    mirror.delete("c3")
+    assert mirror.search("manchester") == []
+
+
+def test_resume_text_is_searchable_and_survives_reindex():
+    mirror = make_mirror()
+    text = resume_text([{"parsedData": {"positions": [{"title": "Kernel hacker", "org": "Acme"}], "schools": []}}])
+    mirror.set_resume_text("c2", text)
+    assert [r["id"] for r in mirror.search("kernel")] == ["c2"]
+
+    mirror.upsert_many([{"id": "c2", "name": "Grace Hopper", "location": "Arlington"}])
+    assert [r["id"] for r in mirror.search("kernel")] == ["c2"]
@@ -1,16 +1,21 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from lever_mcp.server import _list_candidates, _get_candidate, _create_requisition
+from lever_mcp.server import _list_candidates, _get_candidate, _create_requisition, _scan_candidates, _get_candidates_batch
 import os
+import json
 
 # Mock environment variable
 os.environ["LEVER_API_KEY"] = "test_key"
 
+def lever_response(payload):
+    """Stand-in for an httpx.Response carrying payload as its JSON body."""
+    return MagicMock(status_code=200, headers={}, content=json.dumps(payload).encode(), json=lambda: payload)
+
 @pytest.mark.asyncio
 async def test_list_candidates():
     mock_response = {"data": [{"id": "123", "name": "John Doe"}]}
     with patch("httpx.AsyncClient.get") as mock_get:
-        mock_get.return_value = MagicMock(status_code=200, json=lambda: mock_response)
+        mock_get.return_value = lever_response(mock_response)
         
         result = await _list_candidates(limit=5)
         assert "John Doe" in result
@@ -20,7 +25,7 @@ async def test_list_candidates():
 async def test_get_candidate():
     mock_response = {"data": {"id": "123", "name": "Jane Doe"}}
     with patch("httpx.AsyncClient.get") as mock_get:
-        mock_get.return_value = MagicMock(status_code=200, json=lambda: mock_response)
+        mock_get.return_value = lever_response(mock_response)
         
         result = await _get_candidate(candidate_id="123")
         assert "Jane Doe" in result
@@ -30,7 +35,7 @@ async def test_get_candidate():
 async def test_create_requisition():
     mock_response = {"data": {"id": "req_123", "name": "Engineer"}}
     with patch("httpx.AsyncClient.post") as mock_post:
-        mock_post.return_value = MagicMock(status_code=200, json=lambda: mock_response)
+        mock_post.return_value = lever_response(mock_response)
         
         result = await _create_requisition(title="Engineer", location="Remote", team="Eng")
         assert "req_123" in result
@@ -43,3 +48,147 @@ async def test_error_handling():
         
         result = await _list_candidates()
         assert "Error listing candidates" in result
+
+@pytest.mark.asyncio
+async def test_scan_candidates_stops_on_page_boundary():
+    pages = [
+        {"data": [{"id": str(i), "name": f"Candidate {i}"} for i in range(100)], "hasNext": True, "next": "p2"},
+        {"data": [{"id": str(i), "name": f"Candidate {i}"} for i in range(100, 200)], "hasNext": True, "next": "p3"},
+    ]
+    with patch("httpx.AsyncClient.get") as mock_get:
+        mock_get.side_effect = [lever_response(p) for p in pages]
+
+        result = json.loads(await _scan_candidates(max_items=250))
+        assert result["count"] == 200
+        assert result["next_offset"] == "p3"
+        assert result["candidates"][0] == {"id": "0", "name": "Candidate 0"}
+
+@pytest.mark.asyncio
+async def test_get_candidates_batch_returns_partial_results():
+    async def fake_get(self, url, **kwargs):
+        if url.endswith("/bad"):
+            raise Exception("boom")
+        return lever_response({"data": {"id": url.rsplit("/", 1)[-1]}})
+
+    with patch("httpx.AsyncClient.get", fake_get):
+        result = json.loads(await _get_candidates_batch(["x1", "bad", "x2", "x1"]))
+        assert [c["id"] for c in result["candidates"]] == ["x1", "x2"]
+        assert result["errors"] == {"bad": "boom"}
+
+@pytest.mark.asyncio
+async def test_list_candidates_returns_compact_json_with_fields():
+    mock_response = {"data": [{"id": "123", "name": "John Doe", "emails": ["j@example.com"], "applications": ["a1"]}], "hasNext": False}
+    with patch("httpx.AsyncClient.get") as mock_get:
+        mock_get.return_value = lever_response(mock_response)
+
+        result = await _list_candidates(limit=5, fields="id, name")
+        assert json.loads(result) == {"data": [{"id": "123", "name": "John Doe"}], "hasNext": False}
+        assert ": " not in result
+
+@pytest.mark.asyncio
+async def test_list_candidates_truncates_to_budget_and_resumes(monkeypatch):
+    monkeypatch.setenv("LEVER_OUTPUT_BUDGET_LIST_CANDIDATES", "300")
+    records = [{"id": str(i), "name": "x" * 40} for i in range(10)]
+    mock_response = {"data": records, "hasNext": True, "next": "page2"}
+    with patch("httpx.AsyncClient.get") as mock_get:
+        mock_get.return_value = lever_response(mock_response)
+
+        first = await _list_candidates(limit=10)
+        assert len(first.encode()) <= 300
+        first = json.loads(first)
+        assert first["truncated"] is True
+        returned = len(first["data"])
+        assert 0 < returned < 10
+
+        second = json.loads(await _list_candidates(limit=10, offset=first["next"]))
+        assert second["data"][0]["id"] == str(returned)
+        assert mock_get.call_args.kwargs["params"]["limit"] == min(100, returned + 10)
+
+@pytest.mark.asyncio
+async def test_send_emails_batch_reports_retryable_recipients():
+    from lever_mcp.server import _send_emails_batch_simple
+
+    async def fake_send_emails(self, messages):
+        assert all(m["subject"] == "Interview reminder" for m in messages)
+        return [
+            {"index": 0, "to": messages[0]["to"], "status": "sent", "message_id": "m1"},
+            {"index": 1, "to": messages[1]["to"], "status": "error", "error": "Rate limit exceeded",
+             "error_code": 429, "retryable": True}
+        ]
+
+    with patch("lever_mcp.server.GmailClient.send_emails", fake_send_emails):
+        result = json.loads(await _send_emails_batch_simple(
+            [{"to": "a@example.com"}, {"to": "b@example.com"}], "space",
+            subject="Interview reminder", access_token="google-token"
+        ))
+
+    assert result["status"] == "partial"
+    assert (result["sent"], result["failed"]) == (1, 1)
+    assert result["retryable"] == [1]
+
+@pytest.mark.asyncio
+async def test_send_emails_batch_rejects_too_many_recipients():
+    from lever_mcp.server import _send_emails_batch_simple
+
+    result = json.loads(await _send_emails_batch_simple([{"to": "a@example.com"}] * 501, "space", access_token="t"))
+    assert result["status"] == "error"
+
+def test_interview_email_is_personalized():
+    from lever_mcp.server import _render_email
+
+    subject, body = _render_email("interview", variables={"candidate_name": "Ada <3", "role": "Engineer"})
+    assert subject == "📅 Your interview for Engineer"
+    assert "Ada &lt;3" in body and "our team" in body
+    assert "{{" not in body
+
+@pytest.mark.asyncio
+async def test_send_emails_batch_personalizes_each_recipient():
+    from lever_mcp.server import _send_emails_batch_simple
+    sent = []
+
+    async def fake_send_emails(self, messages):
+        sent.extend(messages)
+        return [{"index": i, "to": m["to"], "status": "sent", "message_id": f"m{i}"} for i, m in enumerate(messages)]
+
+    with patch("lever_mcp.server.GmailClient.send_emails", fake_send_emails):
+        await _send_emails_batch_simple(
+            [{"to": "a@example.com", "candidate_name": "Ada"}, {"to": "b@example.com", "candidate_name": "Bo"}],
+            "interview", access_token="google-token", variables={"role": "Engineer"}
+        )
+
+    assert "Ada" in sent[0]["body"] and "Bo" in sent[1]["body"]
+    assert all("Engineer" in m["body"] and "Engineer" in m["subject"] for m in sent)
+
+def test_custom_subject_is_plain_text():
+    from lever_mcp.server import _render_email, template_cache
+
+    compiles = template_cache.compiles
+    for subject in ("Offer for {{ role }}", "Team {{ }} sync\r\nBcc: x@example.com", "Offer for {{ role }}"):
+        rendered, _ = _render_email("interview", subject, {"role": "Engineer"})
+        assert rendered == " ".join(subject.splitlines())
+    assert template_cache.compiles == compiles
+
+@pytest.mark.asyncio
+async def test_scan_candidates_resumes_cursor_with_smaller_max_items(monkeypatch, make_client):
+    import httpx
+    from lever_mcp import server
+    from lever_mcp.output import encode_cursor
+
+    def handler(request):
+        start = int(request.url.params.get("offset", "0"))
+        limit = int(request.url.params["limit"])
+        end = min(start + limit, 250)
+        page = {"data": [{"id": str(i)} for i in range(start, end)], "hasNext": end < 250}
+        if end < 250:
+            page["next"] = str(end)
+        return httpx.Response(200, json=page)
+
+    monkeypatch.setattr(server, "get_lever_client", lambda: make_client(handler))
+    # Cursor from a 100-record first page that was cut off after 60 records
+    result = json.loads(await _scan_candidates(max_items=10, offset=encode_cursor(None, 60), fields="id"))
+    assert [c["id"] for c in result["candidates"]] == [str(i) for i in range(60, 70)]
+
+    result = json.loads(await _scan_candidates(max_items=10, offset=result["next_offset"], fields="id"))
+    assert [c["id"] for c in result["candidates"]] == [str(i) for i in range(70, 80)]
+
+    assert "Invalid continuation cursor" in await _scan_candidates(offset=encode_cursor(None, 100))
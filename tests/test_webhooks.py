@@ -0,0 +1,133 @@
+import hmac
+import json
+import time
+import hashlib
+import pytest
+
+from lever_mcp.mirror import CandidateMirror
+from lever_mcp.webhooks import WebhookProcessor, ReplayGuard, verify_signature
+
+SECRET = "webhook-secret"
+
+
+def signed(event: str, data: dict, triggered_at: int = 1000, token: str = "delivery-token") -> dict:
+    signature = hmac.new(SECRET.encode(), f"{token}{triggered_at}".encode(), hashlib.sha256).hexdigest()
+    return {"event": event, "data": data, "token": token, "triggeredAt": triggered_at, "signature": signature}
+
+
+def make_processor(mirror, invalidated, client=None):
+    return WebhookProcessor(lambda: mirror, invalidated.append, (lambda: client) if client else None)
+
+
+def test_signature_verification():
+    payload = signed("candidateStageChange", {})
+    assert verify_signature(payload, ["other", SECRET])
+    assert not verify_signature(payload, ["other"])
+    assert not verify_signature(dict(payload, triggeredAt=1001), [SECRET])
+    assert not verify_signature({"event": "x"}, [SECRET])
+
+
+@pytest.mark.asyncio
+async def test_stage_change_patches_mirror_and_invalidates_cache():
+    mirror = CandidateMirror()
+    mirror.upsert_many([{"id": "c1", "name": "Ada", "stage": "screen", "updatedAt": 10}])
+    invalidated = []
+    processor = make_processor(mirror, invalidated)
+
+    await processor.handle(signed("candidateStageChange", {"candidateId": "c1", "opportunityId": "c1", "toStageId": "onsite"}))
+    record = mirror.get_candidate("c1")
+    assert record["stage"] == "onsite"
+    assert record["stageChanges"] == [{"toStageId": "onsite", "updatedAt": 1000}]
+    assert record["updatedAt"] == 1000
+    assert invalidated == ["c1"]
+
+
+@pytest.mark.asyncio
+async def test_archive_and_delete():
+    mirror = CandidateMirror()
+    mirror.upsert_many([{"id": "c1", "name": "Ada"}])
+    processor = make_processor(mirror, [])
+
+    archived = {"reason": "r1", "archivedAt": 5}
+    await processor.handle(signed("candidateArchiveChange", {"opportunityId": "c1", "toArchived": archived}))
+    assert mirror.get_candidate("c1")["archived"] == archived
+
+    await processor.handle(signed("candidateDeleted", {"opportunityId": "c1"}))
+    assert mirror.get_candidate("c1") is None
+
+
+@pytest.mark.asyncio
+async def test_hire_refetches_record():
+    class FakeClient:
+        async def get_candidate(self, candidate_id):
+            return {"data": {"id": candidate_id, "name": "Ada", "archived": {"reason": "hired"}}}
+
+    mirror = CandidateMirror()
+    processor = make_processor(mirror, [], FakeClient())
+    await processor.handle(signed("candidateHired", {"opportunityId": "c1"}))
+    assert mirror.get_candidate("c1")["archived"] == {"reason": "hired"}
+
+
+@pytest.mark.asyncio
+async def test_queue_worker_applies_events():
+    mirror = CandidateMirror()
+    mirror.upsert_many([{"id": "c1", "name": "Ada"}])
+    processor = make_processor(mirror, [])
+
+    assert processor.enqueue(signed("candidateStageChange", {"opportunityId": "c1", "toStageId": "offer"}))
+    assert processor.enqueue(signed("applicationCreated", {"opportunityId": "c1"}))
+    await processor.queue.join()
+    await processor.stop()
+
+    assert mirror.get_candidate("c1")["stage"] == "offer"
+    assert processor.snapshot()["processed"] == 1
+    assert processor.snapshot()["ignored"] == 1
+
+
+def test_replay_guard_rejects_stale_and_repeated_deliveries():
+    guard = ReplayGuard(max_age=300)
+    now_ms = int(time.time() * 1000)
+    payload = signed("candidateStageChange", {}, triggered_at=now_ms)
+
+    assert guard.check(payload) is None
+    guard.remember(payload)
+    assert guard.check(payload) == "duplicate"
+    assert guard.check(signed("candidateStageChange", {}, triggered_at=now_ms, token="other")) is None
+    assert guard.check(signed("candidateStageChange", {}, triggered_at=now_ms - 301000, token="old")) == "stale"
+    assert guard.check(dict(payload, token="t2", triggeredAt="soon")) == "stale"
+    assert guard.snapshot() == {"rejected_stale": 2, "rejected_duplicate": 1}
+
+
+def test_replay_guard_is_bounded():
+    guard = ReplayGuard(max_age=300, max_tokens=2)
+    now_ms = int(time.time() * 1000)
+    for token in ("a", "b", "c"):
+        guard.remember(signed("candidateStageChange", {}, triggered_at=now_ms, token=token))
+    assert list(guard._seen) == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_webhook_route_drops_replayed_delivery(monkeypatch):
+    from starlette.requests import Request
+    from lever_mcp import server
+
+    monkeypatch.setenv("LEVER_WEBHOOK_SIGNATURE_TOKENS", SECRET)
+    monkeypatch.setattr(server, "webhook_replay_guard", ReplayGuard(max_age=300))
+    queued = []
+    monkeypatch.setattr(server.webhook_processor, "enqueue", lambda event: queued.append(event) or True)
+
+    async def post(payload):
+        body = json.dumps(payload).encode()
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        request = Request({"type": "http", "method": "POST", "path": "/webhooks/lever", "headers": []}, receive)
+        response = await server.lever_webhook(request)
+        return response.status_code, json.loads(response.body)
+
+    payload = signed("candidateStageChange", {"opportunityId": "c1", "toStageId": "screen"}, triggered_at=int(time.time() * 1000))
+    assert await post(payload) == (200, {"status": "accepted"})
+    assert await post(payload) == (200, {"status": "duplicate"})
+    assert await post(signed("candidateStageChange", {"opportunityId": "c1"}, token="late")) == (400, {"error": "stale_event"})
+    assert queued == [payload]